@@ -6,16 +6,23 @@ from .document import Document, InMemoryDocument
 from .corpus import Corpus, InMemoryCorpus
 from .dictionary import Dictionary, InMemoryDictionary
 from .posting import Posting
-from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList
-from .invertedindex import InvertedIndex, InMemoryInvertedIndex
+from .postinglist import PostingList, InMemoryPostingList, ArrayPostingList, CompressedInMemoryPostingList, BlockCompressedInMemoryPostingList
+from .invertedindex import InvertedIndex, InMemoryInvertedIndex, OnDiskInvertedIndex
 from .stringfinder import Trie, StringFinder
+from .compacttrie import CompactTrie
+from .tokentrie import TokenTrie
 from .suffixarray import SuffixArray
 from .postingsmerger import PostingsMerger
 from .simplesearchengine import SimpleSearchEngine
 from .ranker import Ranker, BrainDeadRanker
-from .betterranker import BetterRanker
+from .betterranker import BetterRanker, CachedBetterRanker
+from .bm25ranker import BM25Ranker
 from .naivebayesclassifier import NaiveBayesClassifier
+from .integercodec import IntegerCodec
 from .variablebytecodec import VariableByteCodec
+from .eliascodec import EliasCodec, EliasGammaCodec, EliasDeltaCodec
+from .pfordeltacodec import PForDeltaCodec
+from .simple8bcodec import Simple8bCodec
 from .expressioncomposer import ExpressionComposer
 from .shallowcaseextractor import ShallowCaseExtractor
 from .documentpipeline import DocumentPipeline
@@ -5,6 +5,8 @@ from .ranker import Ranker
 from .corpus import Corpus
 from .posting import Posting
 from .invertedindex import InvertedIndex
+from array import array
+from typing import List, Optional, Sequence, Tuple
 import math
 
 
@@ -20,6 +22,9 @@ class BetterRanker(Ranker):
     See Section 7.1.4 in https://nlp.stanford.edu/IR-book/pdf/irbookonlinereading.pdf.
     """
 
+    # Precomputed TF weights for small term frequencies, which is what we'll see almost all the time.
+    _TF_SCORES = [0.0] + [1.0 + math.log10(term_frequency) for term_frequency in range(1, 256)]
+
     def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
         self._score = 0.0
         self._document_id = None
@@ -28,6 +33,7 @@ class BetterRanker(Ranker):
         self._dynamic_score_weight = 1.0  # TODO: Make this configurable.
         self._static_score_weight = 1.0  # TODO: Make this configurable.
         self._static_score_field_name = "static_quality_score"  # TODO: Make this configurable.
+        self._max_static_quality_score = None  # Computed lazily, if needed.
 
     def reset(self, document_id: int) -> None:
         self._score = 0.0
@@ -47,3 +53,112 @@ class BetterRanker(Ranker):
         document = self._corpus[self._document_id]
         static_quality_score = float(document[self._static_score_field_name] or 0.0)
         return (self._dynamic_score_weight * self._score) + (self._static_score_weight * static_quality_score)
+
+    def evaluate_many(self, query_terms: List[Tuple[str, int]], document_ids: Sequence[int],
+                      term_indices: Sequence[int], term_frequencies: Sequence[int]) -> array:
+        # Everything that only depends on the query terms is computed once per block. Sums are formed in
+        # the same order as update() forms them, so that the scores come out exactly the same.
+        query_scores = [1.0 + math.log10(multiplicity) for (_, multiplicity) in query_terms]
+        idf_scores = [self._get_idf_score(term) if self._inverted_index.get_document_frequency(term) else 0.0
+                      for (term, _) in query_terms]
+        tf_scores = self._TF_SCORES
+        scores = array("d")
+        previous_document_id = None
+        score = 0.0
+        for (document_id, i, term_frequency) in zip(document_ids, term_indices, term_frequencies):
+            if document_id != previous_document_id:
+                if previous_document_id is not None:
+                    scores.append(self.__combine(previous_document_id, score))
+                previous_document_id = document_id
+                score = 0.0
+            tf_score = tf_scores[term_frequency] if term_frequency < 256 else 1.0 + math.log10(term_frequency)
+            score += query_scores[i] * tf_score * idf_scores[i]
+        if previous_document_id is not None:
+            scores.append(self.__combine(previous_document_id, score))
+        return scores
+
+    def __combine(self, document_id: int, score: float) -> float:
+        """
+        Combines the given dynamic score with the document's static quality score.
+        """
+        return (self._dynamic_score_weight * score) + (self._static_score_weight * self._get_static_quality_score(document_id))
+
+    def _get_idf_score(self, term: str) -> float:
+        """
+        Returns the IDF score of the given term, which must be in the vocabulary.
+        """
+        return math.log10(self._corpus.size() / float(self._inverted_index.get_document_frequency(term)))
+
+    def _get_static_quality_score(self, document_id: int) -> float:
+        """
+        Returns the static quality score of the given document.
+        """
+        return float(self._corpus[document_id][self._static_score_field_name] or 0.0)
+
+    def get_upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        document_frequency = self._inverted_index.get_document_frequency(term)
+        if document_frequency == 0:
+            return 0.0
+        tf_score = 1.0 + math.log10(max_term_frequency)
+        idf_score = math.log10(self._corpus.size() / float(document_frequency))
+        return self._dynamic_score_weight * (1.0 + math.log10(multiplicity)) * tf_score * idf_score
+
+    def get_static_upper_bound(self) -> Optional[float]:
+        if self._max_static_quality_score is None:
+            self._max_static_quality_score = max((float(d[self._static_score_field_name] or 0.0) for d in self._corpus), default=0.0)
+        return self._static_score_weight * self._max_static_quality_score
+
+
+class CachedBetterRanker(BetterRanker):
+    """
+    A variant of BetterRanker that produces the exact same scores, but that avoids recomputing
+    anything that doesn't change from one posting to the next.
+
+    The static document scores are looked up once at construction time and kept in a typed array
+    indexed by document identifier, the IDF score of each term is computed once and then memoized,
+    and the TF weights of the most common term frequencies are kept in a precomputed table. Scoring
+    a candidate document then boils down to a few lookups and multiplications.
+
+    The ranker is tied to a single inverted index, so memoized IDF scores never go stale. To keep the
+    memo from growing without bounds as the ranker serves query after query, it is simply cleared
+    whenever it fills up. Queries rarely have more than a handful of terms, so that's rare.
+    """
+
+    # How many IDF scores we memoize, at most.
+    _IDF_CACHE_SIZE = 1024
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
+        super().__init__(corpus, inverted_index)
+        self._static_quality_scores = array("d", bytes(8 * corpus.size()))
+        for document in corpus:
+            self._static_quality_scores[document.document_id] = float(document[self._static_score_field_name] or 0.0)
+        self._idf_scores = {}  # Memoized IDF scores, keyed by term.
+
+    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+        assert posting.document_id == self._document_id
+        idf_score = self._idf_scores.get(term)
+        if idf_score is None:
+            idf_score = self._get_idf_score(term)
+        term_frequency = posting.term_frequency
+        tf_score = self._TF_SCORES[term_frequency] if term_frequency < 256 else 1.0 + math.log10(term_frequency)
+        query_score = self._TF_SCORES[multiplicity] if multiplicity < 256 else 1.0 + math.log10(multiplicity)
+        self._score += query_score * tf_score * idf_score
+
+    def evaluate(self) -> float:
+        static_quality_score = self._static_quality_scores[self._document_id]
+        return (self._dynamic_score_weight * self._score) + (self._static_score_weight * static_quality_score)
+
+    def _get_idf_score(self, term: str) -> float:
+        idf_score = self._idf_scores.get(term)
+        if idf_score is None:
+            idf_score = super()._get_idf_score(term)
+            if len(self._idf_scores) >= self._IDF_CACHE_SIZE:
+                self._idf_scores.clear()
+            self._idf_scores[term] = idf_score
+        return idf_score
+
+    def _get_static_quality_score(self, document_id: int) -> float:
+        return self._static_quality_scores[document_id]
+
+    def get_static_upper_bound(self) -> Optional[float]:
+        return self._static_score_weight * max(self._static_quality_scores, default=0.0)
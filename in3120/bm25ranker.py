@@ -0,0 +1,108 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from .ranker import Ranker
+from .corpus import Corpus
+from .posting import Posting
+from .invertedindex import InvertedIndex
+from array import array
+from typing import List, Optional, Sequence, Tuple
+import math
+
+
+class BM25Ranker(Ranker):
+    """
+    A ranker that does Okapi BM25 ranking. See Section 11.4.3 in
+    https://nlp.stanford.edu/IR-book/pdf/irbookonlinereading.pdf.
+
+    The inverted index must keep track of document lengths. The length normalization factor
+    k1 * (1 - b + b * dl / avgdl) only depends on the document, so it is computed up front for
+    all documents and kept in a typed array indexed by document identifier. Scoring a posting
+    then costs about the same as with BetterRanker.
+
+    We use the IDF variant log(1 + (N - df + 0.5) / (df + 0.5)), which never goes negative. IDF
+    scores are memoized, and the memo is cleared whenever it fills up.
+    """
+
+    # How many IDF scores we memoize, at most.
+    _IDF_CACHE_SIZE = 1024
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex, k1: float = 1.2, b: float = 0.75):
+        assert k1 >= 0.0
+        assert 0.0 <= b <= 1.0
+        document_lengths = inverted_index.get_document_lengths()
+        assert document_lengths is not None, "The inverted index doesn't keep track of document lengths"
+        self._score = 0.0
+        self._document_id = None
+        self._corpus = corpus
+        self._inverted_index = inverted_index
+        self._k1 = k1
+        average_document_length = (sum(document_lengths) / len(document_lengths)) if document_lengths else 0.0
+        self._length_norms = array("d", (k1 * (1.0 - b + b * (document_length / average_document_length))
+                                         if average_document_length else k1 for document_length in document_lengths))
+        self._min_length_norm = min(self._length_norms, default=k1)  # For computing upper bounds.
+        self._idf_scores = {}  # Memoized IDF scores, keyed by term.
+
+    def reset(self, document_id: int) -> None:
+        self._score = 0.0
+        self._document_id = document_id
+
+    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+        assert term is not None
+        assert multiplicity > 0
+        assert posting is not None
+        assert posting.term_frequency > 0
+        assert posting.document_id == self._document_id
+        term_frequency = posting.term_frequency
+        tf_score = (term_frequency * (self._k1 + 1.0)) / (term_frequency + self._length_norms[self._document_id])
+        self._score += multiplicity * tf_score * self._get_idf_score(term)
+
+    def evaluate(self) -> float:
+        return self._score
+
+    def evaluate_many(self, query_terms: List[Tuple[str, int]], document_ids: Sequence[int],
+                      term_indices: Sequence[int], term_frequencies: Sequence[int]) -> array:
+        # Sums are formed in the same order as update() forms them, so that the scores come out exactly the same.
+        multiplicities = [multiplicity for (_, multiplicity) in query_terms]
+        idf_scores = [self._get_idf_score(term) for (term, _) in query_terms]
+        length_norms = self._length_norms
+        k1_plus_one = self._k1 + 1.0
+        scores = array("d")
+        previous_document_id = None
+        score = 0.0
+        for (document_id, i, term_frequency) in zip(document_ids, term_indices, term_frequencies):
+            if document_id != previous_document_id:
+                if previous_document_id is not None:
+                    scores.append(score)
+                previous_document_id = document_id
+                score = 0.0
+            tf_score = (term_frequency * k1_plus_one) / (term_frequency + length_norms[document_id])
+            score += multiplicities[i] * tf_score * idf_scores[i]
+        if previous_document_id is not None:
+            scores.append(score)
+        return scores
+
+    def _get_idf_score(self, term: str) -> float:
+        """
+        Returns the IDF score of the given term. Out-of-vocabulary terms get a score of 0.0.
+        """
+        idf_score = self._idf_scores.get(term)
+        if idf_score is None:
+            document_frequency = self._inverted_index.get_document_frequency(term)
+            size = self._corpus.size()
+            idf_score = math.log(1.0 + (size - document_frequency + 0.5) / (document_frequency + 0.5)) if document_frequency else 0.0
+            if len(self._idf_scores) >= self._IDF_CACHE_SIZE:
+                self._idf_scores.clear()
+            self._idf_scores[term] = idf_score
+        return idf_score
+
+    def get_upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        # The TF part grows with the term frequency and shrinks with the length norm, so the shortest
+        # document bounds it.
+        if max_term_frequency == 0:
+            return 0.0
+        tf_score = (max_term_frequency * (self._k1 + 1.0)) / (max_term_frequency + self._min_length_norm)
+        return multiplicity * tf_score * self._get_idf_score(term)
+
+    def get_static_upper_bound(self) -> Optional[float]:
+        return 0.0
@@ -0,0 +1,164 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+from .tokenizer import Tokenizer
+from array import array
+from bisect import bisect_left
+from typing import Optional, Iterable, Iterator, List, Tuple
+
+
+class CompactTrie:
+    """
+    A read-only trie that is encoded into a handful of contiguous typed arrays, instead of as a tree of
+    objects. Meant for large dictionaries, e.g., gazetteers with hundreds of thousands of entries.
+
+    The trie is stored in compressed sparse row (CSR) form: The outgoing edges of all nodes are kept in
+    two parallel arrays holding the edge labels and the nodes the edges lead to, where the edges leaving
+    a node are consecutive and sorted by label. A third array records where each node's edges start, and
+    a bit per node tells if the node is final. Following an edge is thus a binary search among the edges
+    leaving the current node, and most nodes only have a single edge. A node costs about a dozen bytes,
+    while a Trie node is a Python object with a dictionary of its own.
+
+    The trie is built in a single pass over the sorted strings, as a node's outgoing edges are all known
+    once we've seen the first string that doesn't share the node's prefix. Nodes are numbered in the order
+    they're completed, so the root is the last node.
+
+    Nodes are handed out as lightweight CompactTrie objects that share the arrays, so that CompactTrie
+    offers the same consume/is_final contract as Trie, and can be used by StringFinder.
+    """
+
+    __slots__ = ("__arrays", "__node")
+
+    def __init__(self, strings: Iterable[str], tokenizer: Tokenizer):
+        """
+        Builds a trie containing the given strings. The tokenizer is used so that we're robust to nuances
+        in whitespace and punctuation. Use the same tokenizer throughout.
+        """
+        labels = array("I")  # The label of each edge, as a code point.
+        targets = array("I")  # The node that each edge leads to.
+        starts = array("I", [0])  # Where each node's edges start. Has an extra entry at the end.
+        finals = self.__build(sorted(" ".join(tokenizer.split(string)) for string in strings), labels, targets, starts)
+        self.__arrays = (labels, targets, starts, finals)  # Shared by all nodes.
+        self.__node = len(starts) - 2
+
+    @staticmethod
+    def __build(strings: List[str], labels: array, targets: array, starts: array) -> bytearray:
+        """
+        Builds the trie from the given sorted strings, and returns the bits that tell which nodes are final.
+        We maintain the path from the root to the node for the previous string. Nodes that are no longer on
+        the path are complete, and get numbered.
+        """
+        path = [[]]  # The outgoing edges of each node along the path, as (label, target) pairs.
+        finals = [False]  # Whether each node along the path is final.
+        is_final_bits = []  # Whether each completed node is final.
+        previous = ""
+
+        def _complete() -> int:
+            # The edges of the previously completed node end where the edges of this node start.
+            for (label, target) in path.pop():
+                labels.append(label)
+                targets.append(target)
+            starts.append(len(labels))
+            is_final_bits.append(finals.pop())
+            return len(is_final_bits) - 1
+
+        for string in strings:
+            assert 0 < len(string)
+            assert previous <= string, "Strings must be sorted"
+            lcp = 0
+            limit = min(len(previous), len(string))
+            while lcp < limit and previous[lcp] == string[lcp]:
+                lcp += 1
+            while len(path) > lcp + 1:
+                node = _complete()
+                path[-1].append((ord(previous[len(path) - 1]), node))
+            for _ in range(lcp, len(string)):
+                path.append([])
+                finals.append(False)
+            finals[-1] = True
+            previous = string
+        while len(path) > 1:
+            node = _complete()
+            path[-1].append((ord(previous[len(path) - 1]), node))
+        _complete()
+
+        bits = bytearray((len(is_final_bits) + 7) // 8)
+        for (node, is_final) in enumerate(is_final_bits):
+            if is_final:
+                bits[node >> 3] |= 1 << (node & 7)
+        return bits
+
+    def __repr__(self):
+        return f"CompactTrie(node={self.__node})"
+
+    def __eq__(self, other):
+        return isinstance(other, CompactTrie) and self.__arrays is other.__arrays and self.__node == other.__node
+
+    def __hash__(self):
+        return hash((id(self.__arrays), self.__node))
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yields the strings that lead from the current node to a final/terminal state. For the root
+        node, these are the strings that the trie was built from, in sorted order.
+        """
+        (labels, targets, starts, finals) = self.__arrays
+        stack = [("", self.__node)]
+        while stack:
+            (prefix, node) = stack.pop()
+            if finals[node >> 3] & (1 << (node & 7)):
+                yield prefix
+            for i in reversed(range(starts[node], starts[node + 1])):
+                stack.append((prefix + chr(labels[i]), targets[i]))
+
+    def consume(self, prefix: str) -> Optional[CompactTrie]:
+        """
+        Consumes the given prefix, verbatim. If strings that have this prefix have been added to
+        the trie, then the trie node corresponding to the prefix is returned. Otherwise, None is returned.
+        """
+        arrays = self.__arrays
+        (labels, targets, starts, _) = arrays
+        node = self.__node
+        for c in prefix:
+            label = ord(c)
+            (lo, hi) = (starts[node], starts[node + 1])
+            if hi - lo == 1:
+                i = lo  # Most nodes have a single outgoing edge.
+            else:
+                i = bisect_left(labels, label, lo, hi)
+                if i == hi:
+                    return None
+            if labels[i] != label:
+                return None
+            node = targets[i]
+        trie = CompactTrie.__new__(CompactTrie)
+        trie.__arrays = arrays
+        trie.__node = node
+        return trie
+
+    def children(self) -> Iterator[Tuple[str, CompactTrie]]:
+        """
+        Yields the (character, node) pairs for the transitions out of the current node, sorted by character.
+        """
+        arrays = self.__arrays
+        (labels, targets, starts, _) = arrays
+        for i in range(starts[self.__node], starts[self.__node + 1]):
+            trie = CompactTrie.__new__(CompactTrie)
+            trie.__arrays = arrays
+            trie.__node = targets[i]
+            yield (chr(labels[i]), trie)
+
+    def is_final(self) -> bool:
+        """
+        Returns True iff the current node is a final/terminal state in the trie/automaton, i.e.,
+        if a string has been added to the trie where the end of the string ends up in this node.
+        """
+        node = self.__node
+        return bool(self.__arrays[3][node >> 3] & (1 << (node & 7)))
+
+    def size(self) -> int:
+        """
+        Returns the number of nodes in the trie.
+        """
+        return len(self.__arrays[2]) - 1
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from abc import abstractmethod
+from .integercodec import IntegerCodec
+from .variablebytecodec import VariableByteCodec
+from typing import Iterable, List, Tuple
+
+
+class EliasCodec(IntegerCodec):
+    """
+    Abstract base class for the bit-aligned Elias codes. See Section 5.3.2 in
+    https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    The Elias codes cannot represent zero, so we encode n + 1 instead of n. A frame is a
+    variable-byte encoded payload length, followed by the payload bits padded with zeros
+    up to the nearest byte boundary. Since the preceding frame need not end with a variable-byte
+    encoded number, the payload length is decoded from a view that starts at the frame.
+
+    Bits are shuffled around as strings of "0" and "1" characters, so that the conversions
+    to and from bytes can be done in bulk by the int type.
+    """
+
+    def encode_many(self, numbers: Iterable[int], destination: bytearray) -> int:
+        assert destination is not None
+        bits = "".join(self._encode(number + 1) for number in numbers)
+        payload_length = (len(bits) + 7) // 8
+        payload = (int(bits + "0" * (8 * payload_length - len(bits)), 2).to_bytes(payload_length, "big")
+                   if bits else b"")
+        increment = VariableByteCodec.encode(payload_length, destination)
+        destination.extend(payload)
+        return increment + payload_length
+
+    def decode_many(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        (payload_length, increment) = VariableByteCodec.decode(memoryview(source)[start:], 0)
+        where = start + increment
+        payload = bytes(source[where:(where + payload_length)])
+        bits = bin(int.from_bytes(payload, "big"))[2:].zfill(8 * payload_length) if payload else ""
+        numbers = []
+        position = 0
+        for _ in range(count):
+            (number, position) = self._decode(bits, position)
+            numbers.append(number - 1)
+        return (numbers, increment + payload_length)
+
+    @staticmethod
+    @abstractmethod
+    def _encode(number: int) -> str:
+        """
+        Returns the bits that encode the given positive number.
+        """
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def _decode(bits: str, position: int) -> Tuple[int, int]:
+        """
+        Decodes the positive number that starts at the given position in the bits. Returns a pair
+        comprised of the decoded number, and the position of the first bit following it.
+        """
+        pass
+
+
+class EliasGammaCodec(EliasCodec):
+    """
+    An encoder/decoder for Elias-gamma encoding. A number is represented by its length in
+    unary, followed by its offset, i.e., its binary representation minus the leading one bit.
+    """
+
+    @staticmethod
+    def _encode(number: int) -> str:
+        assert number > 0
+        binary = bin(number)[2:]
+        return "0" * (len(binary) - 1) + binary
+
+    @staticmethod
+    def _decode(bits: str, position: int) -> Tuple[int, int]:
+        zeros = bits.index("1", position) - position
+        end = position + 2 * zeros + 1
+        return (int(bits[(position + zeros):end], 2), end)
+
+
+class EliasDeltaCodec(EliasCodec):
+    """
+    An encoder/decoder for Elias-delta encoding. A number is represented by its length in
+    Elias-gamma, followed by its offset, i.e., its binary representation minus the leading
+    one bit. Better than Elias-gamma for larger numbers.
+    """
+
+    @staticmethod
+    def _encode(number: int) -> str:
+        assert number > 0
+        binary = bin(number)[2:]
+        return EliasGammaCodec._encode(len(binary)) + binary[1:]
+
+    @staticmethod
+    def _decode(bits: str, position: int) -> Tuple[int, int]:
+        (length, position) = EliasGammaCodec._decode(bits, position)
+        end = position + length - 1
+        return (int("1" + bits[position:end], 2), end)
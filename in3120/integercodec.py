@@ -0,0 +1,34 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Tuple
+
+
+class IntegerCodec(ABC):
+    """
+    Abstract base class for codecs that compress sequences of non-negative integers, e.g., the
+    gaps and term frequencies that make up a posting list.
+
+    A sequence of numbers that is encoded in one go forms a self-contained frame, and must be decoded
+    in one go, too. I.e., when decoding, the count supplied must equal the number of numbers that
+    were encoded into the frame. Frames always start and end on byte boundaries, so that frames can
+    be laid out back-to-back in a buffer.
+    """
+
+    @abstractmethod
+    def encode_many(self, numbers: Iterable[int], destination: bytearray) -> int:
+        """
+        Encodes the given numbers as a single frame, and appends the resulting bytes to the given
+        destination buffer. Returns the number of bytes that were appended.
+        """
+        pass
+
+    @abstractmethod
+    def decode_many(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the frame holding the next count
+        numbers. Returns a pair comprised of the decoded numbers, and the number of bytes read from the
+        source buffer.
+        """
+        pass
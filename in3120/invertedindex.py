@@ -2,15 +2,20 @@
 # -*- coding: utf-8 -*-
 
 import itertools
+import mmap
 from abc import ABC, abstractmethod
+from array import array
 from .dictionary import InMemoryDictionary
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
 from .corpus import Corpus
 from .posting import Posting
+from .integercodec import IntegerCodec
+from .variablebytecodec import VariableByteCodec
 from .postinglist import CompressedInMemoryPostingList, InMemoryPostingList, PostingList
-from collections import Counter
-from typing import Iterable, Iterator, List
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 
 class InvertedIndex(ABC):
@@ -48,6 +53,33 @@ class InvertedIndex(ABC):
         """
         pass
 
+    def get_max_term_frequency(self, term: str) -> int:
+        """
+        Returns the largest term frequency found in the term's associated posting list, e.g., so
+        that rankers can compute upper bounds on the scores the term can contribute. Returns 0 for
+        out-of-vocabulary terms. Implementations should precompute this when indexing, instead of
+        scanning the posting list like we do here.
+        """
+        return max((posting.term_frequency for posting in self.get_postings_iterator(term)), default=0)
+
+    def get_document_lengths(self) -> Optional[Sequence[int]]:
+        """
+        Returns the length of each indexed document, i.e., the number of terms that were indexed for it
+        with repeated terms counted once per occurrence, indexed by document identifier. Rankers can use
+        this to normalize for document length. Returns None if the implementation doesn't keep track of
+        document lengths.
+        """
+        return None
+
+    def get_posting_list(self, term: str) -> Optional[PostingList]:
+        """
+        Returns the term's associated posting list itself, so that clients can make use of
+        any additional capabilities it might have, e.g., bulk access to its raw contents.
+        Returns None if the term is out-of-vocabulary, or if the implementation doesn't
+        keep posting lists around as objects that can be handed out.
+        """
+        return None
+
 
 class InMemoryInvertedIndex(InvertedIndex):
     """
@@ -57,21 +89,49 @@ class InMemoryInvertedIndex(InvertedIndex):
     scale beyond current memory constraints, have a positional index, and so on.
 
     If index compression is enabled, only the posting lists are compressed. Dictionary
-    compression is currently not supported.
+    compression is currently not supported. Instead of a plain flag, an integer codec can be
+    supplied to select how the posting lists are compressed.
+
+    The posting list representation can be overridden by supplying a factory function
+    that creates empty posting lists, e.g., ArrayPostingList. If supplied, the factory
+    takes precedence over the compression flag.
+
+    Indexing can be spread across multiple worker processes. The corpus is then partitioned
+    into contiguous ranges of documents, each worker builds a segment for its range, and the
+    segments are merged in document order. The partitions are handed out as we stream through
+    the corpus, with only a bounded number of them in flight at any time, and the postings in
+    each segment are appended to the posting lists in bulk. The result is identical to indexing
+    serially, term identifiers included. The normalizer and the tokenizer must be picklable.
+
+    The length of each document is recorded as it is indexed, summed over all the indexed fields.
     """
 
-    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, compressed: bool = False):
+    # How many documents each worker process indexes at a time.
+    _PARTITION_SIZE = 1024
+
+    def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer, compressed: Union[bool, IntegerCodec] = False,
+                 posting_list_factory: Optional[Callable[[], PostingList]] = None, workers: int = 1):
+        assert workers > 0
         self.__corpus = corpus
         self.__normalizer = normalizer
         self.__tokenizer = tokenizer
         self.__posting_lists : List[PostingList] = []
+        self.__max_term_frequencies = array("I")  # Aligned with the posting lists.
+        self.__document_lengths = array("I")  # Indexed by document identifier.
         self.__dictionary = InMemoryDictionary()
-        self.__build_index(fields, compressed)
+        if isinstance(compressed, IntegerCodec):
+            self.__posting_list_factory = posting_list_factory or (lambda: CompressedInMemoryPostingList(compressed))
+        else:
+            self.__posting_list_factory = posting_list_factory or (CompressedInMemoryPostingList if compressed else InMemoryPostingList)
+        if workers > 1 and corpus.size() > __class__._PARTITION_SIZE:
+            self.__build_index_in_parallel(list(fields), workers)
+        else:
+            self.__build_index(fields)
 
     def __repr__(self):
         return str({term: self.__posting_lists[term_id] for (term, term_id) in self.__dictionary})
 
-    def __build_index(self, fields: Iterable[str], compressed: bool) -> None:
+    def __build_index(self, fields: Iterable[str]) -> None:
         for document in self.__corpus:
 
             # Compute TF values for all unique terms in the document. Note that we
@@ -82,6 +142,7 @@ class InMemoryInvertedIndex(InvertedIndex):
             # (e.g., 'title.foo') or as extra data in the posting.
             all_terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
             term_frequencies = Counter(all_terms)
+            self.__set_document_length(document.document_id, sum(term_frequencies.values()))
 
             for (term, term_frequency) in term_frequencies.items():
 
@@ -91,9 +152,15 @@ class InMemoryInvertedIndex(InvertedIndex):
                 # Locate the posting list for this term. Create it, if needed.
                 if term_id >= len(self.__posting_lists):
                     assert term_id == len(self.__posting_lists)
-                    self.__posting_lists.append(CompressedInMemoryPostingList() if compressed else InMemoryPostingList())
+                    self.__posting_lists.append(self.__posting_list_factory())
+                    self.__max_term_frequencies.append(0)
                 posting_list = self.__posting_lists[term_id]
 
+                # Keep track of the largest term frequency for each term, so that we can later
+                # bound how much the term can contribute to a document's score.
+                if term_frequency > self.__max_term_frequencies[term_id]:
+                    self.__max_term_frequencies[term_id] = term_frequency
+
                 # Append the posting to the posting list. The posting lists
                 # must be kept sorted so that we can efficiently traverse and
                 # merge them when querying the inverted index.
@@ -103,11 +170,74 @@ class InMemoryInvertedIndex(InvertedIndex):
         for posting_list in self.__posting_lists:
             posting_list.finalize_postings()
 
+    def __build_index_in_parallel(self, fields: List[str], workers: int) -> None:
+        # Only ship the raw field contents to the workers, not the document objects.
+        documents = ((document.document_id, [document.get_field(f, "") for f in fields]) for document in self.__corpus)
+        partitions = iter(lambda: list(itertools.islice(documents, __class__._PARTITION_SIZE)), [])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = deque()
+            for partition in partitions:
+                futures.append(executor.submit(__class__._build_segment, partition, self.__normalizer, self.__tokenizer))
+                if len(futures) >= 2 * workers:
+                    self.__merge_segment(*futures.popleft().result())
+            while futures:
+                self.__merge_segment(*futures.popleft().result())
+
+        # Implementations may or may not need to tie up any loose ends.
+        for posting_list in self.__posting_lists:
+            posting_list.finalize_postings()
+
+    def __merge_segment(self, segment: Dict[str, Tuple[array, array]], document_lengths: List[Tuple[int, int]]) -> None:
+        # The partitions are contiguous and the segments are merged in partition order, so the posting
+        # lists stay sorted. Terms get their identifiers in the same order as when indexing serially.
+        for (document_id, document_length) in document_lengths:
+            self.__set_document_length(document_id, document_length)
+        for (term, (document_ids, term_frequencies)) in segment.items():
+            term_id = self.__dictionary.add_if_absent(term)
+            if term_id >= len(self.__posting_lists):
+                assert term_id == len(self.__posting_lists)
+                self.__posting_lists.append(self.__posting_list_factory())
+                self.__max_term_frequencies.append(0)
+            self.__max_term_frequencies[term_id] = max(self.__max_term_frequencies[term_id], max(term_frequencies))
+            self.__posting_lists[term_id].append_many(document_ids, term_frequencies)
+
+    def __set_document_length(self, document_id: int, document_length: int) -> None:
+        if document_id >= len(self.__document_lengths):
+            self.__document_lengths.extend(itertools.repeat(0, document_id + 1 - len(self.__document_lengths)))
+        self.__document_lengths[document_id] = document_length
+
+    @staticmethod
+    def _build_segment(documents: List[Tuple[int, List[str]]], normalizer: Normalizer,
+                       tokenizer: Tokenizer) -> Tuple[Dict[str, Tuple[array, array]], List[Tuple[int, int]]]:
+        """
+        Indexes a contiguous range of documents, given as (document identifier, field contents) pairs.
+        Returns a segment that maps each term to the aligned (document identifiers, term frequencies)
+        columns of its postings, together with the (document identifier, document length) pairs for the
+        range. Terms appear in the segment in the order they were first seen. Runs in a worker process.
+        """
+        segment = {}
+        document_lengths = []
+        for (document_id, buffers) in documents:
+            all_terms = itertools.chain.from_iterable(__class__._get_terms(buffer, normalizer, tokenizer) for buffer in buffers)
+            term_frequencies = Counter(all_terms)
+            document_lengths.append((document_id, sum(term_frequencies.values())))
+            for (term, term_frequency) in term_frequencies.items():
+                columns = segment.get(term)
+                if columns is None:
+                    columns = segment[term] = (array("I"), array("I"))
+                columns[0].append(document_id)
+                columns[1].append(term_frequency)
+        return (segment, document_lengths)
+
+    @staticmethod
+    def _get_terms(buffer: str, normalizer: Normalizer, tokenizer: Tokenizer) -> Iterator[str]:
+        tokens = tokenizer.split(normalizer.canonicalize(buffer))
+        return (normalizer.normalize(t) for t in tokens)
+
     def get_terms(self, buffer: str) -> Iterator[str]:
         # In a serious large-scale application there could be field-specific tokenizers.
         # We choose to keep it simple here.
-        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
-        return (self.__normalizer.normalize(t) for t in tokens)
+        return __class__._get_terms(buffer, self.__normalizer, self.__tokenizer)
 
     def get_postings_iterator(self, term: str) -> Iterator[Posting]:
         # Assume that everything fits in memory. This would not be the case in a serious
@@ -121,3 +251,173 @@ class InMemoryInvertedIndex(InvertedIndex):
         # themselves. Imagine if the posting lists don't even reside in memory!
         term_id = self.__dictionary.get_term_id(term)
         return 0 if term_id is None else self.__posting_lists[term_id].get_length()
+
+    def get_max_term_frequency(self, term: str) -> int:
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__max_term_frequencies[term_id]
+
+    def get_posting_list(self, term: str) -> Optional[PostingList]:
+        term_id = self.__dictionary.get_term_id(term)
+        return None if term_id is None else self.__posting_lists[term_id]
+
+    def get_document_lengths(self) -> Optional[Sequence[int]]:
+        return self.__document_lengths
+
+    def save(self, filename: str) -> None:
+        """
+        Persists the inverted index to the given file, so that it can later be opened as
+        an OnDiskInvertedIndex without having to reindex the corpus.
+        """
+        OnDiskInvertedIndex.write(filename, ((term, iter(self.__posting_lists[term_id])) for (term, term_id) in self.__dictionary),
+                                  self.__document_lengths)
+
+
+class OnDiskInvertedIndex(InvertedIndex):
+    """
+    An inverted index that has been persisted to a single binary file, and that is memory-mapped
+    when opened. Opening the index only requires loading the dictionary. The posting lists are
+    decoded straight out of the mapped buffer as they are traversed, and the operating system's
+    page cache is shared between all processes that have the same file open.
+
+    The file consists of a header that identifies the file format and its version, the dictionary as
+    a blob of zero-terminated strings in term identifier order, a table holding the (document frequency,
+    maximum term frequency, offset, length) tuple for each term, all the posting lists, and finally the
+    document lengths, if these were recorded. The posting lists are compressed the same way as
+    CompressedInMemoryPostingList does it, using variable-byte encoding. All sections start on
+    4-byte boundaries, so that the table can be viewed as an array without copying it. Integers
+    are stored in native byte order, so files are not portable across architectures.
+    """
+
+    # Identifies the file format.
+    _MAGIC = b"in3120ii"
+
+    # The version of the file format. Bump it whenever the layout changes.
+    _VERSION = 2
+
+    # The number of 32-bit integers per term in the table.
+    _TABLE_WIDTH = 4
+
+    # The size of the header, i.e., the magic number followed by six 32-bit integers.
+    _HEADER_SIZE = 32
+
+    def __init__(self, filename: str, normalizer: Normalizer, tokenizer: Tokenizer):
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        with open(filename, "rb") as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__buffer = memoryview(self.__mmap)
+        assert self.__buffer[:len(__class__._MAGIC)] == __class__._MAGIC, "Not an inverted index file"
+        (byte_order_mark, version, term_count, dictionary_length, document_count, document_lengths_offset) = \
+            self.__buffer[len(__class__._MAGIC):__class__._HEADER_SIZE].cast("I")
+        assert byte_order_mark == 1, "Inverted index file was written on an incompatible architecture"
+        assert version == __class__._VERSION, "Inverted index file has an unsupported format version"
+        table_offset = __class__._HEADER_SIZE + __class__.__align(dictionary_length)
+        postings_offset = table_offset + __class__._TABLE_WIDTH * 4 * term_count
+        self.__table = self.__buffer[table_offset:postings_offset].cast("I")
+        self.__postings = self.__buffer[postings_offset:(document_lengths_offset or len(self.__buffer))]
+        self.__document_lengths = None  # Indexed by document identifier. Not all files have them.
+        if document_lengths_offset:
+            self.__document_lengths = self.__buffer[document_lengths_offset:(document_lengths_offset + 4 * document_count)].cast("I")
+        self.__dictionary = InMemoryDictionary()
+        if term_count > 0:
+            blob = self.__buffer[__class__._HEADER_SIZE:(__class__._HEADER_SIZE + dictionary_length)]
+            for term in str(blob, "utf-8").split("\0"):
+                self.__dictionary.add_if_absent(term)
+        assert self.__dictionary.size() == term_count
+
+    @staticmethod
+    def write(filename: str, postings: Iterable[Tuple[str, Iterator[Posting]]],
+              document_lengths: Optional[Sequence[int]] = None) -> None:
+        """
+        Writes the given (term, postings) pairs to the given file, so that the file can later be
+        opened as an OnDiskInvertedIndex. The terms must be unique, and the postings for each term
+        must be sorted by document identifier. The document lengths, if given, are indexed by
+        document identifier.
+        """
+        terms = []
+        table = array("I")
+        data = bytearray()
+        for (term, iterator) in postings:
+            assert "\0" not in term
+            posting_list = CompressedInMemoryPostingList(VariableByteCodec())
+            max_term_frequency = 0
+            for posting in iterator:
+                posting_list.append_posting(posting)
+                max_term_frequency = max(max_term_frequency, posting.term_frequency)
+            posting_list.finalize_postings()
+            buffer = posting_list.get_buffer()
+            table.extend((posting_list.get_length(), max_term_frequency, len(data), len(buffer)))
+            data.extend(buffer)
+            terms.append(term)
+        dictionary = "\0".join(terms).encode("utf-8")
+        document_count = 0 if document_lengths is None else len(document_lengths)
+        postings_offset = __class__._HEADER_SIZE + __class__.__align(len(dictionary)) + 4 * len(table)
+        document_lengths_offset = 0 if document_lengths is None else __class__.__align(postings_offset + len(data))
+        with open(filename, "wb") as file:
+            file.write(__class__._MAGIC)
+            file.write(array("I", (1, __class__._VERSION, len(terms), len(dictionary),
+                                   document_count, document_lengths_offset)).tobytes())
+            file.write(dictionary)
+            file.write(bytes(__class__.__align(len(dictionary)) - len(dictionary)))
+            file.write(table.tobytes())
+            file.write(data)
+            if document_lengths is not None:
+                file.write(bytes(document_lengths_offset - postings_offset - len(data)))
+                file.write(array("I", document_lengths).tobytes())
+
+    @staticmethod
+    def is_compatible(filename: str) -> bool:
+        """
+        Returns True iff the given file holds an inverted index that can be opened, i.e., one that has
+        been written using the current file format version, on an architecture like this one.
+        """
+        with open(filename, "rb") as file:
+            header = file.read(__class__._HEADER_SIZE)
+        if len(header) < __class__._HEADER_SIZE or header[:len(__class__._MAGIC)] != __class__._MAGIC:
+            return False
+        (byte_order_mark, version) = memoryview(header)[len(__class__._MAGIC):].cast("I")[:2]
+        return byte_order_mark == 1 and version == __class__._VERSION
+
+    @staticmethod
+    def __align(size: int) -> int:
+        """
+        Rounds the given size up to the nearest 4-byte boundary.
+        """
+        return (size + 3) & ~3
+
+    def close(self) -> None:
+        """
+        Unmaps the underlying file. Any posting list iterators obtained from the index must have
+        been discarded first.
+        """
+        self.__table.release()
+        self.__postings.release()
+        if self.__document_lengths is not None:
+            self.__document_lengths.release()
+        self.__buffer.release()
+        self.__mmap.close()
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self.__tokenizer.split(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        term_id = self.__dictionary.get_term_id(term)
+        if term_id is None:
+            return iter([])
+        start = __class__._TABLE_WIDTH * term_id
+        (document_frequency, _, offset, length) = self.__table[start:(start + __class__._TABLE_WIDTH)]
+        data = self.__postings[offset:(offset + length)]
+        return CompressedInMemoryPostingList.CompressedInMemoryPostingListIterator(data, document_frequency, VariableByteCodec())
+
+    def get_document_frequency(self, term: str) -> int:
+        # Stored explicitly in the table, so no need to touch the posting list itself.
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__table[__class__._TABLE_WIDTH * term_id]
+
+    def get_max_term_frequency(self, term: str) -> int:
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__table[__class__._TABLE_WIDTH * term_id + 1]
+
+    def get_document_lengths(self) -> Optional[Sequence[int]]:
+        return self.__document_lengths
@@ -85,7 +85,7 @@ class NaiveBayesClassifier:
         terms as they appear. Both the documents in the training set and the buffers
         we classify need to be identically processed.
         """
-        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        tokens = self.__tokenizer.split(self.__normalizer.canonicalize(buffer))
         return (self.__normalizer.normalize(t) for t in tokens)
 
     def classify(self, buffer: str) -> Iterator[Dict[str, Any]]:
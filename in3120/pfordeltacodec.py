@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from .integercodec import IntegerCodec
+from .variablebytecodec import VariableByteCodec
+from typing import Iterable, List, Tuple
+
+
+class PForDeltaCodec(IntegerCodec):
+    """
+    An encoder/decoder for patched frame-of-reference encoding, as applied to gaps. See
+    https://dl.acm.org/doi/10.1145/1526709.1526764 for details.
+
+    All numbers in a frame are packed into b bits each, where b is chosen so that the large
+    majority of the numbers fit. The few numbers that don't fit are exceptions, and get their
+    remaining high bits patched in from a list that follows the packed bits. The frame layout is
+    the bit width b in a single byte, the number of exceptions, the packed bits padded with zeros up
+    to the nearest byte boundary, and then the (position gap, high bits) pair of every exception.
+    All numbers except b are variable-byte encoded.
+    """
+
+    def encode_many(self, numbers: Iterable[int], destination: bytearray) -> int:
+        assert destination is not None
+        numbers = list(numbers)
+        assert all(number >= 0 for number in numbers)
+        width = self.__choose_width(numbers)
+        mask = (1 << width) - 1
+        exceptions = [i for i in range(len(numbers)) if numbers[i] > mask]
+        frame = bytearray((width,))
+        VariableByteCodec.encode(len(exceptions), frame)
+        if width > 0:
+            bits = "".join(format(number & mask, "0%db" % width) for number in numbers)
+            length = (len(bits) + 7) // 8
+            frame.extend(int(bits + "0" * (8 * length - len(bits)), 2).to_bytes(length, "big"))
+        previous = 0
+        for i in exceptions:
+            VariableByteCodec.encode_many((i - previous, numbers[i] >> width), frame)
+            previous = i
+        destination.extend(frame)
+        return len(frame)
+
+    def decode_many(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        view = memoryview(source)
+        width = view[start]
+        (exception_count, increment) = VariableByteCodec.decode(view[(start + 1):], 0)
+        where = start + 1 + increment
+        if width > 0:
+            length = (count * width + 7) // 8
+            bits = bin(int.from_bytes(view[where:(where + length)], "big"))[2:].zfill(8 * length)
+            numbers = [int(bits[i:(i + width)], 2) for i in range(0, count * width, width)]
+            where += length
+        else:
+            numbers = [0] * count
+        (patches, increment) = VariableByteCodec.decode_many(view[where:], 0, 2 * exception_count)
+        where += increment
+        position = 0
+        for i in range(0, len(patches), 2):
+            position += patches[i]
+            numbers[position] |= patches[i + 1] << width
+        return (numbers, where - start)
+
+    @staticmethod
+    def __choose_width(numbers: List[int]) -> int:
+        """
+        Chooses the bit width that minimizes the estimated size of the frame, trading off the
+        size of the packed bits against the number of exceptions we'd have to patch.
+        """
+        ordered = sorted(numbers)
+        widest = ordered[-1].bit_length() if ordered else 0
+        best_width, best_size = widest, len(ordered) * widest
+        for width in range(0, widest):
+            exceptions = len(ordered) - bisect_left(ordered, 1 << width)
+            size = len(ordered) * width + 8 * 3 * exceptions
+            if size < best_size:
+                best_width, best_size = width, size
+        return best_width
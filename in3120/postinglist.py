@@ -2,9 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, chain
+from operator import length_hint
 from .posting import Posting
+from .integercodec import IntegerCodec
 from .variablebytecodec import VariableByteCodec
-from typing import Iterator, List
+from typing import Iterator, List, Optional, Sequence, Tuple
 
 
 class PostingList(ABC):
@@ -12,6 +17,8 @@ class PostingList(ABC):
     Abstract base class for a simple posting list.
     """
 
+    __slots__ = ()
+
     def __iter__(self):
         return self.get_iterator()
 
@@ -39,6 +46,17 @@ class PostingList(ABC):
         """
         pass
 
+    def append_many(self, document_ids: Sequence[int], term_frequencies: Sequence[int]) -> None:
+        """
+        Appends a batch of postings to the posting list, given as aligned columns of document
+        identifiers and term frequencies. The document identifiers must be sorted. Same as
+        appending the postings one by one, but implementations can do it without materializing
+        any Posting objects.
+        """
+        assert len(document_ids) == len(term_frequencies)
+        for posting in map(Posting, document_ids, term_frequencies):
+            self.append_posting(posting)
+
     @abstractmethod
     def finalize_postings(self) -> None:
         """
@@ -67,57 +85,455 @@ class InMemoryPostingList(PostingList):
         assert len(self.__postings) == 0 or self.__postings[-1].document_id < posting.document_id
         self.__postings.append(posting)
 
+    def append_many(self, document_ids: Sequence[int], term_frequencies: Sequence[int]) -> None:
+        assert len(document_ids) == len(term_frequencies)
+        assert len(self.__postings) == 0 or len(document_ids) == 0 or self.__postings[-1].document_id < document_ids[0]
+        self.__postings.extend(map(Posting, document_ids, term_frequencies))
+
+    def finalize_postings(self) -> None:
+        pass
+
+
+class ArrayPostingList(PostingList):
+    """
+    An in-memory implementation of a posting list that stores the document identifiers and
+    the term frequencies column-wise in two parallel typed arrays, instead of keeping one
+    Posting object per entry around. This is an order of magnitude more compact than
+    InMemoryPostingList.
+
+    Posting objects are only materialized on the fly if the posting list is iterated over.
+    Clients that can work with the raw columns directly should use get_arrays() instead.
+    """
+
+    class ArrayPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that lazily materializes Posting objects from the underlying
+        arrays as we traverse them.
+        """
+
+        def __init__(self, document_ids: array, term_frequencies: array):
+            self.__document_ids = document_ids  # The column holding all document identifiers.
+            self.__term_frequencies = term_frequencies  # The column holding all term frequencies.
+            self.__where = 0  # Our current position in the arrays.
+
+        def __next__(self) -> Posting:
+            if self.__where < len(self.__document_ids):
+                posting = Posting(self.__document_ids[self.__where], self.__term_frequencies[self.__where])
+                self.__where += 1
+                return posting
+            else:
+                raise StopIteration
+
+        def __length_hint__(self) -> int:
+            return len(self.__document_ids) - self.__where
+
+        def skip_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Advances the iterator to the first posting having a document identifier greater than or
+            equal to the given one, and returns it. Returns None if there is no such posting. Postings
+            we skip over are never materialized.
+            """
+            self.__where = ArrayPostingList.gallop(self.__document_ids, document_id, self.__where)
+            return next(self, None)
+
+        def get_arrays(self) -> Tuple[array, array, int]:
+            """
+            Returns the (document identifiers, term frequencies) columns that the iterator traverses,
+            together with our current position in them. Lets clients that are handed an iterator work
+            with the raw columns directly. Clients must treat the arrays as read-only.
+            """
+            return self.__document_ids, self.__term_frequencies, self.__where
+
+    def __init__(self):
+        self.__document_ids = array("I")  # The document identifiers, sorted in ascending order.
+        self.__term_frequencies = array("I")  # The term frequencies, aligned with the document identifiers.
+
+    def get_length(self) -> int:
+        return len(self.__document_ids)
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.ArrayPostingListIterator(self.__document_ids, self.__term_frequencies)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert len(self.__document_ids) == 0 or self.__document_ids[-1] < posting.document_id
+        self.__document_ids.append(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+
+    def append_many(self, document_ids: Sequence[int], term_frequencies: Sequence[int]) -> None:
+        assert len(document_ids) == len(term_frequencies)
+        assert len(self.__document_ids) == 0 or len(document_ids) == 0 or self.__document_ids[-1] < document_ids[0]
+        self.__document_ids.extend(document_ids)
+        self.__term_frequencies.extend(term_frequencies)
+
     def finalize_postings(self) -> None:
         pass
 
+    def get_arrays(self) -> Tuple[array, array]:
+        """
+        Returns the (document identifiers, term frequencies) columns that make up the posting
+        list, without materializing any Posting objects. The arrays are aligned, i.e., entry i in
+        both arrays together make up posting i. Clients must treat the arrays as read-only.
+        """
+        return self.__document_ids, self.__term_frequencies
+
+    @staticmethod
+    def gallop(document_ids: Sequence[int], document_id: int, start: int) -> int:
+        """
+        Returns the position of the first entry at or after the given start position in the sorted
+        column of document identifiers that is greater than or equal to the given document identifier,
+        or the length of the column if there is no such entry.
+
+        Uses galloping search, i.e., exponential search followed by binary search, so that short
+        skips are cheap even if the posting list is long.
+        """
+        bound = 1
+        while start + bound < len(document_ids) and document_ids[start + bound] < document_id:
+            bound *= 2
+        return bisect_left(document_ids, document_id, start + bound // 2, min(start + bound + 1, len(document_ids)))
+
 
 class CompressedInMemoryPostingList(PostingList):
     """
     A simple in-memory implementation of a compressed posting list. Combines simple gap encoding
-    with variable-byte encoding.
+    with an integer codec, by default variable-byte encoding.
+
+    Postings are compressed a chunk at a time, where each chunk is a single codec frame that
+    holds all the gaps in the chunk followed by all the term frequencies. All chunks but the last
+    one are full. The iterator decompresses a whole chunk in one go, and also covers the postings
+    not yet flushed. If we append to a partial chunk that has been flushed, the chunk is first
+    decompressed back into the pending postings.
     """
 
+    __slots__ = ("__codec", "__logical_length", "__previous_document_id", "__flushed_document_id", "__data", "__tail",
+                 "__pending")
+
     class CompressedInMemoryPostingListIterator(Iterator[Posting]):
         """
         A custom iterator that decodes the compressed integers as we traverse the underlying byte
-        array. The decoding logic needs to mirror the encoding logic that happens when postings are
-        appended to the byte array.
+        array. The decoding logic needs to mirror the encoding logic that happens when chunks are
+        flushed to the byte array.
+
+        For speed, a whole chunk of postings is decoded in one go whenever we run dry.
         """
 
-        def __init__(self, data: bytearray):
+        def __init__(self, data: bytearray, length: int, codec: IntegerCodec,
+                     pending: Optional[Tuple[Sequence[int], Sequence[int]]] = None):
             self.__data = data  # The buffer holding all the compressed posting data.
+            self.__codec = codec  # How the chunks in the buffer were compressed.
             self.__where = 0  # Our current position in the buffer.
+            self.__remaining = length  # The number of postings in the buffer not yet decoded.
             self.__document_id = 0  # We encoded the gaps, so accumulate them when decoding.
+            self.__postings = iter([])  # The postings we decoded most recently, not yet consumed.
+            self.__pending = pending  # The (document identifiers, term frequencies) that follow the buffer, if any.
 
         def __next__(self) -> Posting:
-            if self.__where < len(self.__data):
-                (gap, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                self.__document_id += gap
-                (term_frequency, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                return Posting(self.__document_id, term_frequency)
+            posting = next(self.__postings, None)
+            if posting is None:
+                if self.__remaining > 0:
+                    self.__decode_chunk()
+                elif self.__pending:
+                    self.__postings = iter(list(map(Posting, *self.__pending)))
+                    self.__pending = None
+                else:
+                    raise StopIteration
+                posting = next(self.__postings)
+            return posting
+
+        def __length_hint__(self) -> int:
+            return self.__remaining + length_hint(self.__postings) + (len(self.__pending[0]) if self.__pending else 0)
+
+        def __decode_chunk(self) -> None:
+            """
+            Decodes the next chunk of postings from the buffer.
+            """
+            count = min(self.__remaining, CompressedInMemoryPostingList._CHUNK_SIZE)
+            (numbers, increment) = self.__codec.decode_many(self.__data, self.__where, 2 * count)
+            gaps = numbers[:count]
+            gaps[0] += self.__document_id  # The first gap is relative to the previous chunk.
+            document_ids = list(accumulate(gaps))
+            self.__where += increment
+            self.__remaining -= count
+            self.__document_id = document_ids[-1]
+            self.__postings = iter(list(map(Posting, document_ids, numbers[count:])))
+
+    # How many postings we compress together as a single frame.
+    _CHUNK_SIZE = 256
+
+    def __init__(self, codec: Optional[IntegerCodec] = None):
+        self.__codec = codec or VariableByteCodec()  # How chunks get compressed.
+        self.__logical_length = 0  # The number of posting entries, including the ones not yet flushed.
+        self.__previous_document_id = 0  # So that we can verify that the postings are sorted.
+        self.__flushed_document_id = 0  # The last document identifier in the flushed chunks, so that we can gap encode.
+        self.__data = bytearray()  # All flushed chunks, compressed.
+        self.__tail = 0  # Where in the buffer the last flushed chunk starts.
+        self.__pending = None  # The (document identifiers, term frequencies) not yet flushed, if any.
+
+    def get_length(self) -> int:
+        return self.__logical_length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        # Don't flush the pending postings, as the client might append more. Iterate over a snapshot of them.
+        if self.__pending is None:
+            return __class__.CompressedInMemoryPostingListIterator(self.__data, self.__logical_length, self.__codec)
+        (document_ids, term_frequencies) = self.__pending
+        flushed = self.__logical_length - len(document_ids)
+        pending = (array("I", document_ids), array("I", term_frequencies))
+        return __class__.CompressedInMemoryPostingListIterator(self.__data, flushed, self.__codec, pending)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
+        if self.__pending is None:
+            self.__open_chunk()
+        self.__pending[0].append(posting.document_id)
+        self.__pending[1].append(posting.term_frequency)
+        self.__logical_length += 1
+        self.__previous_document_id = posting.document_id
+        if len(self.__pending[0]) == __class__._CHUNK_SIZE:
+            self.__flush_chunk()
+
+    def append_many(self, document_ids: Sequence[int], term_frequencies: Sequence[int]) -> None:
+        assert len(document_ids) == len(term_frequencies)
+        assert self.__logical_length == 0 or len(document_ids) == 0 or document_ids[0] > self.__previous_document_id
+        (i, length) = (0, len(document_ids))
+        while i < length:
+            if self.__pending is None:
+                self.__open_chunk()
+            count = min(__class__._CHUNK_SIZE - len(self.__pending[0]), length - i)
+            if count == length:
+                self.__pending[0].extend(document_ids)  # The common case, where it all fits in the pending chunk.
+                self.__pending[1].extend(term_frequencies)
             else:
-                raise StopIteration
+                self.__pending[0].extend(document_ids[i:(i + count)])
+                self.__pending[1].extend(term_frequencies[i:(i + count)])
+            i += count
+            self.__logical_length += count
+            if len(self.__pending[0]) == __class__._CHUNK_SIZE:
+                self.__flush_chunk()
+        if length:
+            self.__previous_document_id = document_ids[-1]
 
-    def __init__(self):
-        self.__logical_length = 0  # The number of posting entries encoded in the byte array.
+    def finalize_postings(self) -> None:
+        self.__flush_chunk()
+
+    def get_size_in_bytes(self) -> int:
+        """
+        Returns the number of bytes the compressed postings occupy, not counting any overhead
+        or postings not yet flushed.
+        """
+        return len(self.__data)
+
+    def get_buffer(self) -> bytearray:
+        """
+        Returns the buffer holding the compressed postings, e.g., so that it can be persisted and
+        later be traversed by an iterator of our own. Clients must treat the buffer as read-only,
+        and should finalize the posting list first.
+        """
+        return self.__data
+
+    def __open_chunk(self) -> None:
+        """
+        Sets up the pending postings, so that we can append to them. If the last flushed chunk is
+        partial, e.g., because the client finalized and then appended more postings, then we
+        decompress it and make its postings pending again so that all chunks but the last stay full.
+        """
+        count = self.__logical_length % __class__._CHUNK_SIZE
+        if count == 0:
+            self.__pending = (array("I"), array("I"))
+            return
+        (numbers, _) = self.__codec.decode_many(self.__data, self.__tail, 2 * count)
+        gaps = numbers[:count]
+        gaps[0] += self.__flushed_document_id - sum(gaps)  # The first gap is relative to the chunk before.
+        document_ids = array("I", accumulate(gaps))
+        del self.__data[self.__tail:]
+        self.__flushed_document_id = document_ids[0] - numbers[0]
+        self.__pending = (document_ids, array("I", numbers[count:]))
+
+    def __flush_chunk(self) -> None:
+        """
+        Compresses the pending postings, if any, into a new chunk.
+        """
+        if self.__pending is None:
+            return
+        (document_ids, term_frequencies) = self.__pending
+        gaps = [b - a for (a, b) in zip(chain((self.__flushed_document_id,), document_ids), document_ids)]
+        self.__tail = len(self.__data)
+        self.__codec.encode_many(chain(gaps, term_frequencies), self.__data)
+        self.__flushed_document_id = document_ids[-1]
+        self.__pending = None
+
+
+class BlockCompressedInMemoryPostingList(PostingList):
+    """
+    A simple in-memory implementation of a compressed posting list, where the postings are
+    grouped into fixed-size blocks that are compressed independently of each other. Within
+    a block we combine simple gap encoding with an integer codec, by default variable-byte
+    encoding. Each block is a single codec frame, with all the gaps preceding all the term
+    frequencies.
+
+    For each block we keep a small uncompressed header that holds the last document identifier
+    in the block and where in the byte array the block starts. These headers act as skip pointers,
+    and allow us to jump over whole blocks without decoding them. See Section 2.3 in
+    https://nlp.stanford.edu/IR-book/pdf/02voc.pdf for details.
+
+    All blocks but the last one are full. If we append to a partial block that has been flushed,
+    the block is first decompressed back into the pending postings.
+    """
+
+    class BlockCompressedInMemoryPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that decodes one block at a time as we traverse the underlying byte
+        array. The decoding logic needs to mirror the encoding logic that happens when blocks are
+        flushed to the byte array.
+        """
+
+        def __init__(self, data: bytearray, offsets: array, last_document_ids: array, block_size: int, length: int,
+                     codec: IntegerCodec):
+            self.__data = data  # The buffer holding all the compressed blocks.
+            self.__codec = codec  # How the blocks in the buffer were compressed.
+            self.__offsets = offsets  # Where in the buffer each block starts.
+            self.__last_document_ids = last_document_ids  # The last document identifier in each block.
+            self.__block_size = block_size  # The number of postings in all blocks but the last one.
+            self.__length = length  # The total number of postings across all blocks.
+            self.__block = -1  # The block we have currently decoded, if any.
+            self.__document_ids = []  # The decoded document identifiers of the current block.
+            self.__term_frequencies = []  # The decoded term frequencies of the current block.
+            self.__where = 0  # Our current position in the current block.
+
+        def __next__(self) -> Posting:
+            if self.__where == len(self.__document_ids):
+                if self.__block + 1 >= len(self.__offsets):
+                    raise StopIteration
+                self.__decode_block(self.__block + 1)
+            posting = Posting(self.__document_ids[self.__where], self.__term_frequencies[self.__where])
+            self.__where += 1
+            return posting
+
+        def __length_hint__(self) -> int:
+            if self.__block < 0:
+                return self.__length
+            return max(0, self.__length - self.__block * self.__block_size - self.__where)
+
+        def __decode_block(self, block: int) -> None:
+            """
+            Decodes the given block, and positions the iterator at the start of it.
+            """
+            count = min(self.__block_size, self.__length - block * self.__block_size)
+            previous_document_id = self.__last_document_ids[block - 1] if block > 0 else 0
+            (numbers, _) = self.__codec.decode_many(self.__data, self.__offsets[block], 2 * count)
+            self.__block = block
+            gaps = numbers[:count]
+            gaps[0] += previous_document_id  # The first gap is relative to the previous block.
+            self.__document_ids = list(accumulate(gaps))
+            self.__term_frequencies = numbers[count:]
+            self.__where = 0
+
+        def skip_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Advances the iterator to the first posting having a document identifier greater than or
+            equal to the given one, and returns it. Returns None if there is no such posting. Blocks
+            that cannot contain the document identifier are jumped over without being decoded.
+            """
+            if self.__where == len(self.__document_ids) or self.__document_ids[-1] < document_id:
+                block = bisect_left(self.__last_document_ids, document_id, self.__block + 1)
+                if block >= len(self.__offsets):
+                    self.__block = len(self.__offsets)
+                    self.__document_ids = []
+                    self.__term_frequencies = []
+                    self.__where = 0
+                    return None
+                self.__decode_block(block)
+            self.__where = bisect_left(self.__document_ids, document_id, self.__where)
+            return next(self, None)
+
+    def __init__(self, block_size: int = 128, codec: Optional[IntegerCodec] = None):
+        assert block_size > 0
+        self.__block_size = block_size  # The number of postings per block.
+        self.__codec = codec or VariableByteCodec()  # How blocks get compressed.
+        self.__logical_length = 0  # The number of posting entries, including the ones not yet flushed.
         self.__previous_document_id = 0  # So that we can gap encode.
-        self.__data = bytearray()  # All posting entries, compressed.
+        self.__data = bytearray()  # All flushed blocks, compressed.
+        self.__offsets = array("I")  # Where in the byte array each block starts.
+        self.__last_document_ids = array("I")  # The last document identifier in each block.
+        self.__pending_document_ids = array("I")  # The document identifiers not yet flushed.
+        self.__pending_term_frequencies = array("I")  # The term frequencies not yet flushed.
 
     def get_length(self) -> int:
         return self.__logical_length
 
     def get_iterator(self) -> Iterator[Posting]:
-        return __class__.CompressedInMemoryPostingListIterator(self.__data)
+        # Not strictly needed if the client has remembered to finalize, but be lenient. A partial
+        # block is only allowed at the very end, so a block flushed here must be the last one.
+        self.__flush_block()
+        return __class__.BlockCompressedInMemoryPostingListIterator(self.__data, self.__offsets,
+                                                                     self.__last_document_ids,
+                                                                     self.__block_size, self.__logical_length,
+                                                                     self.__codec)
 
     def append_posting(self, posting: Posting) -> None:
         assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
-        gap = posting.document_id - self.__previous_document_id
-        VariableByteCodec.encode(gap, self.__data)
-        VariableByteCodec.encode(posting.term_frequency, self.__data)
+        if not self.__pending_document_ids and self.__logical_length % self.__block_size:
+            self.__reopen_block()
+        assert self.__logical_length == len(self.__offsets) * self.__block_size + len(self.__pending_document_ids)
+        self.__pending_document_ids.append(posting.document_id)
+        self.__pending_term_frequencies.append(posting.term_frequency)
         self.__logical_length += 1
         self.__previous_document_id = posting.document_id
+        if len(self.__pending_document_ids) == self.__block_size:
+            self.__flush_block()
+
+    def append_many(self, document_ids: Sequence[int], term_frequencies: Sequence[int]) -> None:
+        assert len(document_ids) == len(term_frequencies)
+        assert self.__logical_length == 0 or len(document_ids) == 0 or document_ids[0] > self.__previous_document_id
+        if document_ids and not self.__pending_document_ids and self.__logical_length % self.__block_size:
+            self.__reopen_block()
+        i = 0
+        while i < len(document_ids):
+            count = min(self.__block_size - len(self.__pending_document_ids), len(document_ids) - i)
+            self.__pending_document_ids.extend(document_ids[i:(i + count)])
+            self.__pending_term_frequencies.extend(term_frequencies[i:(i + count)])
+            self.__logical_length += count
+            self.__previous_document_id = self.__pending_document_ids[-1]
+            i += count
+            if len(self.__pending_document_ids) == self.__block_size:
+                self.__flush_block()
 
     def finalize_postings(self) -> None:
-        pass
+        self.__flush_block()
+
+    def get_size_in_bytes(self) -> int:
+        """
+        Returns the number of bytes the compressed blocks occupy, not counting the block headers
+        or any postings not yet flushed.
+        """
+        return len(self.__data)
+
+    def __reopen_block(self) -> None:
+        """
+        Decompresses the last block, which is partial, and makes its postings pending again. That way
+        all blocks but the last one stay full, e.g., if the client finalized and then appended more.
+        """
+        count = self.__logical_length % self.__block_size
+        offset = self.__offsets.pop()
+        self.__last_document_ids.pop()
+        previous_document_id = self.__last_document_ids[-1] if self.__last_document_ids else 0
+        (numbers, _) = self.__codec.decode_many(self.__data, offset, 2 * count)
+        gaps = numbers[:count]
+        gaps[0] += previous_document_id  # The first gap is relative to the previous block.
+        self.__pending_document_ids = array("I", accumulate(gaps))
+        self.__pending_term_frequencies = array("I", numbers[count:])
+        del self.__data[offset:]
+
+    def __flush_block(self) -> None:
+        """
+        Compresses the pending postings, if any, into a new block.
+        """
+        if not self.__pending_document_ids:
+            return
+        previous_document_id = self.__last_document_ids[-1] if self.__last_document_ids else 0
+        self.__offsets.append(len(self.__data))
+        self.__last_document_ids.append(self.__pending_document_ids[-1])
+        gaps = [b - a for (a, b) in zip(chain((previous_document_id,), self.__pending_document_ids),
+                                         self.__pending_document_ids)]
+        self.__codec.encode_many(chain(gaps, self.__pending_term_frequencies), self.__data)
+        self.__pending_document_ids = array("I")
+        self.__pending_term_frequencies = array("I")
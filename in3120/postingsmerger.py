@@ -1,13 +1,22 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from typing import Iterator
+import heapq
+import sys
+from operator import length_hint
+from array import array
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from .posting import Posting
+from .postinglist import ArrayPostingList
 
 
 class PostingsMerger:
     """
     Utility class for merging posting lists.
+
+    If the iterators expose the raw columns of their posting lists (i.e., have a get_arrays method,
+    like the iterators of ArrayPostingList do) we merge the columns directly, and only materialize
+    the Posting objects that we yield.
     """
 
     @staticmethod
@@ -17,13 +26,25 @@ class PostingsMerger:
         iterators over these.
 
         The posting lists are assumed sorted in increasing order according
-        to the document identifiers.
+        to the document identifiers. If an iterator supports skipping (i.e., has
+        a skip_to method) we make use of that to avoid visiting postings that
+        cannot be part of the result.
         """
 
+        # Can we work on the raw columns?
+        columns = PostingsMerger.__get_columns([p1, p2])
+        if columns:
+            yield from PostingsMerger.__intersection_of_columns(columns)
+            return
+
         # Start at the head.
         current1 = next(p1, None)
         current2 = next(p2, None)
 
+        # Can we leapfrog, or do we have to crawl?
+        skip1 = getattr(p1, "skip_to", None)
+        skip2 = getattr(p2, "skip_to", None)
+
         # We're doing an AND, so we can abort as soon as we exhaust one of
         # the posting lists.
         while current1 and current2:
@@ -34,9 +55,9 @@ class PostingsMerger:
                 current1 = next(p1, None)
                 current2 = next(p2, None)
             elif current1.document_id < current2.document_id:
-                current1 = next(p1, None)
+                current1 = skip1(current2.document_id) if skip1 else next(p1, None)
             else:
-                current2 = next(p2, None)
+                current2 = skip2(current1.document_id) if skip2 else next(p2, None)
 
     @staticmethod
     def union(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
@@ -48,6 +69,12 @@ class PostingsMerger:
         to the document identifiers.
         """
 
+        # Can we work on the raw columns?
+        columns = PostingsMerger.__get_columns([p1, p2])
+        if columns:
+            yield from PostingsMerger.__union_of_columns(columns)
+            return
+
         # Start at the head.
         current1 = next(p1, None)
         current2 = next(p2, None)
@@ -75,3 +102,148 @@ class PostingsMerger:
         while current2:
             yield current2
             current2 = next(p2, None)
+
+    @staticmethod
+    def intersection_many(iterators: Iterable[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        A generator that yields a simple AND of any number of posting lists, given
+        iterators over these. Yields the postings of the first posting list.
+
+        The posting lists are assumed sorted in increasing order according to the
+        document identifiers. The shortest posting list drives the merge, and the
+        longer ones are made to catch up with it. If an iterator supports skipping
+        (i.e., has a skip_to method) we make use of that to leapfrog postings that
+        cannot be part of the result. Iterators that don't reveal their lengths are
+        assumed to be long.
+        """
+
+        # Start at the head. We can abort as soon as we exhaust one of the posting lists.
+        cursors = list(iterators)
+        if not cursors:
+            return
+
+        # Can we work on the raw columns?
+        columns = PostingsMerger.__get_columns(cursors)
+        if columns:
+            yield from PostingsMerger.__intersection_of_columns(columns)
+            return
+        order = sorted(range(len(cursors)), key=lambda i: length_hint(cursors[i], sys.maxsize))
+        currents = [next(cursor, None) for cursor in cursors]
+        if None in currents:
+            return
+
+        # Can we leapfrog, or do we have to crawl?
+        advancers = [PostingsMerger.__advancer(cursor) for cursor in cursors]
+
+        # The candidate is always the current document of the shortest posting list.
+        driver, followers = order[0], order[1:]
+        while True:
+            candidate = currents[driver].document_id
+            for i in followers:
+                if currents[i].document_id < candidate:
+                    currents[i] = advancers[i](candidate)
+                    if currents[i] is None:
+                        return
+                if currents[i].document_id > candidate:
+                    currents[driver] = advancers[driver](currents[i].document_id)
+                    break
+            else:
+                yield currents[0]
+                currents[driver] = next(cursors[driver], None)
+            if currents[driver] is None:
+                return
+
+    @staticmethod
+    def union_many(iterators: Iterable[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        A generator that yields a simple OR of any number of posting lists, given
+        iterators over these. If several posting lists contain the same document,
+        the posting from the first of these posting lists is yielded.
+
+        The posting lists are assumed sorted in increasing order according to the
+        document identifiers. The posting lists are merged in a single pass using
+        a heap.
+        """
+
+        # Can we work on the raw columns?
+        cursors = list(iterators)
+        columns = PostingsMerger.__get_columns(cursors)
+        if columns:
+            yield from PostingsMerger.__union_of_columns(columns)
+            return
+
+        previous = None
+        for posting in heapq.merge(*cursors, key=lambda p: p.document_id):
+            if previous is None or posting.document_id != previous.document_id:
+                yield posting
+                previous = posting
+
+    @staticmethod
+    def __advancer(cursor: Iterator[Posting]) -> Callable[[int], Optional[Posting]]:
+        """
+        Returns a function that advances the given iterator to the first posting having a
+        document identifier greater than or equal to the given one, and returns that posting.
+        Skips if the iterator supports it, otherwise crawls.
+        """
+        skip_to = getattr(cursor, "skip_to", None)
+        if skip_to:
+            return skip_to
+
+        def crawl(document_id: int) -> Optional[Posting]:
+            for posting in cursor:
+                if posting.document_id >= document_id:
+                    return posting
+            return None
+
+        return crawl
+
+    @staticmethod
+    def __get_columns(cursors: List[Iterator[Posting]]) -> Optional[List[Tuple[array, array, int]]]:
+        """
+        Returns the raw (document identifiers, term frequencies, position) columns of the given iterators,
+        if all of them offer such access. Otherwise, returns None.
+        """
+        get_arrays = [getattr(cursor, "get_arrays", None) for cursor in cursors]
+        return [f() for f in get_arrays] if get_arrays and all(get_arrays) else None
+
+    @staticmethod
+    def __intersection_of_columns(columns: List[Tuple[array, array, int]]) -> Iterator[Posting]:
+        """
+        Does what intersection_many() does, but works directly on the raw columns. The shortest column
+        drives the merge, and the other columns gallop to catch up with it.
+        """
+        document_ids = [c[0] for c in columns]
+        positions = [c[2] for c in columns]
+        if any(positions[i] == len(document_ids[i]) for i in range(len(columns))):
+            return
+        order = sorted(range(len(columns)), key=lambda i: len(document_ids[i]) - positions[i])
+        driver, followers = order[0], order[1:]
+        (driver_document_ids, first_term_frequencies) = (document_ids[driver], columns[0][1])
+        while positions[driver] < len(driver_document_ids):
+            candidate = driver_document_ids[positions[driver]]
+            for i in followers:
+                if document_ids[i][positions[i]] < candidate:
+                    positions[i] = ArrayPostingList.gallop(document_ids[i], candidate, positions[i] + 1)
+                    if positions[i] == len(document_ids[i]):
+                        return
+                if document_ids[i][positions[i]] > candidate:
+                    positions[driver] = ArrayPostingList.gallop(driver_document_ids, document_ids[i][positions[i]],
+                                                                positions[driver] + 1)
+                    break
+            else:
+                yield Posting(candidate, first_term_frequencies[positions[0]])
+                positions[driver] += 1
+
+    @staticmethod
+    def __union_of_columns(columns: List[Tuple[array, array, int]]) -> Iterator[Posting]:
+        """
+        Does what union_many() does, but works directly on the raw columns. Rather than merging the columns
+        one posting at a time, we collect the remaining postings in a dictionary keyed by document identifier
+        and sort the keys. Going through the columns in reverse order means that the posting from the first
+        column wins in case of duplicates.
+        """
+        merged = {}
+        for (document_ids, term_frequencies, position) in reversed(columns):
+            merged.update(zip(document_ids[position:], term_frequencies[position:]))
+        for document_id in sorted(merged):
+            yield Posting(document_id, merged[document_id])
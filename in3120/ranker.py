@@ -2,7 +2,9 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
+from array import array
 from .posting import Posting
+from typing import List, Optional, Sequence, Tuple
 
 
 class Ranker(ABC):
@@ -36,6 +38,48 @@ class Ranker(ABC):
         """
         pass
 
+    def evaluate_many(self, query_terms: List[Tuple[str, int]], document_ids: Sequence[int],
+                      term_indices: Sequence[int], term_frequencies: Sequence[int]) -> array:
+        """
+        Batch version of reset(), update() and evaluate(), for scoring a whole block of documents in one go.
+
+        The unique query terms are given as (term, multiplicity) pairs. Each occurrence of a query term in a
+        document is given by aligned entries in the other sequences, i.e., the document identifier, the index
+        of the query term, and the term frequency. The entries for a document must be contiguous. Returns an
+        array holding the relevancy score of each document, in the order the documents appear.
+
+        This default implementation simply delegates to reset(), update() and evaluate(). Rankers can override
+        it to avoid the per-posting method call overhead.
+        """
+        scores = array("d")
+        previous_document_id = None
+        for (document_id, i, term_frequency) in zip(document_ids, term_indices, term_frequencies):
+            if document_id != previous_document_id:
+                if previous_document_id is not None:
+                    scores.append(self.evaluate())
+                self.reset(document_id)
+                previous_document_id = document_id
+            self.update(query_terms[i][0], query_terms[i][1], Posting(document_id, term_frequency))
+        if previous_document_id is not None:
+            scores.append(self.evaluate())
+        return scores
+
+    def get_upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        """
+        Returns an upper bound on how much the given query term can contribute to any document's
+        relevancy score, given the largest term frequency found in the term's posting list. Enables
+        dynamic pruning, e.g., WAND. Rankers whose scores cannot be decomposed into a sum of
+        per-term contributions, plus a document-specific static part, should return None.
+        """
+        return None
+
+    def get_static_upper_bound(self) -> Optional[float]:
+        """
+        Returns an upper bound on the part of any document's relevancy score that doesn't depend
+        on the query terms, e.g., a static quality score. Returns None if unknown.
+        """
+        return None
+
 
 class BrainDeadRanker(Ranker):
     """
@@ -56,3 +100,26 @@ class BrainDeadRanker(Ranker):
 
     def evaluate(self) -> float:
         return self.__score
+
+    def evaluate_many(self, query_terms: List[Tuple[str, int]], document_ids: Sequence[int],
+                      term_indices: Sequence[int], term_frequencies: Sequence[int]) -> array:
+        multiplicities = [multiplicity for (_, multiplicity) in query_terms]
+        scores = array("d")
+        previous_document_id = None
+        score = 0.0
+        for (document_id, i, term_frequency) in zip(document_ids, term_indices, term_frequencies):
+            if document_id != previous_document_id:
+                if previous_document_id is not None:
+                    scores.append(score)
+                previous_document_id = document_id
+                score = 0.0
+            score += multiplicities[i] * term_frequency
+        if previous_document_id is not None:
+            scores.append(score)
+        return scores
+
+    def get_upper_bound(self, term: str, multiplicity: int, max_term_frequency: int) -> Optional[float]:
+        return float(multiplicity * max_term_frequency)
+
+    def get_static_upper_bound(self) -> Optional[float]:
+        return 0.0
@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import heapq
-from typing import Iterator, Any, Union, Tuple
+from operator import itemgetter
+from typing import Iterable, Iterator, Any, Optional, Union, Tuple
 
 
 Number = Union[int, float]
@@ -20,6 +21,9 @@ class Sieve:
 
     Candidate items can be of any type, as long as that type has an "<" operator
     defined.
+
+    Sifting can go on after the winners have been inspected, so partial results can be
+    streamed out as they improve.
     """
 
     def __init__(self, size: int):
@@ -38,13 +42,40 @@ class Sieve:
             if root_score < score:
                 heapq.heapreplace(self.__heap, (score, item))
 
+    def sift_many(self, scores: Iterable[Number], items: Iterable[Any]) -> None:
+        """
+        Sifts a batch of scored items through the sieve, given as aligned iterables. Equivalent to
+        sifting them one by one, in order.
+
+        Candidates that cannot beat the current threshold are discarded up front. A single partial
+        selection then finds the K-th largest score in the batch, and only the candidates that score at
+        least that much need to go through the heap.
+        """
+        threshold = self.threshold()
+        if threshold is None:
+            candidates = list(zip(scores, items))
+        else:
+            candidates = [candidate for candidate in zip(scores, items) if threshold < candidate[0]]
+        if len(candidates) > self.__size:
+            cutoff = heapq.nlargest(self.__size, map(itemgetter(0), candidates))[-1]
+            candidates = [candidate for candidate in candidates if cutoff <= candidate[0]]
+        for (score, item) in candidates:
+            self.sift(score, item)
+
+    def threshold(self) -> Optional[Number]:
+        """
+        Returns the score a candidate item must exceed to make the cut, i.e., "the worst of the
+        best". Returns None if the sieve isn't full yet, in which case any candidate makes the cut.
+        """
+        return self.__heap[0][0] if len(self.__heap) == self.__size else None
+
     def winners(self) -> Iterator[Tuple[Number, Any]]:
         """
-        Returns the highest-scoring items that have been sifted through the sieve, sorted
+        Returns the highest-scoring items that have been sifted through the sieve so far, sorted
         in descending order. The returned list iterator yields (score, item) tuples.
 
-        This implementation is currently not idempotent. Invoke only once.
+        The sieve is left untouched, so this can be invoked any number of times.
         """
         # Since the internal heap tracks "the worst of the best" and we want the
         # list sorted as "the best of the best", we reverse the internal heap ordering.
-        return reversed([heapq.heappop(self.__heap) for _ in range(len(self.__heap))])
+        return iter(sorted(self.__heap, reverse=True))
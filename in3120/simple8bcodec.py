@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from .integercodec import IntegerCodec
+from typing import Iterable, List, Tuple
+
+
+class Simple8bCodec(IntegerCodec):
+    """
+    An encoder/decoder for Simple-8b encoding. See https://doi.org/10.1002/spe.948 for details.
+
+    Numbers are packed greedily into 64-bit words. The top 4 bits of a word is a selector that
+    says how many numbers the remaining 60 bits hold, and how many bits each number occupies.
+    The first two selectors are reserved for long runs of ones, which are very common both among
+    the gaps and the term frequencies in a posting list. The last word in a frame might be only
+    partially filled. Words are stored in little-endian byte order.
+    """
+
+    # Maps a selector to the (count, width) pair it represents.
+    __SELECTORS = [(240, 0), (120, 0), (60, 1), (30, 2), (20, 3), (15, 4), (12, 5), (10, 6),
+                   (8, 7), (7, 8), (6, 10), (5, 12), (4, 15), (3, 20), (2, 30), (1, 60)]
+
+    def encode_many(self, numbers: Iterable[int], destination: bytearray) -> int:
+        assert destination is not None
+        numbers = list(numbers)
+        assert all(0 <= number < (1 << 60) for number in numbers)
+        frame = bytearray()
+        where = 0
+        while where < len(numbers):
+            for (selector, (count, width)) in enumerate(__class__.__SELECTORS):
+                chunk = numbers[where:(where + count)]
+                if width == 0:
+                    if len(chunk) < count or any(number != 1 for number in chunk):
+                        continue
+                elif max(chunk) >= (1 << width):
+                    continue
+                word = selector << 60
+                for (i, number) in enumerate(chunk):
+                    word |= number << (i * width)
+                frame.extend(word.to_bytes(8, "little"))
+                where += len(chunk)
+                break
+        destination.extend(frame)
+        return len(frame)
+
+    def decode_many(self, source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        numbers = []
+        where = start
+        while len(numbers) < count:
+            if where + 8 > len(source):
+                raise IndexError("Buffer exhausted before all numbers were decoded")
+            word = int.from_bytes(source[where:(where + 8)], "little")
+            where += 8
+            (chunk_count, width) = __class__.__SELECTORS[word >> 60]
+            chunk_count = min(chunk_count, count - len(numbers))
+            if width == 0:
+                numbers.extend([1] * chunk_count)
+            else:
+                mask = (1 << width) - 1
+                numbers.extend((word >> (i * width)) & mask for i in range(chunk_count))
+        return (numbers, where - start)
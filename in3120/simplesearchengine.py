@@ -1,12 +1,17 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import heapq
+from array import array
 from collections import Counter
+from operator import attrgetter
 from .sieve import Sieve
 from .ranker import Ranker
 from .corpus import Corpus
 from .invertedindex import InvertedIndex
-from typing import Iterator, Dict, Any
+from .posting import Posting
+from .postinglist import ArrayPostingList
+from typing import Iterator, Dict, Any, List, Optional, Sequence, Tuple
 
 
 class SimpleSearchEngine:
@@ -14,6 +19,10 @@ class SimpleSearchEngine:
     A simple implementation of a search core based on an inverted index, suitable for small corpora.
     """
 
+    # Matching documents are not scored one by one, but are buffered up and handed over to the ranker in
+    # blocks of roughly this many postings. See Ranker.evaluate_many().
+    _SCORING_BLOCK_SIZE = 4096
+
     def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
         self.__corpus = corpus
         self.__inverted_index = inverted_index
@@ -29,6 +38,15 @@ class SimpleSearchEngine:
         The client can supply a dictionary of options that controls this query evaluation process: The value of
         N is inferred from the query via the "match_threshold" (float) option, and the maximum number of documents
         to return to the client is controlled via the "hit_count" (int) option.
+
+        Setting the "pruning" (str) option to "wand" enables dynamic pruning using the WAND algorithm, if the ranker
+        can supply upper bounds on its scores. Documents that cannot possibly make it into the result set are then
+        skipped without being scored. See https://doi.org/10.1145/956863.956944 for details. The results are the
+        same as without pruning.
+
+        Setting the "evaluation" (str) option to "taat" switches from document-at-a-time traversal to term-at-a-time
+        traversal, which processes one posting list at a time. This avoids juggling many cursors for queries having
+        lots of terms, e.g., shingled queries. The results are the same, but pruning is not supported.
         """
         # Print verbose debug information?
         debug = options.get("debug", False)
@@ -49,31 +67,161 @@ class SimpleSearchEngine:
         match_threshold = max(0.0, min(1.0, options.get("match_threshold", 0.5)))
         required_minimum = max(1, min(len(unique_query_terms), int(match_threshold * len(unique_query_terms))))
 
+        # We're doing ranked retrieval. Assess relevance scores per document as we go along, as we're doing
+        # document-at-a-time traversal. Keep track of the K highest-scoring documents.
+        sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
+
+        # Evaluate term-at-a-time instead?
+        evaluation = options.get("evaluation", "daat")
+        assert evaluation in ("daat", "taat")
+        if evaluation == "taat":
+            self.__evaluate_term_at_a_time(unique_query_terms, required_minimum, sieve, ranker, debug)
+            for (score, document_id) in sieve.winners():
+                yield {"score": score, "document": self.__corpus[document_id]}
+            return
+
+        # Can we prune? That requires that the ranker knows how much each term can at most contribute.
+        pruning = options.get("pruning", None)
+        assert pruning in (None, "wand")
+        upper_bounds = self.__get_upper_bounds(unique_query_terms, ranker) if pruning else None
+        if upper_bounds:
+            self.__evaluate_with_wand(unique_query_terms, posting_lists, required_minimum, upper_bounds, sieve, ranker, debug)
+            for (score, document_id) in sieve.winners():
+                yield {"score": score, "document": self.__corpus[document_id]}
+            return
+
+        # If we can get at the raw columns of all the posting lists, traverse these instead of materializing
+        # any postings. Terms that are not in the index at all have empty posting lists.
+        columns = [self.__get_columns(term) if term in self.__inverted_index else ((), ()) for (term, _) in unique_query_terms]
+        if all(columns):
+            self.__evaluate_columns(unique_query_terms, columns, required_minimum, sieve, ranker, debug)
+            for (score, document_id) in sieve.winners():
+                yield {"score": score, "document": self.__corpus[document_id]}
+            return
+
         # When traversing the posting lists using document-at-a-time traversal, we need to keep track
         # of where we are in each of the posting lists. Initially, all the cursors "point to" the first entry
-        # in each posting list. Keep track of which posting lists that remain to be fully traversed.
+        # in each posting list. The posting lists that remain to be fully traversed are kept in a priority
+        # queue, ordered by the document identifiers their cursors point to.
         all_cursors = [next(p, None) for p in posting_lists]
-        remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+        remaining_cursors = [(all_cursors[i].document_id, i) for i in range(len(all_cursors)) if all_cursors[i]]
+        heapq.heapify(remaining_cursors)
 
-        # We're doing ranked retrieval. Assess relevance scores per document as we go along, as we're doing
-        # document-at-a-time traversal. Keep track of the K highest-scoring documents.
-        sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
+        # If all the posting lists we need to traverse support skipping, we can leapfrog over postings
+        # that cannot possibly be part of the result set instead of visiting them one by one.
+        skippable = all(hasattr(posting_lists[i], "skip_to") for (_, i) in remaining_cursors)
+
+        # The postings of the matching documents that have yet to be scored, as (document identifiers,
+        # query term indices, term frequencies) columns.
+        block = (array("I"), array("I"), array("I"))
 
         # We're doing at least N-of-M matching. As we reach the end of the posting lists, we can abort when
         # the number of non-exhausted lists drops below the required minimum N.
-        while len(remaining_cursor_ids) >= required_minimum:
+        while len(remaining_cursors) >= required_minimum:
 
             # The posting lists are sorted by the document identifiers in ascending order. Define the
             # "frontier" as the subset of non-exhausted posting lists that mention the lowest document
             # identifier. In a sense, if we imagine scanning the posting lists from left to right, the
-            # frontier is the subset that has the "leftmost" cursors.
-            # TODO: This can easily be done in a single pass over the remaining lists.
-            document_id = min([all_cursors[i].document_id for i in remaining_cursor_ids])
-            frontier_cursor_ids = [i for i in remaining_cursor_ids if all_cursors[i].document_id == document_id]
+            # frontier is the subset that has the "leftmost" cursors. These are all at the top of the
+            # priority queue, and come out ordered by cursor.
+            document_id = remaining_cursors[0][0]
+            frontier_cursor_ids = []
+            while remaining_cursors and remaining_cursors[0][0] == document_id:
+                frontier_cursor_ids.append(heapq.heappop(remaining_cursors)[1])
 
             # The number of elements on the "frontier" needs to be at least N. Otherwise, these documents
             # don't contain enough of the query terms, and aren't part of the result set.
             if len(frontier_cursor_ids) >= required_minimum:
+                for i in frontier_cursor_ids:
+                    block[0].append(document_id)
+                    block[1].append(i)
+                    block[2].append(all_cursors[i].term_frequency)
+                if len(block[0]) >= self._SCORING_BLOCK_SIZE:
+                    self.__score_block(unique_query_terms, block, sieve, ranker, debug)
+
+            # Move along the cursors on the frontier, and put them back in the priority queue. The cursors
+            # not on the frontier remain where they are, untouched. We may or may not reach the end of some
+            # posting lists when we advance, so the set of remaining non-exhausted lists might shrink.
+            if skippable and len(frontier_cursor_ids) < required_minimum:
+                # A document can only be mentioned in N or more of the posting lists if N or more cursors can
+                # still reach it. Even if all the F cursors on the frontier do, we need N - F of the cursors in
+                # the priority queue as well. So no document identifier smaller than the (N - F)-th smallest one
+                # in the priority queue can be part of the result set, and all cursors behind it can skip
+                # straight there. There are at least N - F cursors in the queue, or we wouldn't be here.
+                pivot = heapq.nsmallest(required_minimum - len(frontier_cursor_ids), remaining_cursors)[-1][0]
+                while remaining_cursors[0][0] < pivot:
+                    frontier_cursor_ids.append(heapq.heappop(remaining_cursors)[1])
+                for i in frontier_cursor_ids:
+                    all_cursors[i] = posting_lists[i].skip_to(pivot)
+            else:
+                for i in frontier_cursor_ids:
+                    all_cursors[i] = next(posting_lists[i], None)
+            for i in frontier_cursor_ids:
+                if all_cursors[i]:
+                    heapq.heappush(remaining_cursors, (all_cursors[i].document_id, i))
+
+        # Score whatever matches we have left over.
+        self.__score_block(unique_query_terms, block, sieve, ranker, debug)
+
+        # Alert the client about the best-matching documents, using the supplied callback function.
+        # Emit documents sorted according to their relevancy scores.
+        for (score, document_id) in sieve.winners():
+            yield {"score": score, "document": self.__corpus[document_id]}
+
+    def __get_upper_bounds(self, unique_query_terms: List[Tuple[str, int]], ranker: Ranker) -> Optional[Tuple[List[float], float]]:
+        """
+        Returns the upper bounds on how much each of the unique query terms can contribute to a document's
+        score, together with the upper bound on the document-specific static part of the score. Returns None
+        if the ranker cannot supply these bounds.
+        """
+        static_upper_bound = ranker.get_static_upper_bound()
+        if static_upper_bound is None:
+            return None
+        upper_bounds = []
+        for (term, multiplicity) in unique_query_terms:
+            upper_bound = ranker.get_upper_bound(term, multiplicity, self.__inverted_index.get_max_term_frequency(term))
+            if upper_bound is None:
+                return None
+            upper_bounds.append(upper_bound)
+        return upper_bounds, static_upper_bound
+
+    def __evaluate_with_wand(self, unique_query_terms: List[Tuple[str, int]], posting_lists: List[Iterator[Posting]],
+                             required_minimum: int, upper_bounds: Tuple[List[float], float], sieve: Sieve,
+                             ranker: Ranker, debug: bool) -> None:
+        """
+        Does N-out-of-M document-at-a-time traversal like evaluate() does, but uses WAND to skip over documents
+        that cannot make it into the sieve. The matching documents are sifted into the given sieve.
+        """
+        (term_upper_bounds, static_upper_bound) = upper_bounds
+
+        # Pad the bounds a tiny bit, so that floating point rounding can never make us skip a document whose
+        # score would have been exactly equal to its bound.
+        term_upper_bounds = [upper_bound * (1.0 + 1e-9) + 1e-9 for upper_bound in term_upper_bounds]
+
+        all_cursors = [next(p, None) for p in posting_lists]
+        remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+        while len(remaining_cursor_ids) >= required_minimum:
+
+            # Find the pivot, i.e., the leftmost cursor where the cursors up to and including it are enough
+            # to reach the required minimum number of terms, and could together score high enough to make it
+            # into the sieve. No document to the left of the pivot document can be part of the result set.
+            remaining_cursor_ids.sort(key=lambda i: all_cursors[i].document_id)
+            threshold = sieve.threshold()
+            accumulated_upper_bound = static_upper_bound
+            pivot = None
+            for (rank, i) in enumerate(remaining_cursor_ids):
+                accumulated_upper_bound += term_upper_bounds[i]
+                if rank + 1 >= required_minimum and (threshold is None or accumulated_upper_bound > threshold):
+                    pivot = rank
+                    break
+            if pivot is None:
+                break
+            document_id = all_cursors[remaining_cursor_ids[pivot]].document_id
+
+            # If all cursors to the left of the pivot have caught up with it, the pivot document is a candidate
+            # that we need to score. Otherwise, the cursors that lag behind can skip straight to it.
+            if all_cursors[remaining_cursor_ids[0]].document_id == document_id:
+                frontier_cursor_ids = sorted(i for i in remaining_cursor_ids if all_cursors[i].document_id == document_id)
                 ranker.reset(document_id)
                 for i in frontier_cursor_ids:
                     ranker.update(unique_query_terms[i][0], unique_query_terms[i][1], all_cursors[i])
@@ -84,15 +232,153 @@ class SimpleSearchEngine:
                     print("document =", self.__corpus[document_id])
                     print("matches  =", {unique_query_terms[i][0]: all_cursors[i] for i in frontier_cursor_ids})
                     print("score    =", score)
+                for i in frontier_cursor_ids:
+                    all_cursors[i] = next(posting_lists[i], None)
+            else:
+                for i in remaining_cursor_ids[:pivot]:
+                    if all_cursors[i].document_id < document_id:
+                        all_cursors[i] = self.__skip_to(posting_lists[i], document_id)
+            remaining_cursor_ids = [i for i in remaining_cursor_ids if all_cursors[i]]
 
-            # Move along the cursors on the frontier. The cursors not on the frontier remain where they
-            # are. We may or may not reach the end of some posting lists when we advance, so the set of
-            # remaining non-exhausted lists might shrink.
+    def __evaluate_columns(self, unique_query_terms: List[Tuple[str, int]], columns: List[Tuple[Sequence[int], Sequence[int]]],
+                           required_minimum: int, sieve: Sieve, ranker: Ranker, debug: bool) -> None:
+        """
+        Does N-out-of-M document-at-a-time traversal like evaluate() does, but works directly on the raw
+        (document identifiers, term frequencies) columns of the posting lists. The cursors are positions into
+        the columns, so no postings are materialized, and the cursors can always skip ahead by galloping.
+        The matching documents are sifted into the given sieve.
+        """
+        document_ids = [c[0] for c in columns]
+        positions = [0] * len(columns)
+        remaining_cursors = [(document_ids[i][0], i) for i in range(len(columns)) if document_ids[i]]
+        heapq.heapify(remaining_cursors)
+        block = (array("I"), array("I"), array("I"))
+        while len(remaining_cursors) >= required_minimum:
+
+            # Pop the frontier, i.e., the cursors that point to the lowest document identifier.
+            document_id = remaining_cursors[0][0]
+            frontier_cursor_ids = []
+            while remaining_cursors and remaining_cursors[0][0] == document_id:
+                frontier_cursor_ids.append(heapq.heappop(remaining_cursors)[1])
+
+            # Buffer up the postings if the frontier is large enough, and move the cursors on the frontier along.
+            # Otherwise, skip ahead to the first document that might be mentioned in N or more posting lists, as
+            # in evaluate().
+            if len(frontier_cursor_ids) >= required_minimum:
+                for i in frontier_cursor_ids:
+                    block[0].append(document_id)
+                    block[1].append(i)
+                    block[2].append(columns[i][1][positions[i]])
+                    positions[i] += 1
+                if len(block[0]) >= self._SCORING_BLOCK_SIZE:
+                    self.__score_block(unique_query_terms, block, sieve, ranker, debug)
+            else:
+                pivot = heapq.nsmallest(required_minimum - len(frontier_cursor_ids), remaining_cursors)[-1][0]
+                while remaining_cursors[0][0] < pivot:
+                    frontier_cursor_ids.append(heapq.heappop(remaining_cursors)[1])
+                for i in frontier_cursor_ids:
+                    positions[i] = ArrayPostingList.gallop(document_ids[i], pivot, positions[i] + 1)
+
+            # Put the cursors back in the priority queue, unless they have reached the end of their posting lists.
             for i in frontier_cursor_ids:
-                all_cursors[i] = next(posting_lists[i], None)
-            remaining_cursor_ids = [i for i in range(len(all_cursors)) if all_cursors[i]]
+                if positions[i] < len(document_ids[i]):
+                    heapq.heappush(remaining_cursors, (document_ids[i][positions[i]], i))
 
-        # Alert the client about the best-matching documents, using the supplied callback function.
-        # Emit documents sorted according to their relevancy scores.
-        for (score, document_id) in sieve.winners():
-            yield {"score": score, "document": self.__corpus[document_id]}
+        # Score whatever matches we have left over.
+        self.__score_block(unique_query_terms, block, sieve, ranker, debug)
+
+    def __evaluate_term_at_a_time(self, unique_query_terms: List[Tuple[str, int]], required_minimum: int,
+                                  sieve: Sieve, ranker: Ranker, debug: bool) -> None:
+        """
+        Does N-out-of-M term-at-a-time traversal. The matching documents are sifted into the given sieve, and
+        are scored exactly as evaluate() would have scored them.
+
+        In the first pass we accumulate, one posting list at a time, how many of the query terms each document
+        contains. The counts are kept in a dense list indexed by document identifier. In the second pass we
+        collect the postings of the documents that contain enough of the query terms, as parallel columns. These
+        are then scored, in document order.
+        """
+        # First pass: Count matching query terms per document. Avoid materializing postings, if possible.
+        counts = [0] * self.__corpus.size()  # A list beats array("I") here, as the latter boxes on every access.
+        for (term, _) in unique_query_terms:
+            columns = self.__get_columns(term)
+            for document_id in (columns[0] if columns else map(attrgetter("document_id"), self.__inverted_index[term])):
+                counts[document_id] += 1
+
+        # Second pass: Gather the postings that belong to the candidate documents, ordered by query term, as
+        # (document identifiers, query term indices, term frequencies) columns.
+        (document_ids, term_indices, term_frequencies) = (array("I"), array("I"), array("I"))
+        for (i, (term, _)) in enumerate(unique_query_terms):
+            columns = self.__get_columns(term)
+            if columns:
+                for (document_id, term_frequency) in zip(*columns):
+                    if counts[document_id] >= required_minimum:
+                        document_ids.append(document_id)
+                        term_indices.append(i)
+                        term_frequencies.append(term_frequency)
+            else:
+                for posting in self.__inverted_index[term]:
+                    if counts[posting.document_id] >= required_minimum:
+                        document_ids.append(posting.document_id)
+                        term_indices.append(i)
+                        term_frequencies.append(posting.term_frequency)
+        if not document_ids:
+            return
+
+        # Score the candidates, in blocks. The sort is stable, so the postings of each document remain
+        # ordered by query term.
+        block = (array("I"), array("I"), array("I"))
+        for k in sorted(range(len(document_ids)), key=document_ids.__getitem__):
+            document_id = document_ids[k]
+            if len(block[0]) >= self._SCORING_BLOCK_SIZE and block[0][-1] != document_id:
+                self.__score_block(unique_query_terms, block, sieve, ranker, debug)
+            block[0].append(document_id)
+            block[1].append(term_indices[k])
+            block[2].append(term_frequencies[k])
+        self.__score_block(unique_query_terms, block, sieve, ranker, debug)
+
+    def __score_block(self, unique_query_terms: List[Tuple[str, int]], block: Tuple[array, array, array],
+                      sieve: Sieve, ranker: Ranker, debug: bool) -> None:
+        """
+        Scores the buffered postings of the matching documents in one go, sifts the documents into the given
+        sieve, and empties the buffers. The postings of a document must be contiguous.
+        """
+        (document_ids, term_indices, term_frequencies) = block
+        if not document_ids:
+            return
+        scores = ranker.evaluate_many(unique_query_terms, document_ids, term_indices, term_frequencies)
+        document_ids_seen = [document_id for (k, document_id) in enumerate(document_ids)
+                             if k == 0 or document_ids[k - 1] != document_id]
+        assert len(scores) == len(document_ids_seen)
+        sieve.sift_many(scores, document_ids_seen)
+        if debug:
+            for (score, document_id) in zip(scores, document_ids_seen):
+                print("*** MATCH")
+                print("document =", self.__corpus[document_id])
+                print("matches  =", {unique_query_terms[term_indices[k]][0]: Posting(document_id, term_frequencies[k])
+                                     for k in range(len(document_ids)) if document_ids[k] == document_id})
+                print("score    =", score)
+        for column in block:
+            del column[:]
+
+    def __get_columns(self, term: str) -> Optional[Tuple[Sequence[int], Sequence[int]]]:
+        """
+        Returns the raw (document identifiers, term frequencies) columns of the term's posting list, if the
+        posting list offers such access. Otherwise, returns None.
+        """
+        get_arrays = getattr(self.__inverted_index.get_posting_list(term), "get_arrays", None)
+        return get_arrays() if get_arrays else None
+
+    @staticmethod
+    def __skip_to(posting_list: Iterator[Posting], document_id: int) -> Optional[Posting]:
+        """
+        Advances the given posting list to the first posting having a document identifier greater than or
+        equal to the given one, and returns it. Skips if the posting list supports it, otherwise crawls.
+        """
+        skip_to = getattr(posting_list, "skip_to", None)
+        if skip_to:
+            return skip_to(document_id)
+        for posting in posting_list:
+            if posting.document_id >= document_id:
+                return posting
+        return None
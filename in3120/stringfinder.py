@@ -1,9 +1,23 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import itertools
 from .tokenizer import Tokenizer
 from .trie import Trie
-from typing import Iterator, Dict, Any, List, Tuple
+from .compacttrie import CompactTrie
+from .tokentrie import TokenTrie
+from .dictionary import InMemoryDictionary
+from .corpus import Corpus
+from .document import Document
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Iterable, Dict, Any, List, Optional, Tuple, Callable, Union
+
+
+# The instance that scans chunks of documents in a worker process. See StringFinder.scan_corpus().
+_worker_instance = None
 
 
 class StringFinder:
@@ -12,59 +26,337 @@ class StringFinder:
     that are also present in a given text buffer. I.e., in a sense computes the "intersection" or "overlap"
     between the dictionary and the text buffer.
 
-    Uses a trie-walk algorithm similar to the Aho-Corasick algorithm with some simplifications and some minor
-    NLP extensions. The running time of this algorithm is virtually independent of the size of the dictionary,
-    and linear in the length of the buffer we are searching in.
+    The trie is compiled into an Aho-Corasick automaton, see https://doi.org/10.1145/360825.360855, that has
+    the tokens as its alphabet: The strings in the trie are sequences of tokens joined by a space, and each
+    state in the automaton corresponds to a prefix of one or more of these sequences. Besides the goto function
+    that tells which state a token takes us to, each state has a failure link to the state for the longest
+    proper suffix of its tokens that is also a state, and an output link to the closest state along the chain
+    of failure links that corresponds to a complete string in the dictionary. Scanning a buffer then costs an
+    amortized constant number of transitions per token, plus the number of matches reported. The running time
+    is thus independent of the size of the dictionary, linear in the length of the buffer we are searching
+    in, and doesn't depend on how many partial matches overlap.
 
     The tokenizer we use when scanning the input buffer is assumed to be the same as the one that was used
-    when adding strings to the trie.
+    when adding strings to the trie. Tokens that follow each other without any whitespace in between, as
+    some languages, e.g., Japanese or Chinese, would have it, are treated as if they were separated by a
+    space. That's how the trie would have them, if the strings were tokenized the same way.
+
+    The automaton is built by walking the trie a whole token at a time, using nothing but consume(), is_final()
+    and children(), so Trie and CompactTrie work the same. If given a TokenTrie, we reuse its token identifiers
+    and walk its transitions directly. Tokens are interned, i.e., mapped to integer identifiers, and the goto
+    function is encoded into typed arrays the same way as CompactTrie does it: The transitions out of each state
+    are consecutive and sorted by token identifier, so following one is a binary search, and most states only
+    have a single transition. The root has lots of transitions and is visited all the time, so it also gets a
+    lookup table indexed by token identifier. Each token in the buffer is looked up once, and a token that's
+    not part of any string in the dictionary takes us straight back to the root.
     """
 
-    def __init__(self, trie: Trie, tokenizer: Tokenizer):
-        self.__trie = trie
+    # How many documents each worker process scans at a time.
+    _SCAN_CHUNK_SIZE = 256
+
+    def __init__(self, trie: Union[Trie, CompactTrie, TokenTrie], tokenizer: Tokenizer):
         self.__tokenizer = tokenizer
+        self.__dictionary = InMemoryDictionary()  # Maps tokens to token identifiers.
+        self.__labels = array("I")  # The token identifier that labels each transition.
+        self.__targets = array("I")  # The state that each transition leads to.
+        self.__starts = array("I")  # Where each state's transitions start. Has an extra entry at the end.
+        self.__root_targets = array("I")  # The root's transitions, indexed by token identifier. 0 if none.
+        self.__depths = array("I")  # How many tokens each state corresponds to.
+        self.__finals = bytearray()  # Whether each state corresponds to a string in the dictionary.
+        self.__failures = array("I")  # The failure link of each state. The root is state 0.
+        self.__outputs = array("I")  # The output link of each state, or 0 if there's none.
+        self.__compile(trie)
+        self.__max_depth = max(self.__depths)  # How far back a match can start.
+
+    def __compile(self, trie: Union[Trie, CompactTrie, TokenTrie]) -> None:
+        """
+        Builds the automaton from the given trie. The goto function is built by a breadth-first traversal of
+        the trie, numbering the states in the order we visit them, so that the transitions out of each state
+        can be laid out one state after the other. After that, the failure and output links are computed in the
+        same order. A state's failure link is found by following the failure links from its parent until we find
+        a state that has a transition on the same token, so all states closer to the root must have been taken
+        care of first.
+        """
+        if isinstance(trie, TokenTrie):
+            self.__dictionary = trie.get_dictionary()
+            (transitions, finals, root) = trie._get_transitions()
+            (is_final, get_transitions) = (finals.__getitem__, lambda node: transitions[node].items())
+        else:
+            (root, is_final) = (trie, trie.__class__.is_final)
+            get_transitions = lambda node: self.__get_transitions(node, node is root)
+        queue = deque([root])
+        self.__finals.append(is_final(root))
+        self.__depths.append(0)
+        while queue:
+            node = queue.popleft()
+            state = len(self.__starts)
+            self.__starts.append(len(self.__labels))
+            for (token_id, following) in sorted(get_transitions(node), key=lambda transition: transition[0]):
+                self.__labels.append(token_id)
+                self.__targets.append(len(self.__depths))
+                self.__depths.append(self.__depths[state] + 1)
+                self.__finals.append(is_final(following))
+                queue.append(following)
+        self.__starts.append(len(self.__labels))
+        self.__root_targets = array("I", bytes(4 * self.__dictionary.size()))
+        for i in range(self.__starts[0], self.__starts[1]):
+            self.__root_targets[self.__labels[i]] = self.__targets[i]
+        self.__failures = array("I", bytes(4 * len(self.__depths)))
+        self.__outputs = array("I", bytes(4 * len(self.__depths)))
+        for state in range(len(self.__depths)):
+            for i in range(self.__starts[state], self.__starts[state + 1]):
+                (token_id, following) = (self.__labels[i], self.__targets[i])
+                failure = self.__failures[state]
+                while failure and not self.__goto(failure, token_id):
+                    failure = self.__failures[failure]
+                failure = self.__goto(failure, token_id) if state else 0
+                self.__failures[following] = failure
+                self.__outputs[following] = failure if self.__finals[failure] else self.__outputs[failure]
+
+    def __get_transitions(self, node: Union[Trie, CompactTrie], is_root: bool) -> Iterator[Tuple[int, Union[Trie, CompactTrie]]]:
+        """
+        Yields the (token identifier, node) pairs for the transitions out of the given trie node, when the trie
+        is walked one whole token at a time. The tokens of a string are separated by a space in the trie, so a
+        token ends where the string ends or where a space follows. Unless we're at the root, the next token
+        starts after that space. Each node in the trie is thus visited once, when building the automaton.
+        """
+        start = node if is_root else node.consume(" ")
+        stack = [("", start)] if start is not None else []
+        while stack:
+            (token, node) = stack.pop()
+            for (c, child) in node.children():
+                if c == " ":
+                    continue
+                if child.is_final() or child.consume(" ") is not None:
+                    yield (self.__dictionary.add_if_absent(token + c), child)
+                stack.append((token + c, child))
+
+    def __goto(self, state: int, token_id: int) -> int:
+        """
+        Returns the state that the given token takes us to from the given state, or 0 if there's no such
+        transition. The root is never the target of a transition, so there's no ambiguity.
+        """
+        (lo, hi) = (self.__starts[state], self.__starts[state + 1])
+        i = bisect_left(self.__labels, token_id, lo, hi)
+        return self.__targets[i] if i < hi and self.__labels[i] == token_id else 0
 
-    def scan(self, buffer: str) -> Iterator[Dict[str, Any]]:
+    def scan(self, buffer: str, options: Optional[dict] = None) -> Iterator[Dict[str, Any]]:
         """
         Scans the given buffer and finds all dictionary entries in the trie that are also present in the
         buffer. We only consider matches that begin and end on token boundaries.
 
         The matching dictionary entries, if any, are yielded back to the client as dictionaries having the
-        keys "match" (str) and "range" (Tuple[int, int]).
+        keys "match" (str) and "range" (Tuple[int, int]). Matches that end on the same token are yielded
+        longest first.
+
+        The client can supply a dictionary of options that controls the scanning process: By default, all
+        matches are reported, including matches that overlap or are nested within other matches. Setting the
+        "matching" (str) option to "leftmost-longest" instead reports non-overlapping matches only, scanning
+        from left to right and picking the longest match among the ones that begin the furthest to the left.
+        Setting it to "leftmost-first" picks the shortest such match, i.e., the first one to complete. Either
+        way, the matches are yielded in the order they appear in the buffer.
 
         In a serious application we'd add more lookup/evaluation features, e.g., support for prefix matching,
-        support for leftmost-longest matching (instead of reporting all matches), and support for lemmatization
-        or similar linguistic variations.
+        and support for lemmatization or similar linguistic variations.
+        """
+        for (begin, end) in self.__get_ranges(buffer, options or {}):
+            yield self.__report(buffer, begin, end)
+
+    def scan_corpus(self, corpus: Corpus, fields: Iterable[str], options: Optional[dict] = None,
+                    workers: int = 1) -> Iterator[Tuple[int, str, str, Tuple[int, int]]]:
         """
-        # The set of currently explored states. We represent a state as a node in the trie (that
-        # represents where in the trie we are after having consumed zero or more characters) plus
-        # an index (that represents the position into the original buffer where the state was "born".)
-        # The trie node is what we advance along the way, while the index is needed so that we know where
-        # we first started if/when a match is found.
-        live_states : List[Tuple[Trie, int]] = []
+        Scans the named fields of all documents in the given corpus, and yields the matches back to the client
+        as (document identifier, field name, match, range) tuples, where the ranges are relative to the named
+        fields. The matches are yielded in corpus order and, within each document, in field order. The options
+        are the same as for scan().
 
-        # Where did the previous token end? Assume that tokens are produced sorted in left-to-right
-        # order.
-        previous_end = -1
+        Scanning can be spread across multiple worker processes. The documents are then handed out to the
+        workers in contiguous chunks, and the results are yielded as the chunks complete, in order. Only a
+        bounded number of chunks is in flight at any time, so that we can stream through large corpora. The
+        automaton is handed to each worker once, when it starts, and the tokenizer must be picklable.
+        """
+        assert workers > 0
+        fields = list(fields)
+        options = options or {}
+        if workers == 1:
+            for document in corpus:
+                yield from self._scan_chunk([(document.document_id, [document.get_field(f, "") for f in fields])],
+                                            fields, options)
+            return
+
+        # Only ship the raw field contents to the workers, not the document objects.
+        def _chunks() -> Iterator[List[Tuple[int, List[str]]]]:
+            documents = ((document.document_id, [document.get_field(f, "") for f in fields]) for document in corpus)
+            return iter(lambda: list(itertools.islice(documents, __class__._SCAN_CHUNK_SIZE)), [])
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=__class__._set_worker_instance, initargs=(self,)) as executor:
+            futures = deque()
+            for chunk in _chunks():
+                futures.append(executor.submit(__class__._scan_chunk_in_worker, chunk, fields, options))
+                if len(futures) >= 2 * workers:
+                    yield from futures.popleft().result()
+            while futures:
+                yield from futures.popleft().result()
+
+    def _scan_chunk(self, documents: List[Tuple[int, List[str]]], fields: List[str],
+                    options: dict) -> List[Tuple[int, str, str, Tuple[int, int]]]:
+        """
+        Scans a contiguous range of documents, given as (document identifier, field contents) pairs.
+        """
+        tokenizer = self.__tokenizer
+        return [(document_id, field, " ".join(tokenizer.split(buffer[begin:end])), (begin, end))
+                for (document_id, buffers) in documents
+                for (field, buffer) in zip(fields, buffers) if buffer
+                for (begin, end) in self.__get_ranges(buffer, options)]
+
+    @staticmethod
+    def _set_worker_instance(finder: "StringFinder") -> None:
+        """
+        Makes the given instance available to the chunks scanned in this worker process.
+        """
+        global _worker_instance
+        _worker_instance = finder
+
+    @staticmethod
+    def _scan_chunk_in_worker(documents: List[Tuple[int, List[str]]], fields: List[str],
+                              options: dict) -> List[Tuple[int, str, str, Tuple[int, int]]]:
+        """
+        Scans a contiguous range of documents. Runs in a worker process.
+        """
+        return _worker_instance._scan_chunk(documents, fields, options)
+
+    def get_processor(self, field: str, tag_field: str, options: Optional[dict] = None) -> Callable[[Document], Document]:
+        """
+        Returns a document processor, suitable for use in a DocumentPipeline, that scans the named field
+        and stores the matches as a list in the named tag field. The options are the same as for scan().
+        """
+        def _process(document: Document) -> Document:
+            document[tag_field] = list(self.scan(document.get_field(field, "") or "", options))
+            return document
+        return _process
+
+    def __get_ranges(self, buffer: str, options: dict) -> Iterator[Tuple[int, int]]:
+        """
+        Scans the given buffer according to the given options, and yields the ranges of the matches.
+        """
+        matching = options.get("matching", "all")
+        assert matching in ("all", "leftmost-longest", "leftmost-first")
+        if matching != "all":
+            return self.__scan_leftmost(buffer, matching == "leftmost-longest")
+        return self.__scan_all(buffer)
+
+    def __scan_all(self, buffer: str) -> Iterator[Tuple[int, int]]:
+        """
+        Scans the given buffer and finds all matches.
+        """
+        (labels, targets, starts, root_targets) = (self.__labels, self.__targets, self.__starts, self.__root_targets)
+        (depths, finals, failures, outputs) = (self.__depths, self.__finals, self.__failures, self.__outputs)
+        intern = self.__dictionary.get_term_id
+
+        # Where did the most recent tokens begin? We never need to look further back than the deepest state.
+        begins = deque(maxlen=self.__max_depth)
+        state = 0
 
-        # Only consider matches that start on token boundaries.
         for (string, (begin, end)) in self.__tokenizer.tokens(buffer):
 
-            # Inject a space for the currently live states? Some languages, e.g., Japanese
-            # or Chinese, don't use whitespace between tokens.
-            is_juxtaposed, previous_end = (previous_end > 0) and (begin == previous_end), end
-            if not is_juxtaposed:
-                live_states = [(s.consume(" "), b) for (s, b) in live_states]
-
-            # Consider this token a potential start for a match. Advance all
-            # currently live states. Then prune, since consuming more characters has
-            # probably killed off some states.
-            live_states.append((self.__trie, begin))
-            live_states = [(s.consume(string), b) for (s, b) in live_states if s]
-            live_states = [(s, b) for (s, b) in live_states if s]
-
-            # Report matches, if any, that end on the token we just consumed. Use the
-            # tokenizer to somewhat normalize the matches we emit.
-            for match_begin in (b for (s, b) in live_states if s.is_final()):
-                yield {"match": " ".join(self.__tokenizer.strings(buffer[match_begin:end])),
-                       "range": (match_begin, end)}
+            # Advance the automaton. If the current state has no transition on this token, fall back to
+            # shorter and shorter suffixes of the tokens consumed so far, until one of them does.
+            # Tokens that aren't part of any string in the dictionary can't be followed by anything.
+            begins.append(begin)
+            token_id = intern(string)
+            if token_id is None:
+                state = 0
+                continue
+            while state:
+                (lo, hi) = (starts[state], starts[state + 1])
+                edge = lo if hi - lo == 1 else bisect_left(labels, token_id, lo, hi)  # Most states have a single transition.
+                if edge < hi and labels[edge] == token_id:
+                    state = targets[edge]
+                    break
+                state = failures[state]
+            else:
+                state = root_targets[token_id] if token_id < len(root_targets) else 0  # The root has a lookup table.
+
+            # Report matches, if any, that end on the token we just consumed.
+            match = state if finals[state] else outputs[state]
+            while match:
+                yield (begins[-depths[match]], end)
+                match = outputs[match]
+
+    def __scan_leftmost(self, buffer: str, longest: bool) -> Iterator[Tuple[int, int]]:
+        """
+        Scans the given buffer and finds non-overlapping matches, preferring the ones that begin the furthest
+        to the left. Among those, we prefer either the longest or the shortest one.
+
+        We only ever hold on to a single candidate match. The current state of the automaton tells how far to
+        the left a match that ends on a later token can begin, and that never moves leftwards. So as soon as
+        it has moved far enough that nothing can beat the candidate anymore, we emit the candidate. A match
+        that ends on the current token and that begins the furthest to the left is found by walking the output
+        links, as these visit the matches from the longest to the shortest.
+
+        Once a match has been emitted, we restart the automaton and replay the tokens that follow the match.
+        These are never more than the deepest state, so we only need to remember that many recent tokens.
+        """
+        (labels, targets, starts, root_targets) = (self.__labels, self.__targets, self.__starts, self.__root_targets)
+        (depths, finals, failures, outputs) = (self.__depths, self.__finals, self.__failures, self.__outputs)
+        intern = self.__dictionary.get_term_id
+        tokens = enumerate(self.__tokenizer.tokens(buffer))
+        recent = deque(maxlen=self.__max_depth)  # The most recent tokens, as (index, token identifier, begin, end).
+        replay = deque()  # The tokens to replay, after having emitted a match.
+        state = 0
+        candidate = None  # The best match so far that we haven't emitted, as (first token, last token, begin, end).
+
+        while True:
+            if replay:
+                (i, token_id, begin, end) = replay.popleft()
+            else:
+                following = next(tokens, None)
+                if following is None and candidate:
+                    # Nothing more can come our way, so emit the candidate. There might be more matches after it.
+                    yield (candidate[2], candidate[3])
+                    replay = deque(token for token in recent if token[0] > candidate[1])
+                    (state, candidate) = (0, None)
+                    continue
+                if following is None:
+                    break
+                (i, (string, (begin, end))) = following
+                token_id = intern(string)
+                recent.append((i, token_id, begin, end))
+
+            # Advance the automaton, as usual.
+            if token_id is None:
+                state = 0
+            else:
+                while state:
+                    (lo, hi) = (starts[state], starts[state + 1])
+                    edge = lo if hi - lo == 1 else bisect_left(labels, token_id, lo, hi)  # Most states have a single transition.
+                    if edge < hi and labels[edge] == token_id:
+                        state = targets[edge]
+                        break
+                    state = failures[state]
+                else:
+                    state = root_targets[token_id] if token_id < len(root_targets) else 0  # The root has a lookup table.
+
+            # Find the match that ends on this token and that begins the furthest to the left. Does it beat
+            # the candidate?
+            match = state if finals[state] else outputs[state]
+            if match:
+                match_first = i - depths[match] + 1
+                if not candidate or match_first < candidate[0] or (match_first == candidate[0] and longest):
+                    candidate = (match_first, i, recent[match_first - recent[0][0]][2], end)
+
+            # Where's the first token of the leftmost match that can still come our way? If it's to the
+            # right of the candidate, or if it's at the same token and we're not looking for the longest
+            # match, nothing can beat the candidate anymore.
+            first = i - depths[state] + 1
+            if candidate and (candidate[0] < first or (candidate[0] == first and not longest)):
+                yield (candidate[2], candidate[3])
+                replay = deque(token for token in recent if token[0] > candidate[1])
+                (state, candidate) = (0, None)
+
+    def __report(self, buffer: str, begin: int, end: int) -> Dict[str, Any]:
+        """
+        Produces a match for the given range of the buffer. Use the tokenizer to somewhat normalize the
+        matches we emit.
+        """
+        return {"match": " ".join(self.__tokenizer.split(buffer[begin:end])), "range": (begin, end)}
@@ -1,14 +1,14 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import itertools
-import sys
+import mmap
+from array import array
 from collections import Counter
 from .sieve import Sieve
 from .corpus import Corpus
 from .normalizer import Normalizer
 from .tokenizer import Tokenizer
-from bisect import bisect_left
+from bisect import bisect_left, bisect_right
 from typing import Any, Dict, Iterator, Iterable, Tuple, List
 
 
@@ -17,17 +17,131 @@ class SuffixArray:
     A simple suffix array implementation. Allows us to conduct efficient substring searches.
     The prefix of a suffix is an infix!
 
-    In a serious application we'd make use of least common prefixes (LCPs), pay more attention
-    to memory usage, and add more lookup/evaluation features.
+    Alongside the suffix array we keep the longest common prefix (LCP) of each pair of adjacent
+    suffixes. From these we derive, for every probe the binary search can make, how much the probed
+    suffix has in common with the left and right ends of the search range. The binary search then
+    never has to compare characters it already knows are equal, so a lookup needs O(|P| + log N)
+    character comparisons. See https://doi.org/10.1137/0222058 for details.
+
+    The haystack is kept as a single UTF-8 encoded buffer, where each document's searchable content is
+    followed by a zero byte. The suffixes are offsets into that buffer, and a table of where each
+    document starts maps them back to documents. Since UTF-8 preserves code point order, comparing
+    bytes is the same as comparing characters. The zero byte sorts before anything else, so a suffix
+    that ends with its document sorts before the suffixes that continue where it ends.
+
+    Ranking tallies how many matches fall within each document, so we also keep the document index
+    of each suffix, in suffix array order, instead of bisecting the document table once per match.
+    That's a trade-off: It costs 4 bytes per suffix, on top of the 16 bytes per suffix that the suffix
+    array and the LCP arrays take. For cran.xml it's 0.84 MB out of 5.5 MB. In return, tallying the
+    21,005 matches for "the" takes about 1 ms instead of 11 ms, and about 10 times less in general.
+
+    A suffix array can be saved to a file, and later loaded by memory-mapping that file instead of
+    rebuilding it from the corpus.
+
+    In a serious application we'd add more lookup/evaluation features.
     """
 
+    # How many characters the suffixes are initially sorted by, when building the suffix array.
+    _INITIAL_SORT_DEPTH = 32
+
+    # Identifies the file format.
+    _MAGIC = b"in3120sa"
+
+    # The version of the file format. Bump it whenever the layout changes.
+    _VERSION = 1
+
+    # The size of the header, i.e., the magic number followed by five 32-bit integers.
+    _HEADER_SIZE = 28
+
     def __init__(self, corpus: Corpus, fields: Iterable[str], normalizer: Normalizer, tokenizer: Tokenizer):
         self.__corpus = corpus
         self.__normalizer = normalizer
         self.__tokenizer = tokenizer
-        self.__haystack: List[Tuple[int, str]] = []  # The (<document identifier>, <searchable content>) pairs.
-        self.__suffixes: List[Tuple[int, int]] = []  # The sorted (<haystack index>, <start offset>) pairs.
+        self.__haystack = b""  # The searchable content of all documents, each followed by a zero byte.
+        self.__offsets = array("I")  # Where in the haystack each document starts.
+        self.__document_ids = array("I")  # The document identifier of each document in the haystack.
+        self.__suffixes = array("I")  # The haystack offsets where the suffixes start, in sorted order.
+        self.__suffix_documents = array("I")  # The index of the document that each suffix falls within.
+        self.__lcps = array("I")  # The LCP of each suffix and the one preceding it. The first entry is 0.
+        self.__left_lcps = array("I")  # The LCP of each probe and the left end of its search range.
+        self.__right_lcps = array("I")  # The LCP of each probe and the right end of its search range.
+        self.__mmap = None  # The mapped file, if loaded from one.
         self.__build_suffix_array(fields)  # Construct the haystack and the suffix array itself.
+        self.__build_lcp_arrays()  # Construct the LCP arrays that speed up searching.
+
+    def save(self, filename: str) -> None:
+        """
+        Persists the suffix array to the given file, so that it can later be loaded without having to
+        rebuild it from the corpus.
+
+        The file consists of a header that identifies the file format and its version, followed by the document
+        offset table, the document identifiers, the suffixes, the document index of each suffix, the three LCP
+        arrays, and finally the haystack itself.
+        The integer arrays all start on 4-byte boundaries, so that they can be viewed as arrays without copying
+        them. Integers are stored in native byte order, so files are not portable across architectures.
+        """
+        with open(filename, "wb") as file:
+            file.write(__class__._MAGIC)
+            file.write(array("I", (1, __class__._VERSION, len(self.__offsets), len(self.__suffixes), len(self.__haystack))).tobytes())
+            for column in (self.__offsets, self.__document_ids, self.__suffixes, self.__suffix_documents,
+                           self.__lcps, self.__left_lcps, self.__right_lcps):
+                file.write(column.tobytes())
+            file.write(self.__haystack)
+
+    @staticmethod
+    def load(filename: str, corpus: Corpus, normalizer: Normalizer, tokenizer: Tokenizer) -> "SuffixArray":
+        """
+        Loads a suffix array that has been persisted to the given file. The file is memory-mapped, and lookups
+        are served straight out of the mapped buffer. Loading is therefore nearly instant, and the operating
+        system's page cache is shared between all processes that have the same file open. The corpus, the
+        normalizer and the tokenizer must be the same as the ones the suffix array was built with.
+        """
+        suffix_array = SuffixArray.__new__(SuffixArray)
+        suffix_array.__corpus = corpus
+        suffix_array.__normalizer = normalizer
+        suffix_array.__tokenizer = tokenizer
+        with open(filename, "rb") as file:
+            suffix_array.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(suffix_array.__mmap)
+        assert buffer[:len(__class__._MAGIC)] == __class__._MAGIC, "Not a suffix array file"
+        (byte_order_mark, version, document_count, suffix_count, haystack_length) = buffer[len(__class__._MAGIC):__class__._HEADER_SIZE].cast("I")
+        assert byte_order_mark == 1, "Suffix array file was written on an incompatible architecture"
+        assert version == __class__._VERSION, "Suffix array file has an unsupported format version"
+        columns = []
+        offset = __class__._HEADER_SIZE
+        for count in (document_count, document_count, suffix_count, suffix_count, suffix_count, suffix_count, suffix_count):
+            columns.append(buffer[offset:(offset + 4 * count)].cast("I"))
+            offset += 4 * count
+        (suffix_array.__offsets, suffix_array.__document_ids, suffix_array.__suffixes, suffix_array.__suffix_documents,
+         suffix_array.__lcps, suffix_array.__left_lcps, suffix_array.__right_lcps) = columns
+        suffix_array.__haystack = buffer[offset:(offset + haystack_length)]
+        assert len(suffix_array.__haystack) == haystack_length
+        return suffix_array
+
+    @staticmethod
+    def is_compatible(filename: str) -> bool:
+        """
+        Returns True iff the given file holds a suffix array that can be loaded, i.e., one that has been
+        saved using the current file format version, on an architecture like this one.
+        """
+        with open(filename, "rb") as file:
+            header = file.read(__class__._HEADER_SIZE)
+        if len(header) < __class__._HEADER_SIZE or header[:len(__class__._MAGIC)] != __class__._MAGIC:
+            return False
+        (byte_order_mark, version) = memoryview(header)[len(__class__._MAGIC):].cast("I")[:2]
+        return byte_order_mark == 1 and version == __class__._VERSION
+
+    def close(self) -> None:
+        """
+        Unmaps the underlying file, if the suffix array was loaded from one.
+        """
+        if self.__mmap is None:
+            return
+        for view in (self.__offsets, self.__document_ids, self.__suffixes, self.__suffix_documents,
+                     self.__lcps, self.__left_lcps, self.__right_lcps, self.__haystack):
+            view.release()
+        self.__mmap.close()
+        self.__mmap = None
 
     def __build_suffix_array(self, fields: Iterable[str]) -> None:
         """
@@ -36,17 +150,170 @@ class SuffixArray:
         """
         # We allow searching across multiple document fields simultaneously, so join the named fields
         # to produce the haystack that we'll search for needles in. Avoid cross-field matches.
-        self.__haystack = [(d.document_id, " \0 ".join([self.__normalize(d.get_field(f, "")) for f in fields]))
-                           for d in self.__corpus]
-
-        # We don't actually store all suffixes, instead we store (index, offset) pairs which allows us
-        # to generate the suffixes if/when we need them: The index identifies the document, and the
-        # offset identifies where in the document the substring starts. A naive suffix array generation
-        # is fine for now.
-        self.__suffixes = [(i, r[0])
-                           for i in range(len(self.__haystack))
-                           for r in self.__tokenizer.ranges(self.__haystack[i][1])]
-        self.__suffixes.sort(key=self.__get_suffix2)
+        # We don't actually store all suffixes, instead we store offsets which allows us to generate
+        # the suffixes if/when we need them. The tokenizer gives us character offsets, which we must
+        # translate into byte offsets.
+        fields = list(fields)
+        buffers = []
+        suffixes = set()
+        size = 0
+        for d in self.__corpus:
+            content = " \0 ".join([self.__normalize(d.get_field(f, "")) for f in fields])
+            buffer = content.encode("utf-8")
+            (character_offset, byte_offset) = (0, size)
+            for start in self.__tokenizer.spans(content)[0::2]:
+                if len(buffer) == len(content):
+                    byte_offset = size + start  # Plain ASCII, so no translation needed.
+                else:
+                    byte_offset += len(content[character_offset:start].encode("utf-8"))
+                    character_offset = start
+                suffixes.add(byte_offset)
+            self.__offsets.append(size)
+            self.__document_ids.append(d.document_id)
+            buffers.append(buffer)
+            buffers.append(b"\0")
+            size += len(buffer) + 1
+        self.__haystack = b"".join(buffers)
+        del buffers
+        self.__suffixes = array("I", sorted(suffixes))
+        del suffixes
+        self.__sort_suffixes()
+        self.__suffix_documents = array("I", map(self.__get_document_index, self.__suffixes))
+
+    def __sort_suffixes(self) -> None:
+        """
+        Sorts the suffixes, which on entry are in text order. Never looks at more than a bounded prefix of
+        a suffix at a time, so we don't need to materialize the suffixes themselves.
+
+        This is prefix doubling in the style of Larsson and Sadakane, see https://doi.org/10.1016/j.tcs.2007.07.017,
+        adapted to a suffix array that only holds suffixes starting at token boundaries. We first sort by the
+        first few characters, which puts the suffixes into groups that share at least that many characters. A
+        group whose members share h characters is then refined by the ranks of the suffixes d <= h characters
+        further into the text, where d is the same for all members. We pick the largest such d that lands on a
+        token boundary for all members, so that the suffixes d characters further in are in the suffix array
+        too and their ranks are known. If there is no such d, we fall back to comparing the next h characters.
+        """
+        haystack = self.__haystack
+        suffixes = self.__suffixes
+        n = len(suffixes)
+        if n < 2:
+            return
+
+        # The rank of each suffix is where its group starts in the sorted order. For each group we keep
+        # track of how many characters its members are known to share, if its members still need sorting.
+        resolved = 0xFFFFFFFF
+        ranks = array("I", bytes(4 * n))
+        depths = array("I", bytes(4 * n))
+        order = list(range(n))
+        pending = []
+
+        def _sort_group(start: int, members: List[int], keys: List[Any], get_depth) -> None:
+            # The depths might depend on the group's own ranks, so look them up before changing anything.
+            key_depths = {key: get_depth(key) for key in keys}
+            positions = sorted(range(len(members)), key=keys.__getitem__)
+            order[start:(start + len(members))] = [members[j] for j in positions]
+            j = 0
+            while j < len(positions):
+                e = j + 1
+                while e < len(positions) and keys[positions[e]] == keys[positions[j]]:
+                    e += 1
+                group_start = start + j
+                for m in positions[j:e]:
+                    ranks[members[m]] = group_start
+                depth = key_depths[keys[positions[j]]] if e - j > 1 else resolved
+                depths[group_start] = depth
+                if depth != resolved:
+                    pending.append((group_start, e - j))
+                j = e
+
+        # Sort by the first few characters. Suffixes having equal keys that are shorter than that are identical.
+        depth = __class__._INITIAL_SORT_DEPTH
+        keys = [haystack[offset:(offset + depth)] for offset in suffixes]
+        _sort_group(0, list(range(n)), keys, lambda key: depth if len(key) == depth else resolved)
+        del keys
+
+        # Refine the groups until all suffixes are sorted.
+        while pending:
+            (start, size) = pending.pop()
+            members = order[start:(start + size)]
+            h = depths[start]
+
+            # Where is the last token boundary within the shared prefix? If it's at the same place for all
+            # members, the ranks of the suffixes starting there can order the members.
+            successors = [bisect_right(suffixes, suffixes[k] + h, k) - 1 for k in members]
+            steps = {suffixes[successor] - suffixes[k] for (k, successor) in zip(members, successors)}
+            d = steps.pop() if len(steps) == 1 else 0
+            if d > 0:
+                keys = [ranks[successor] for successor in successors]
+                get_depth = (lambda key: resolved if depths[key] == resolved else d + depths[key])
+                if min(map(get_depth, keys)) > h:
+                    _sort_group(start, members, keys, get_depth)
+                    continue
+
+            # No luck. Compare the next h characters instead.
+            keys = [haystack[(suffixes[k] + h):(suffixes[k] + 2 * h)] for k in members]
+            _sort_group(start, members, keys, lambda key: 2 * h if len(key) == h else resolved)
+
+        self.__suffixes = array("I", (suffixes[k] for k in order))
+
+    def __build_lcp_arrays(self) -> None:
+        """
+        Computes the LCP of each pair of adjacent suffixes, using a variant of the algorithm by Kasai et al.
+        that copes with only some suffixes being present. See https://doi.org/10.1007/3-540-48194-X_17. The
+        suffixes are visited in text order. If a suffix shares h characters with the one preceding it in the
+        suffix array, the next suffix in the text d characters later shares at least h - d characters with
+        the one preceding it, provided that the preceding suffix also has a successor d characters later.
+        """
+        haystack = self.__haystack
+        suffixes = self.__suffixes
+        offsets = array("I", sorted(suffixes))
+        self.__lcps = array("I", bytes(4 * len(suffixes)))
+        (h, previous_offset, previous_neighbor) = (0, None, None)
+        for rank in sorted(range(len(suffixes)), key=suffixes.__getitem__):
+            offset = suffixes[rank]
+            if rank == 0:
+                (h, previous_offset, previous_neighbor) = (0, None, None)
+                continue
+            neighbor = suffixes[rank - 1]
+            if previous_neighbor is not None and h > offset - previous_offset:
+                shifted = previous_neighbor + (offset - previous_offset)
+                i = bisect_left(offsets, shifted)
+                h = h - (offset - previous_offset) if (i < len(offsets) and offsets[i] == shifted) else 0
+            else:
+                h = 0
+            h = self.__extend(haystack, offset, haystack, neighbor, h)
+            self.__lcps[rank] = h
+            (previous_offset, previous_neighbor) = (offset, neighbor)
+
+        # Precompute the LCPs the binary search needs. The probes form an implicit binary tree over the
+        # suffix array, where each probe splits its range in the middle.
+        self.__left_lcps = array("I", bytes(4 * len(self.__suffixes)))
+        self.__right_lcps = array("I", bytes(4 * len(self.__suffixes)))
+        if len(self.__suffixes) > 1:
+            self.__fill_lcps(0, len(self.__suffixes) - 1)
+
+    def __fill_lcps(self, left: int, right: int) -> int:
+        """
+        Fills in the LCPs for all probes within the given range, and returns the LCP of the suffixes at
+        the ends of the range. That is the smallest of the LCPs of the adjacent suffixes in the range.
+        """
+        if right - left == 1:
+            return self.__lcps[right]
+        middle = (left + right) // 2
+        self.__left_lcps[middle] = self.__fill_lcps(left, middle)
+        self.__right_lcps[middle] = self.__fill_lcps(middle, right)
+        return min(self.__left_lcps[middle], self.__right_lcps[middle])
+
+    @staticmethod
+    def __extend(buffer1: bytes, offset1: int, buffer2: bytes, offset2: int, known: int) -> int:
+        """
+        Returns the length of the common prefix of the strings that start at the given offsets into the
+        given buffers, given that their first few characters are already known to be equal. Doesn't copy.
+        """
+        limit = min(len(buffer1) - offset1, len(buffer2) - offset2)
+        while known < limit and buffer1[offset1 + known] == buffer2[offset2 + known]:
+            known += 1
+        return known
 
     def __normalize(self, buffer: str) -> str:
         """
@@ -54,44 +321,108 @@ class SuffixArray:
         identically processed for lookups to succeed.
         """
         # Tokenize and join to be robust to nuances in whitespace and punctuation.
-        return self.__normalizer.normalize(" ".join(self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))))
+        return self.__normalizer.normalize(" ".join(self.__tokenizer.split(self.__normalizer.canonicalize(buffer))))
 
-    def __get_suffix1(self, i: int) -> str:
+    def __get_document_index(self, offset: int) -> int:
         """
-        Produces the suffix/substring from the normalized document buffer for the entry i in the suffix array.
+        Returns the index of the document that the given haystack offset falls within.
         """
-        return self.__get_suffix2(self.__suffixes[i])
+        return bisect_right(self.__offsets, offset) - 1
 
-    def __get_suffix2(self, pair: Tuple[int, int]) -> str:
+    def __get_suffix(self, offset: int) -> str:
         """
-        Produces the suffix/substring from the normalized document buffer for the given (index, offset) pair.
+        Produces the suffix/substring from the normalized document buffer for the given haystack offset.
         """
-        # TODO: Slicing implies copying. This should be possible to avoid.
-        return self.__haystack[pair[0]][1][pair[1]:]
+        index = self.__get_document_index(offset)
+        end = self.__offsets[index + 1] - 1 if index + 1 < len(self.__offsets) else len(self.__haystack) - 1
+        return str(self.__haystack[offset:end], "utf-8")
 
-    def __binary_search(self, needle: str) -> int:
+    def __binary_search(self, needle: bytes) -> int:
         """
         Does a binary search for a given normalized query (the needle) in the suffix array (the haystack).
         Returns the position in the suffix array where the normalized query is either found, or, if not found,
         should have been inserted.
 
-        Kind of silly to roll our own binary search instead of using the bisect module, but seems needed
-        prior to Python 3.10 due to how we represent the suffixes via (index, offset) tuples. Version 3.10
-        added support for specifying a key.
-        """
-        if sys.version_info.major == 3 and sys.version_info.minor >= 10:
-            return bisect_left(self.__suffixes, needle, key=self.__get_suffix2)
-        else:
-            left = 0
-            right = len(self.__suffixes)
-            while left < right:
-                middle = (left + right) // 2
-                suffix = self.__get_suffix1(middle)
-                if suffix < needle:
-                    left = middle + 1
-                else:
-                    right = middle
+        We keep track of how much the needle has in common with the suffixes at both ends of the search range.
+        When probing, the precomputed LCPs often tell us which way to go without comparing any characters. If
+        not, we know how many characters we can skip before we start comparing.
+        """
+        if not self.__suffixes:
+            return 0
+
+        # Handle the ends separately, so that the needle is known to lie strictly inside the search range.
+        (left, right) = (0, len(self.__suffixes) - 1)
+        (left_lcp, is_less) = self.__compare(needle, left, 0)
+        if not is_less:
             return left
+        (right_lcp, is_less) = self.__compare(needle, right, 0)
+        if is_less:
+            return right + 1
+
+        # Invariant: The suffix at the left end is smaller than the needle, and the suffix at the right end
+        # is not.
+        while right - left > 1:
+            middle = (left + right) // 2
+            if left_lcp >= right_lcp:
+                lcp = self.__left_lcps[middle]
+                if lcp > left_lcp:
+                    left = middle  # Differs from the needle exactly where the left end does.
+                    continue
+                if lcp < left_lcp:
+                    (right, right_lcp) = (middle, lcp)  # Differs from the left end before the needle does.
+                    continue
+                (lcp, is_less) = self.__compare(needle, middle, left_lcp)
+            else:
+                lcp = self.__right_lcps[middle]
+                if lcp > right_lcp:
+                    right = middle  # Differs from the needle exactly where the right end does.
+                    continue
+                if lcp < right_lcp:
+                    (left, left_lcp) = (middle, lcp)  # Differs from the right end before the needle does.
+                    continue
+                (lcp, is_less) = self.__compare(needle, middle, right_lcp)
+            if is_less:
+                (left, left_lcp) = (middle, lcp)
+            else:
+                (right, right_lcp) = (middle, lcp)
+        return right
+
+    def __compare(self, needle: bytes, i: int, known: int) -> Tuple[int, bool]:
+        """
+        Compares the needle to entry i in the suffix array, given that their first few bytes are already
+        known to be equal. Returns the length of their common prefix, and whether the suffix is less than the
+        needle.
+        """
+        offset = self.__suffixes[i]
+        buffer = self.__haystack
+        lcp = self.__extend(needle, 0, buffer, offset, known)
+        if lcp == len(needle):
+            return (lcp, False)
+        return (lcp, offset + lcp == len(buffer) or buffer[offset + lcp] < needle[lcp])
+
+    def __find_range(self, needle: bytes) -> Tuple[int, int]:
+        """
+        Returns the range of positions in the suffix array whose suffixes start with the given needle.
+
+        Both ends are found by binary search. The haystack is UTF-8 encoded and never contains the byte 0xFF,
+        so a suffix starts with the needle if and only if it sorts between the needle and the needle followed
+        by 0xFF. The range is therefore located in O(|P| + log N) time, no matter how many matches there are.
+        """
+        start = self.__binary_search(needle)
+        end = self.__binary_search(needle + b"\xff")
+        return (start, end)
+
+    def count(self, query: str) -> int:
+        """
+        Returns how many times the given query occurs in the haystack, as a "phrase prefix search". See
+        evaluate() for details. Doesn't look at the matching suffixes at all, so this is cheap even for
+        queries that occur a huge number of times. The empty query matches nothing.
+        """
+        needle = self.__normalize(query).encode("utf-8")
+        if not needle:
+            return 0
+        (start, end) = self.__find_range(needle)
+        return end - start
 
     def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
         """
@@ -111,35 +442,23 @@ class SuffixArray:
         """
         # Search for the needle in the haystack, using binary search. Define that the empty query matches
         # nothing, not everything.
-        needle = self.__normalize(query)
+        needle = self.__normalize(query).encode("utf-8")
         if not needle:
             return
-        where_start = self.__binary_search(needle)
-
-        # Helper predicate. Checks if the identified suffix starts with the needle. Since slicing implies copying,
-        # cap the length of the slice to the length of the needle. The starts-with relation then becomes the same
-        # as equality, which is quick to check.
-        def _is_match(i: int) -> bool:
-            (j, offset) = self.__suffixes[i]
-            return self.__haystack[j][1][offset:(offset + len(needle))] == needle
 
-        # Suffixes sharing a prefix are consecutive in the suffix array. Scan ahead from the located index until
-        # we no longer get a match. We expect a low number of matches for typical queries, and we process all the
-        # matches below anyway. If we just wanted to count the number of matches without processing them, we
-        # could instead of a linear scan do another binary search to locate where the range ends.
-        matches = itertools.takewhile(_is_match, range(where_start, len(self.__suffixes)))
+        # Suffixes sharing a prefix are consecutive in the suffix array, so the matches form a range.
+        (start, end) = self.__find_range(needle)
+        if start == end:
+            return
 
         # Deduplicate. A document in the haystack might contain multiple occurrences of the needle.
-        # Rank according to occurrence count, and emit in ranked order.
-        if matches:
-            debug = options.get("debug", False)
-            pairs = [self.__suffixes[i] for i in matches]
-            if debug:
-                for pair in pairs:
-                    print("*** MATCH", pair, self.__get_suffix2(pair))
-            counter = Counter([i for (i, _) in pairs])
-            sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
-            for (index, count) in counter.items():
-                sieve.sift(count, index)
-            for (count, index) in sieve.winners():
-                yield {"score": count, "document": self.__corpus[self.__haystack[index][0]]}
+        # Rank according to occurrence count, and emit in ranked order. The per-document counts are
+        # tallied straight off the precomputed table of which document each suffix falls within.
+        if options.get("debug", False):
+            for offset in self.__suffixes[start:end]:
+                print("*** MATCH", offset, self.__get_suffix(offset))
+        counter = Counter(self.__suffix_documents[start:end])
+        sieve = Sieve(max(1, min(100, options.get("hit_count", 10))))
+        sieve.sift_many(counter.values(), counter.keys())
+        for (count, index) in sieve.winners():
+            yield {"score": count, "document": self.__corpus[self.__document_ids[index]]}
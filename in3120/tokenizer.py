@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import re
+import itertools
 from abc import ABC, abstractmethod
-from typing import Iterator, Tuple
+from array import array
+from typing import Iterator, Tuple, List
 
 
 class Tokenizer(ABC):
@@ -31,6 +33,22 @@ class Tokenizer(ABC):
         """
         return ((buffer[r[0] : r[1]], r) for r in self.ranges(buffer))
 
+    def spans(self, buffer: str) -> array:
+        """
+        Returns where in the buffer all the tokens begin and end, in one go. The begin and end
+        offsets of the tokens are packed one after the other, i.e., the offsets for the i-th
+        token are found at positions 2i and 2i + 1. Cheaper than ranges() when all the tokens
+        are needed anyway, as we don't need to allocate a tuple per token.
+        """
+        return array("I", itertools.chain.from_iterable(self.ranges(buffer)))
+
+    def split(self, buffer: str) -> List[str]:
+        """
+        Returns all the strings that make up the tokens in the given buffer, in one go. Cheaper
+        than strings() when all the tokens are needed anyway.
+        """
+        return list(self.strings(buffer))
+
 
 class BrainDeadTokenizer(Tokenizer):
     """
@@ -44,4 +62,16 @@ class BrainDeadTokenizer(Tokenizer):
         pass
 
     def ranges(self, buffer: str) -> Iterator[Tuple[int, int]]:
-        return ((m.start(), m.end()) for m in self.__pattern.finditer(buffer))
+        return (m.span() for m in self.__pattern.finditer(buffer))
+
+    def strings(self, buffer: str) -> Iterator[str]:
+        return (m.group() for m in self.__pattern.finditer(buffer))
+
+    def tokens(self, buffer: str) -> Iterator[Tuple[str, Tuple[int, int]]]:
+        return ((m.group(), m.span()) for m in self.__pattern.finditer(buffer))
+
+    def spans(self, buffer: str) -> array:
+        return array("I", itertools.chain.from_iterable(map(re.Match.span, self.__pattern.finditer(buffer))))
+
+    def split(self, buffer: str) -> List[str]:
+        return self.__pattern.findall(buffer)
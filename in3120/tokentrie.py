@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+from .tokenizer import Tokenizer
+from .dictionary import InMemoryDictionary
+from typing import Dict, Optional, Iterable, Iterator, List, Tuple
+
+
+class TokenTrie:
+    """
+    A trie where each transition consumes a whole token instead of a single character. For languages
+    where tokens are delimited by whitespace, a string of N tokens then takes N transitions, no matter
+    how long the tokens are, and there's no need for transitions on the spaces in between.
+
+    Tokens are interned: Each distinct token is assigned an integer identifier by a dictionary that all
+    nodes share, and the transitions out of a node are kept in a small dictionary keyed by token identifier.
+    The nodes themselves are kept in a flat list, so that a node is just an index into that list. Nodes are
+    handed out as lightweight TokenTrie objects that share the list.
+
+    StringFinder builds its automaton straight from the transitions, and interns the tokens it scans with the
+    same dictionary.
+    """
+
+    __slots__ = ("__dictionary", "__transitions", "__finals", "__node")
+
+    def __init__(self):
+        self.__dictionary = InMemoryDictionary()  # Maps tokens to token identifiers.
+        self.__transitions: List[Dict[int, int]] = [{}]  # The transitions out of each node, keyed by token identifier.
+        self.__finals = bytearray(1)  # Whether each node is final.
+        self.__node = 0
+
+    def __repr__(self):
+        return f"TokenTrie(node={self.__node})"
+
+    def __eq__(self, other):
+        return isinstance(other, TokenTrie) and self.__transitions is other.__transitions and self.__node == other.__node
+
+    def __hash__(self):
+        return hash((id(self.__transitions), self.__node))
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yields the strings that lead from the current node to a final/terminal state, with the tokens
+        joined by a space. For the root node, these are the strings that have been added to the trie.
+        The order is unspecified.
+        """
+        tokens = {token_id: token for (token, token_id) in self.__dictionary}
+        stack = [([], self.__node)]
+        while stack:
+            (prefix, node) = stack.pop()
+            if self.__finals[node]:
+                yield " ".join(prefix)
+            for (token_id, child) in self.__transitions[node].items():
+                stack.append((prefix + [tokens[token_id]], child))
+
+    def add(self, strings: Iterable[str], tokenizer: Tokenizer) -> None:
+        """
+        Adds all the strings to the trie, below the current node. The tokenizer splits the strings into
+        the tokens that label the transitions. Use the same tokenizer throughout.
+        """
+        for string in strings:
+            node = self.__node
+            tokens = tokenizer.split(string)
+            assert 0 < len(tokens)
+            for token in tokens:
+                token_id = self.__dictionary.add_if_absent(token)
+                child = self.__transitions[node].get(token_id)
+                if child is None:
+                    child = len(self.__transitions)
+                    self.__transitions[node][token_id] = child
+                    self.__transitions.append({})
+                    self.__finals.append(0)
+                node = child
+            self.__finals[node] = 1
+
+    def consume(self, prefix: str) -> Optional[TokenTrie]:
+        """
+        Consumes the given prefix, which must consist of whole tokens separated by single spaces. If strings
+        that start with these tokens have been added to the trie, then the trie node corresponding to the prefix
+        is returned. Otherwise, None is returned.
+        """
+        node = self.__node
+        for token in (prefix.split(" ") if prefix else []):
+            token_id = self.__dictionary.get_term_id(token)
+            node = None if token_id is None else self.__transitions[node].get(token_id)
+            if node is None:
+                return None
+        trie = TokenTrie.__new__(TokenTrie)
+        (trie.__dictionary, trie.__transitions, trie.__finals, trie.__node) = (self.__dictionary, self.__transitions, self.__finals, node)
+        return trie
+
+    def is_final(self) -> bool:
+        """
+        Returns True iff the current node is a final/terminal state in the trie/automaton, i.e.,
+        if a string has been added to the trie where the end of the string ends up in this node.
+        """
+        return bool(self.__finals[self.__node])
+
+    def size(self) -> int:
+        """
+        Returns the number of nodes in the trie.
+        """
+        return len(self.__transitions)
+
+    def get_dictionary(self) -> InMemoryDictionary:
+        """
+        Returns the dictionary that maps tokens to the token identifiers that label the transitions.
+        """
+        return self.__dictionary
+
+    def _get_transitions(self) -> Tuple[List[Dict[int, int]], bytearray, int]:
+        """
+        Returns the transitions out of all nodes, whether each node is final, and the current node. The
+        root is node 0. Meant for StringFinder, which must not modify them.
+        """
+        return (self.__transitions, self.__finals, self.__node)
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 from .tokenizer import Tokenizer
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Iterator, Tuple
 
 
 class Trie:
@@ -34,6 +34,20 @@ class Trie:
             trie = trie.__children[c]
         trie.__children[""] = Trie()
 
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yields the strings that lead from the current node to a final/terminal state. For the root
+        node, these are the strings that have been added to the trie. The order is unspecified.
+        """
+        stack = [("", self)]
+        while stack:
+            (prefix, trie) = stack.pop()
+            for (c, child) in trie.__children.items():
+                if c:
+                    stack.append((prefix + c, child))
+                else:
+                    yield prefix
+
     def add(self, strings: Iterable[str], tokenizer: Tokenizer) -> None:
         """
         Adds all the strings to the trie. The tokenizer is used so that we're robust
@@ -41,7 +55,7 @@ class Trie:
         """
         # TODO: Make the tokenizer a class variable.
         for string in strings:
-            self.__add(" ".join(tokenizer.strings(string)))
+            self.__add(" ".join(tokenizer.split(string)))
 
     def consume(self, prefix: str) -> Optional[Trie]:
         """
@@ -56,6 +70,13 @@ class Trie:
                 return None
         return trie
 
+    def children(self) -> Iterator[Tuple[str, Trie]]:
+        """
+        Yields the (character, node) pairs for the transitions out of the current node. The order
+        is unspecified.
+        """
+        return ((c, child) for (c, child) in self.__children.items() if c)
+
     def is_final(self) -> bool:
         """
         Returns True iff the current node is a final/terminal state in the trie/automaton, i.e.,
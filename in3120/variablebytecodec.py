@@ -2,15 +2,22 @@
 # -*- coding: utf-8 -*-
 
 from struct import pack
-from typing import Tuple
+from .integercodec import IntegerCodec
+from typing import Iterable, List, Tuple
 
 
-class VariableByteCodec:
+class VariableByteCodec(IntegerCodec):
     """
     A simple encoder/decoder for variable-byte encoding. See Figure 5.8 in
     https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    Every number is self-delimiting, so unlike other codecs there are no real restrictions
+    on how frames can be decoded.
     """
 
+    # Maps a byte to the same byte but with the high bit cleared.
+    __STRIP_HIGH_BIT = bytes(b & 127 for b in range(256))
+
     @staticmethod
     def encode(number: int, destination: bytearray) -> int:
         """
@@ -50,3 +57,76 @@ class VariableByteCodec:
             else:
                 number = 128 * number + (byte - 128)
                 return (number, where - start)
+
+    @staticmethod
+    def encode_many(numbers: Iterable[int], destination: bytearray) -> int:
+        """
+        Encodes all the given numbers in sequence, and appends the resulting bytes to
+        the given destination buffer. Returns the number of bytes that were appended.
+
+        Produces the exact same bytes as invoking encode() once per number, but does
+        the work in a single pass and extends the destination buffer only once.
+        """
+        assert destination is not None
+        buffer = bytearray()
+        append = buffer.append
+        for number in numbers:
+            assert number >= 0
+            if number < 128:
+                append(number | 128)
+            elif number < 16384:
+                buffer += bytes((number >> 7, (number & 127) | 128))
+            elif number < 2097152:
+                buffer += bytes((number >> 14, (number >> 7) & 127, (number & 127) | 128))
+            else:
+                values = bytearray(((number & 127) | 128,))
+                number >>= 7
+                while number:
+                    values.append(number & 127)
+                    number >>= 7
+                values.reverse()
+                buffer += values
+        destination.extend(buffer)
+        return len(buffer)
+
+    @staticmethod
+    def decode_many(source: bytearray, start: int, count: int) -> Tuple[List[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the next count numbers.
+        Returns a pair comprised of the decoded numbers, and the number of bytes read from
+        the source buffer.
+
+        Produces the exact same numbers as invoking decode() count times, but walks the
+        buffer in a single tight loop instead of paying for a function call per number.
+        The source buffer can be anything that supports the buffer protocol, e.g., a
+        bytearray or a memory-mapped file.
+        """
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        assert start == 0 or source[start - 1] >= 128
+        if count == 0:
+            return ([], 0)
+        view = memoryview(source)[start:]
+
+        # Fast path: If the next count bytes all have their high bits set, then these bytes are
+        # all single-byte numbers. We then just need to strip off the high bits, table-driven.
+        head = view[:count]
+        if len(head) == count and min(head) >= 128:
+            return (list(head.tobytes().translate(VariableByteCodec.__STRIP_HIGH_BIT)), count)
+
+        # Slow path: Decode byte by byte.
+        numbers = []
+        append = numbers.append
+        number = 0
+        where = start
+        for byte in view:
+            where += 1
+            if byte < 128:
+                number = (number << 7) | byte
+            else:
+                append((number << 7) | (byte & 127))
+                if len(numbers) == count:
+                    return (numbers, where - start)
+                number = 0
+        raise IndexError("Buffer exhausted before all numbers were decoded")
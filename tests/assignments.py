@@ -19,7 +19,7 @@ def assignment_a_suite() -> unittest.TestSuite:
 
 
 def assignment_b_suite() -> unittest.TestSuite:
-    return build_test_suite(["TestSuffixArray", "TestTrie", "TestStringFinder"])
+    return build_test_suite(["TestSuffixArray", "TestTrie", "TestCompactTrie", "TestTokenTrie", "TestStringFinder"])
 
 
 def assignment_c_suite() -> unittest.TestSuite:
@@ -27,7 +27,7 @@ def assignment_c_suite() -> unittest.TestSuite:
 
 
 def assignment_d_suite() -> unittest.TestSuite:
-    return build_test_suite(["TestBetterRanker", "TestShingleGenerator"])
+    return build_test_suite(["TestBetterRanker", "TestCachedBetterRanker", "TestBM25Ranker", "TestShingleGenerator"])
 
 
 def assignment_e_suite() -> unittest.TestSuite:
@@ -37,8 +37,10 @@ def assignment_e_suite() -> unittest.TestSuite:
 def assignment_x_suite() -> unittest.TestSuite:
     return build_test_suite(["TestBrainDeadNormalizer", "TestBrainDeadTokenizer", "TestInMemoryDictionary",
                              "TestInMemoryDocument", "TestInMemoryCorpus", "TestSieve", "TestVariableByteCodec",
-                             "TestInMemoryPostingList", "TestCompressedInMemoryPostingList",
-                             "TestInMemoryInvertedIndexWithCompression", "TestExpressionComposer",
+                             "TestEliasGammaCodec", "TestEliasDeltaCodec", "TestPForDeltaCodec", "TestSimple8bCodec",
+                             "TestInMemoryPostingList", "TestArrayPostingList", "TestCompressedInMemoryPostingList",
+                             "TestBlockCompressedInMemoryPostingList",
+                             "TestInMemoryInvertedIndexWithCompression", "TestOnDiskInvertedIndex", "TestExpressionComposer",
                              "TestShallowCaseExtractor", "TestDocumentPipeline"])
 
 
@@ -10,6 +10,32 @@ def data_path(filename: str):
     return "../data/" + filename
 
 
+def is_stale(filename: str, cached_filename: str) -> bool:
+    import os
+    return not os.path.exists(cached_filename) or os.path.getmtime(data_path(filename)) > os.path.getmtime(cached_filename)
+
+
+def cached_filename(filename: str, normalizer: in3120.normalizer.Normalizer, tokenizer: in3120.tokenizer.Tokenizer,
+                    extension: str) -> str:
+    return data_path(f"{filename}.{normalizer.__class__.__name__.lower()}.{tokenizer.__class__.__name__.lower()}.{extension}")
+
+
+def cached_index(filename: str, corpus: in3120.Corpus, normalizer: in3120.normalizer.Normalizer,
+                 tokenizer: in3120.tokenizer.Tokenizer) -> in3120.InvertedIndex:
+    index_filename = cached_filename(filename, normalizer, tokenizer, "index")
+    if is_stale(filename, index_filename) or not in3120.OnDiskInvertedIndex.is_compatible(index_filename):
+        in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer).save(index_filename)
+    return in3120.OnDiskInvertedIndex(index_filename, normalizer, tokenizer)
+
+
+def cached_suffix_array(filename: str, corpus: in3120.Corpus, normalizer: in3120.normalizer.Normalizer,
+                        tokenizer: in3120.tokenizer.Tokenizer) -> in3120.SuffixArray:
+    suffix_array_filename = cached_filename(filename, normalizer, tokenizer, "suffixarray")
+    if is_stale(filename, suffix_array_filename) or not in3120.SuffixArray.is_compatible(suffix_array_filename):
+        in3120.SuffixArray(corpus, ["body"], normalizer, tokenizer).save(suffix_array_filename)
+    return in3120.SuffixArray.load(suffix_array_filename, corpus, normalizer, tokenizer)
+
+
 def simple_repl(prompt: str, evaluator: Callable[[str], Any]):
     from timeit import default_timer as timer
     import pprint
@@ -33,7 +59,7 @@ def repl_a():
     normalizer = in3120.BrainDeadNormalizer()
     tokenizer = in3120.BrainDeadTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("cran.xml"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index("cran.xml", corpus, normalizer, tokenizer)
     print("Enter one or more index terms and inspect their posting lists.")
     simple_repl("terms", lambda ts: {t: list(index.get_postings_iterator(t)) for t in index.get_terms(ts)})
 
@@ -43,7 +69,7 @@ def repl_b_1():
     normalizer = in3120.BrainDeadNormalizer()
     tokenizer = in3120.BrainDeadTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("cran.xml"))
-    engine = in3120.SuffixArray(corpus, ["body"], normalizer, tokenizer)
+    engine = cached_suffix_array("cran.xml", corpus, normalizer, tokenizer)
     options = {"debug": False, "hit_count": 5}
     print("Enter a prefix phrase query and find matching documents.")
     print(f"Lookup options are {options}.")
@@ -56,8 +82,7 @@ def repl_b_2():
     normalizer = in3120.BrainDeadNormalizer()
     tokenizer = in3120.BrainDeadTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("mesh.txt"))
-    dictionary = in3120.Trie()
-    dictionary.add((normalizer.normalize(normalizer.canonicalize(d["body"])) for d in corpus), tokenizer)
+    dictionary = in3120.CompactTrie((normalizer.normalize(normalizer.canonicalize(d["body"])) for d in corpus), tokenizer)
     engine = in3120.StringFinder(dictionary, tokenizer)
     print("Enter some text and locate words and phrases that are MeSH terms.")
     simple_repl("text", lambda t: list(engine.scan(normalizer.normalize(normalizer.canonicalize(t)))))
@@ -68,7 +93,7 @@ def repl_c():
     normalizer = in3120.BrainDeadNormalizer()
     tokenizer = in3120.BrainDeadTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("en.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index("en.txt", corpus, normalizer, tokenizer)
     ranker = in3120.BrainDeadRanker()
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -100,7 +125,7 @@ def repl_d_2():
     normalizer = in3120.BrainDeadNormalizer()
     tokenizer = in3120.BrainDeadTokenizer()
     corpus = in3120.InMemoryCorpus(data_path("en.txt"))
-    index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+    index = cached_index("en.txt", corpus, normalizer, tokenizer)
     ranker = in3120.BetterRanker(corpus, index)
     engine = in3120.SimpleSearchEngine(corpus, index)
     options = {"debug": False, "hit_count": 5, "match_threshold": 0.5}
@@ -129,6 +154,33 @@ def repl_x_1():
     simple_repl("text", lambda t: list(extractor.extract(t)))
 
 
+def repl_x_2():
+    normalizer = in3120.BrainDeadNormalizer()
+    tokenizer = in3120.BrainDeadTokenizer()
+    codecs = [in3120.VariableByteCodec(), in3120.EliasGammaCodec(), in3120.EliasDeltaCodec(),
+              in3120.PForDeltaCodec(), in3120.Simple8bCodec()]
+
+    def report(filename: str):
+        corpus = in3120.InMemoryCorpus(data_path(filename))
+        statistics = {}
+        for codec in codecs:
+            posting_lists = []
+
+            def factory():
+                posting_lists.append(in3120.CompressedInMemoryPostingList(codec))
+                return posting_lists[-1]
+
+            in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, posting_list_factory=factory)
+            size = sum(posting_list.get_size_in_bytes() for posting_list in posting_lists)
+            length = sum(posting_list.get_length() for posting_list in posting_lists)
+            statistics[codec.__class__.__name__] = size / max(1, length)
+        return statistics
+
+    print("Enter the name of a bundled corpus, e.g., 'cran.xml', and see how compactly each codec stores its posting lists.")
+    print("Returned numbers are bytes per posting.")
+    simple_repl("corpus", report)
+
+
 def main():
     repls = {"a": repl_a,
              "b-1": repl_b_1,
@@ -137,7 +189,8 @@ def main():
              "d-1": repl_d_1,
              "d-2": repl_d_2,
              "e": repl_e,
-             "x-1": repl_x_1}
+             "x-1": repl_x_1,
+             "x-2": repl_x_2}
     targets = sys.argv[1:]
     if not targets:
         print(f"{sys.argv[0]} [{'|'.join(key for key in repls.keys())}]")
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestArrayPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.ArrayPostingList())
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.ArrayPostingList())
+
+    def test_append_after_iterate(self):
+        self._tester._test_append_after_iterate(in3120.ArrayPostingList())
+
+    def test_append_many(self):
+        self._tester._test_append_many(in3120.ArrayPostingList())
+
+    def test_get_arrays(self):
+        postings = in3120.ArrayPostingList()
+        postings.append_posting(in3120.Posting(21, 2))
+        postings.append_posting(in3120.Posting(42, 1))
+        postings.append_posting(in3120.Posting(70, 3))
+        postings.finalize_postings()
+        document_ids, term_frequencies = postings.get_arrays()
+        self.assertListEqual(list(document_ids), [21, 42, 70])
+        self.assertListEqual(list(term_frequencies), [2, 1, 3])
+
+    def test_skip_to(self):
+        postings = in3120.ArrayPostingList()
+        for document_id in range(0, 10000, 3):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        iterator = iter(postings)
+        self.assertEqual(iterator.skip_to(1).document_id, 3)
+        self.assertEqual(iterator.skip_to(4).document_id, 6)
+        self.assertEqual(iterator.skip_to(5000).document_id, 5001)
+        self.assertEqual(iterator.skip_to(5004).document_id, 5004)
+        self.assertEqual(iterator.__length_hint__(), len(postings) - 1669)
+        self.assertEqual(iterator.skip_to(9999).document_id, 9999)
+        self.assertIsNone(iterator.skip_to(10000))
+
+    def test_inverted_index_access(self):
+        normalizer = in3120.BrainDeadNormalizer()
+        tokenizer = in3120.BrainDeadTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer,
+                                              posting_list_factory=in3120.ArrayPostingList)
+        for term in ["water", "pollution", "hiv", "protein"]:
+            expected = [(p.document_id, p.term_frequency) for p in index1[term]]
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index2[term]], expected)
+            document_ids, term_frequencies = index2.get_posting_list(term).get_arrays()
+            self.assertListEqual(list(zip(document_ids, term_frequencies)), expected)
+        self.assertIsNone(index2.get_posting_list("xyzzy"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
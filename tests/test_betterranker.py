@@ -33,6 +33,23 @@ class TestBetterRanker(unittest.TestCase):
         self.assertGreater(score2, 0.0)
         self.assertGreater(score2, score1)
 
+    def test_evaluate_many(self):
+        query_terms = [("foo", 1), ("bar", 2), ("the", 1), ("nonexistent", 1)]
+        documents = [(0, [(0, 1), (2, 1)]), (2, [(0, 2)]), (3, [(1, 1), (2, 1)]), (4, [(1, 300)])]
+        expected = []
+        for (document_id, updates) in documents:
+            self.__ranker.reset(document_id)
+            for (i, term_frequency) in updates:
+                self.__ranker.update(query_terms[i][0], query_terms[i][1], in3120.Posting(document_id, term_frequency))
+            expected.append(self.__ranker.evaluate())
+        document_ids = [document_id for (document_id, updates) in documents for _ in updates]
+        term_indices = [i for (_, updates) in documents for (i, _) in updates]
+        term_frequencies = [term_frequency for (_, updates) in documents for (_, term_frequency) in updates]
+        scores = self.__ranker.evaluate_many(query_terms, document_ids, term_indices, term_frequencies)
+        self.assertListEqual(list(scores), expected)
+        scores = in3120.Ranker.evaluate_many(self.__ranker, query_terms, document_ids, term_indices, term_frequencies)
+        self.assertListEqual(list(scores), expected)
+
     def test_document_id_mismatch(self):
         self.__ranker.reset(21)
         with self.assertRaises(AssertionError):
@@ -52,6 +69,17 @@ class TestBetterRanker(unittest.TestCase):
         self.assertGreater(score2, 0.0)
         self.assertGreater(score1, score2)
 
+    def test_upper_bounds(self):
+        self.assertAlmostEqual(self.__ranker.get_static_upper_bound(), 0.9, 8)
+        self.assertEqual(self.__ranker.get_upper_bound("xyzzy", 1, 0), 0.0)
+        for (term, postings) in [("foo", [(0, 1), (1, 1), (2, 2)]), ("baz", [(5, 1), (6, 1), (7, 2)])]:
+            for multiplicity in [1, 2]:
+                upper_bound = self.__ranker.get_upper_bound(term, multiplicity, 2) + self.__ranker.get_static_upper_bound()
+                for (document_id, term_frequency) in postings:
+                    self.__ranker.reset(document_id)
+                    self.__ranker.update(term, multiplicity, in3120.Posting(document_id, term_frequency))
+                    self.assertLessEqual(self.__ranker.evaluate(), upper_bound + 1e-9)
+
     def test_static_quality_score(self):
         self.__ranker.reset(0)
         self.__ranker.update("foo", 1, in3120.Posting(0, 1))
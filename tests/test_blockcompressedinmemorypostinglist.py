@@ -0,0 +1,129 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_inmemorypostinglist import TestInMemoryPostingList
+from context import in3120
+
+
+class TestBlockCompressedInMemoryPostingList(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestInMemoryPostingList()
+        self._tester.setUp()
+        self._normalizer = in3120.BrainDeadNormalizer()
+        self._tokenizer = in3120.BrainDeadTokenizer()
+
+    def test_append_and_iterate(self):
+        self._tester._test_append_and_iterate(in3120.BlockCompressedInMemoryPostingList())
+        self._tester._test_append_and_iterate(in3120.BlockCompressedInMemoryPostingList(2))
+
+    def test_invalid_append(self):
+        self._tester._test_invalid_append(in3120.BlockCompressedInMemoryPostingList())
+
+    def test_append_after_iterate(self):
+        self._tester._test_append_after_iterate(in3120.BlockCompressedInMemoryPostingList())
+
+    def test_append_many(self):
+        self._tester._test_append_many(in3120.BlockCompressedInMemoryPostingList())
+        self._tester._test_append_many(in3120.BlockCompressedInMemoryPostingList(7))
+
+    def test_invalid_block_size(self):
+        for i in [-1, 0]:
+            with self.assertRaises(AssertionError):
+                in3120.BlockCompressedInMemoryPostingList(i)
+
+    def test_multiple_blocks(self):
+        postings = in3120.BlockCompressedInMemoryPostingList(4)
+        expected = [(7 * i + 3, i % 5 + 1) for i in range(0, 39)]
+        for (document_id, term_frequency) in expected:
+            postings.append_posting(in3120.Posting(document_id, term_frequency))
+        postings.finalize_postings()
+        self.assertEqual(len(postings), len(expected))
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], expected)
+
+    def test_codecs(self):
+        codecs = [in3120.EliasGammaCodec(), in3120.EliasDeltaCodec(), in3120.PForDeltaCodec(), in3120.Simple8bCodec()]
+        expected = [(7 * i + 3, i % 5 + 1) for i in range(0, 39)]
+        for codec in codecs:
+            postings = in3120.BlockCompressedInMemoryPostingList(4, codec)
+            for (document_id, term_frequency) in expected:
+                postings.append_posting(in3120.Posting(document_id, term_frequency))
+            postings.finalize_postings()
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], expected)
+            self.assertEqual(iter(postings).skip_to(100).document_id, 101)
+
+    def test_skip_to(self):
+        postings = in3120.BlockCompressedInMemoryPostingList(4)
+        for document_id in range(10, 200, 10):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        postings.finalize_postings()
+        iterator = iter(postings)
+        self.assertEqual(iterator.skip_to(0).document_id, 10)
+        self.assertEqual(iterator.skip_to(10).document_id, 20)
+        self.assertEqual(iterator.skip_to(35).document_id, 40)
+        self.assertEqual(next(iterator).document_id, 50)
+        self.assertEqual(iterator.skip_to(50).document_id, 60)
+        self.assertEqual(iterator.skip_to(131).document_id, 140)
+        self.assertEqual(iterator.skip_to(190).document_id, 190)
+        self.assertIsNone(iterator.skip_to(191))
+        self.assertIsNone(next(iterator, None))
+        self.assertIsNone(iter(postings).skip_to(1000))
+
+    def test_length_hint(self):
+        from operator import length_hint
+        postings = in3120.BlockCompressedInMemoryPostingList(4)
+        for document_id in range(10, 200, 10):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        postings.finalize_postings()
+        iterator = iter(postings)
+        self.assertEqual(length_hint(iterator), 19)
+        next(iterator)
+        self.assertEqual(length_hint(iterator), 18)
+        iterator.skip_to(131)
+        self.assertEqual(length_hint(iterator), 5)
+        iterator.skip_to(1000)
+        self.assertEqual(length_hint(iterator), 0)
+
+    def test_skip_to_array_posting_list(self):
+        postings = in3120.ArrayPostingList()
+        for document_id in range(10, 100, 10):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        iterator = iter(postings)
+        self.assertEqual(iterator.skip_to(35).document_id, 40)
+        self.assertEqual(next(iterator).document_id, 50)
+        self.assertEqual(iterator.skip_to(90).document_id, 90)
+        self.assertIsNone(iterator.skip_to(91))
+
+    def test_mesh_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer,
+                                              posting_list_factory=in3120.BlockCompressedInMemoryPostingList)
+        merger = in3120.PostingsMerger()
+        for (term1, term2) in [("hiv", "protein"), ("water", "toxic"), ("of", "the"), ("acid", "and")]:
+            expected = [p.document_id for p in merger.intersection(index1[term1], index1[term2])]
+            self.assertListEqual([p.document_id for p in merger.intersection(index2[term1], index2[term2])],
+                                 expected)
+            self.assertListEqual([p.document_id for p in merger.intersection(index2[term2], index2[term1])],
+                                 expected)
+        self.assertListEqual([p.document_id for p in merger.intersection(index2["hiv"], index2["protein"])],
+                             [11316, 11319, 11320, 11321])
+
+    def test_skipping_search_engine(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index1 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        index2 = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer,
+                                              posting_list_factory=in3120.BlockCompressedInMemoryPostingList)
+        engine1 = in3120.SimpleSearchEngine(corpus, index1)
+        engine2 = in3120.SimpleSearchEngine(corpus, index2)
+        ranker = in3120.BrainDeadRanker()
+        options = {"match_threshold": 0.6, "hit_count": 100}
+        for query in ["acid of the water", "hiv protein and", "cell of the type and"]:
+            matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, ranker)]
+            matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, ranker)]
+            self.assertListEqual(sorted(matches2), sorted(matches1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
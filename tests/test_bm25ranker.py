@@ -0,0 +1,102 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import unittest
+from context import in3120
+
+
+class TestBM25Ranker(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.BrainDeadNormalizer()
+        self._tokenizer = in3120.BrainDeadTokenizer()
+        self._corpus = in3120.InMemoryCorpus()
+        self._corpus.add_document(in3120.InMemoryDocument(0, {"title": "the foo"}))
+        self._corpus.add_document(in3120.InMemoryDocument(1, {"title": "the foo and the bar"}))
+        self._corpus.add_document(in3120.InMemoryDocument(2, {"title": "the foo foo"}))
+        self._corpus.add_document(in3120.InMemoryDocument(3, {"title": "the bar"}))
+        self._index = in3120.InMemoryInvertedIndex(self._corpus, ["title"], self._normalizer, self._tokenizer)
+        self._ranker = in3120.BM25Ranker(self._corpus, self._index)
+
+    def _score(self, document_id, updates):
+        self._ranker.reset(document_id)
+        for (term, multiplicity, term_frequency) in updates:
+            self._ranker.update(term, multiplicity, in3120.Posting(document_id, term_frequency))
+        return self._ranker.evaluate()
+
+    def test_score(self):
+        # Document 0 has length 2, and the average document length is 12 / 4.
+        idf_score = math.log(1.0 + (4 - 3 + 0.5) / (3 + 0.5))
+        tf_score = (1 * 2.2) / (1 + 1.2 * (1.0 - 0.75 + 0.75 * (2 / (12 / 4))))
+        self.assertAlmostEqual(self._score(0, [("foo", 1, 1)]), tf_score * idf_score)
+        self.assertAlmostEqual(self._score(0, [("foo", 2, 1)]), 2 * tf_score * idf_score)
+
+    def test_document_length(self):
+        self.assertGreater(self._score(0, [("foo", 1, 1)]), self._score(1, [("foo", 1, 1)]))
+
+    def test_term_frequency(self):
+        self.assertGreater(self._score(2, [("foo", 1, 2)]), self._score(0, [("foo", 1, 1)]))
+
+    def test_inverse_document_frequency(self):
+        self.assertGreater(self._score(3, [("bar", 1, 1)]), self._score(3, [("the", 1, 1)]))
+        self.assertGreater(self._score(3, [("the", 1, 1)]), 0.0)
+
+    def test_evaluate_many(self):
+        query_terms = [("foo", 1), ("bar", 2), ("the", 1), ("nonexistent", 1)]
+        documents = [(0, [(0, 1), (2, 1)]), (1, [(0, 1), (1, 1), (2, 2)]), (2, [(0, 2), (2, 1)]), (3, [(1, 1)])]
+        expected = [self._score(document_id, [(query_terms[i][0], query_terms[i][1], term_frequency)
+                                              for (i, term_frequency) in updates])
+                    for (document_id, updates) in documents]
+        document_ids = [document_id for (document_id, updates) in documents for _ in updates]
+        term_indices = [i for (_, updates) in documents for (i, _) in updates]
+        term_frequencies = [term_frequency for (_, updates) in documents for (_, term_frequency) in updates]
+        scores = self._ranker.evaluate_many(query_terms, document_ids, term_indices, term_frequencies)
+        self.assertListEqual(list(scores), expected)
+
+    def test_upper_bounds(self):
+        self.assertEqual(self._ranker.get_static_upper_bound(), 0.0)
+        self.assertEqual(self._ranker.get_upper_bound("nonexistent", 1, 0), 0.0)
+        for term in ["the", "foo", "bar"]:
+            upper_bound = self._ranker.get_upper_bound(term, 2, self._index.get_max_term_frequency(term))
+            for posting in self._index[term]:
+                self.assertLessEqual(self._score(posting.document_id, [(term, 2, posting.term_frequency)]), upper_bound)
+
+    def test_document_id_mismatch(self):
+        self._ranker.reset(21)
+        with self.assertRaises(AssertionError):
+            self._ranker.update("foo", 1, in3120.Posting(42, 4))
+
+    def test_requires_document_lengths(self):
+        class LengthlessInvertedIndex(in3120.InvertedIndex):
+            def __init__(self, wrapped: in3120.InvertedIndex):
+                self.__wrapped = wrapped
+
+            def get_terms(self, buffer: str):
+                return self.__wrapped.get_terms(buffer)
+
+            def get_postings_iterator(self, term: str):
+                return self.__wrapped.get_postings_iterator(term)
+
+            def get_document_frequency(self, term: str) -> int:
+                return self.__wrapped.get_document_frequency(term)
+
+        with self.assertRaises(AssertionError):
+            in3120.BM25Ranker(self._corpus, LengthlessInvertedIndex(self._index))
+
+    def test_search_engine(self):
+        corpus = in3120.InMemoryCorpus("../data/en.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        ranker = in3120.BM25Ranker(corpus, index)
+        for query in ["president of the united states", "the olympic games in london"]:
+            options = {"match_threshold": 0.5, "hit_count": 10}
+            matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+            options["pruning"] = "wand"
+            matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+            self.assertEqual(len(matches1), 10)
+            self.assertListEqual(matches2, matches1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -20,6 +20,16 @@ class TestBrainDeadRanker(unittest.TestCase):
         self.__ranker.update("baz", 2, in3120.Posting(42, 2))
         self.assertEqual(self.__ranker.evaluate(), 5)
 
+    def test_evaluate_many(self):
+        query_terms = [("foo", 2), ("bar", 1), ("baz", 2)]
+        scores = self.__ranker.evaluate_many(query_terms, [21, 21, 42, 42], [0, 1, 0, 2], [4, 3, 1, 2])
+        self.assertListEqual(list(scores), [11.0, 6.0])
+        self.assertListEqual(list(self.__ranker.evaluate_many(query_terms, [], [], [])), [])
+
+    def test_upper_bounds(self):
+        self.assertEqual(self.__ranker.get_upper_bound("foo", 2, 4), 8.0)
+        self.assertEqual(self.__ranker.get_static_upper_bound(), 0.0)
+
     def test_document_id_mismatch(self):
         self.__ranker.reset(21)
         with self.assertRaises(AssertionError):
@@ -22,10 +22,21 @@ class TestBrainDeadTokenizer(unittest.TestCase):
         result = list(self.__tokenizer.ranges("Dette  er en\nprøve!"))
         self.assertListEqual(result, [(0, 5), (7, 9), (10, 12), (13, 18)])
 
+    def test_spans(self):
+        result = self.__tokenizer.spans("Dette  er en\nprøve!")
+        self.assertEqual(result.typecode, "I")
+        self.assertListEqual(result.tolist(), [0, 5, 7, 9, 10, 12, 13, 18])
+
+    def test_split(self):
+        result = self.__tokenizer.split("Dette  er en\nprøve!")
+        self.assertListEqual(result, ["Dette", "er", "en", "prøve"])
+
     def test_empty_input(self):
         self.assertListEqual(list(self.__tokenizer.strings("")), [])
         self.assertListEqual(list(self.__tokenizer.tokens("")), [])
         self.assertListEqual(list(self.__tokenizer.ranges("")), [])
+        self.assertListEqual(self.__tokenizer.spans("").tolist(), [])
+        self.assertListEqual(self.__tokenizer.split(""), [])
 
     def test_uses_yield(self):
         from types import GeneratorType
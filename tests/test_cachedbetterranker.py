@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestCachedBetterRanker(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.BrainDeadNormalizer()
+        self._tokenizer = in3120.BrainDeadTokenizer()
+        self._corpus = in3120.InMemoryCorpus()
+        self._corpus.add_document(in3120.InMemoryDocument(0, {"title": "the foo", "static_quality_score": 0.9}))
+        self._corpus.add_document(in3120.InMemoryDocument(1, {"title": "the foo", "static_quality_score": 0.2}))
+        self._corpus.add_document(in3120.InMemoryDocument(2, {"title": "the foo foo", "static_quality_score": 0.2}))
+        self._corpus.add_document(in3120.InMemoryDocument(3, {"title": "the bar"}))
+        self._corpus.add_document(in3120.InMemoryDocument(4, {"title": "the bar bar"}))
+        self._index = in3120.InMemoryInvertedIndex(self._corpus, ["title"], self._normalizer, self._tokenizer)
+
+    def test_same_scores_as_better_ranker(self):
+        ranker1 = in3120.BetterRanker(self._corpus, self._index)
+        ranker2 = in3120.CachedBetterRanker(self._corpus, self._index)
+        for (document_id, updates) in [(0, [("foo", 1, 1)]), (1, [("foo", 2, 1), ("the", 1, 1)]),
+                                       (2, [("foo", 1, 2)]), (4, [("bar", 300, 2), ("the", 1, 1)]),
+                                       (3, [("bar", 1, 1)])]:
+            for ranker in [ranker1, ranker2]:
+                ranker.reset(document_id)
+                for (term, multiplicity, term_frequency) in updates:
+                    ranker.update(term, multiplicity, in3120.Posting(document_id, term_frequency))
+            self.assertEqual(ranker2.evaluate(), ranker1.evaluate())
+        self.assertEqual(ranker2.get_static_upper_bound(), ranker1.get_static_upper_bound())
+
+    def test_evaluate_many(self):
+        ranker1 = in3120.BetterRanker(self._corpus, self._index)
+        ranker2 = in3120.CachedBetterRanker(self._corpus, self._index)
+        query_terms = [("foo", 2), ("the", 1), ("bar", 1)]
+        arguments = (query_terms, [0, 0, 2, 4, 4], [0, 1, 0, 1, 2], [1, 1, 2, 1, 1000])
+        self.assertListEqual(list(ranker2.evaluate_many(*arguments)), list(ranker1.evaluate_many(*arguments)))
+
+    def test_large_term_frequency(self):
+        ranker1 = in3120.BetterRanker(self._corpus, self._index)
+        ranker2 = in3120.CachedBetterRanker(self._corpus, self._index)
+        for ranker in [ranker1, ranker2]:
+            ranker.reset(2)
+            ranker.update("foo", 1, in3120.Posting(2, 1000))
+        self.assertEqual(ranker2.evaluate(), ranker1.evaluate())
+
+    def test_bounded_idf_cache(self):
+        ranker1 = in3120.BetterRanker(self._corpus, self._index)
+        ranker2 = in3120.CachedBetterRanker(self._corpus, self._index)
+        ranker2._IDF_CACHE_SIZE = 2
+        for term in ["foo", "the", "bar", "foo", "bar", "the"]:
+            for ranker in [ranker1, ranker2]:
+                ranker.reset(3)
+                ranker.update(term, 1, in3120.Posting(3, 1))
+            self.assertEqual(ranker2.evaluate(), ranker1.evaluate())
+            self.assertLessEqual(len(ranker2._idf_scores), 2)
+
+    def test_document_id_mismatch(self):
+        ranker = in3120.CachedBetterRanker(self._corpus, self._index)
+        ranker.reset(21)
+        with self.assertRaises(AssertionError):
+            ranker.update("foo", 1, in3120.Posting(42, 4))
+
+    def test_search_engine(self):
+        corpus = in3120.InMemoryCorpus("../data/en.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ["president of the united states", "the olympic games in london"]:
+            matches1 = [(m["score"], m["document"].document_id)
+                        for m in engine.evaluate(query, options, in3120.BetterRanker(corpus, index))]
+            matches2 = [(m["score"], m["document"].document_id)
+                        for m in engine.evaluate(query, options, in3120.CachedBetterRanker(corpus, index))]
+            self.assertListEqual(matches2, matches1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
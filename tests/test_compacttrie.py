@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestCompactTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.__tokenizer = in3120.BrainDeadTokenizer()
+
+    def test_access_nodes(self):
+        root = in3120.CompactTrie(["abba", "ørret", "abb", "abbab", "abbor"], self.__tokenizer)
+        self.assertFalse(root.is_final())
+        self.assertIsNone(root.consume("snegle"))
+        node = root.consume("ab")
+        self.assertFalse(node.is_final())
+        node = node.consume("b")
+        self.assertTrue(node.is_final())
+        self.assertEqual(node, root.consume("abb"))
+        self.assertNotEqual(node, root.consume("abba"))
+        self.assertTrue(root.consume("abbor").is_final())
+        self.assertIsNone(root.consume("abbora"))
+        self.assertEqual(root.consume(""), root)
+
+    def test_iterate_strings(self):
+        root = in3120.CompactTrie(["abba", "ørret", "abb", "abbab", "abbor", "abba"], self.__tokenizer)
+        self.assertListEqual(list(root), ["abb", "abba", "abbab", "abbor", "ørret"])
+        self.assertListEqual(list(root.consume("abb")), ["", "a", "ab", "or"])
+
+    def test_children(self):
+        root = in3120.CompactTrie(["abba", "ab c", "b"], self.__tokenizer)
+        self.assertListEqual([c for (c, _) in root.children()], ["a", "b"])
+        node = root.consume("ab")
+        self.assertListEqual([(c, child) for (c, child) in node.children()], [(" ", node.consume(" ")), ("b", node.consume("b"))])
+        self.assertListEqual(list(root.consume("b").children()), [])
+
+    def test_empty_trie(self):
+        root = in3120.CompactTrie([], self.__tokenizer)
+        self.assertEqual(root.size(), 1)
+        self.assertFalse(root.is_final())
+        self.assertIsNone(root.consume("a"))
+        self.assertListEqual(list(root), [])
+
+    def test_unsorted_and_duplicate_strings(self):
+        root = in3120.CompactTrie(["b", "a  b", "a", "a b", "b"], self.__tokenizer)
+        self.assertEqual(root.size(), 5)
+        for string in ["a", "b", "a b"]:
+            self.assertTrue(root.consume(string).is_final())
+        self.assertFalse(root.consume("a ").is_final())
+
+    def test_same_as_trie(self):
+        import random
+        rng = random.Random(1234)
+        for _ in range(50):
+            strings = ["".join(rng.choice("abø ") for _ in range(rng.randint(1, 6))).strip() or "a"
+                       for _ in range(rng.randint(0, 30))]
+            trie = in3120.Trie()
+            trie.add(strings, self.__tokenizer)
+            compact_trie = in3120.CompactTrie(strings, self.__tokenizer)
+            for _ in range(50):
+                prefix = "".join(rng.choice("abøx ") for _ in range(rng.randint(0, 6)))
+                (node, compact_node) = (trie.consume(prefix), compact_trie.consume(prefix))
+                self.assertEqual(node is None, compact_node is None)
+                if node:
+                    self.assertEqual(node.is_final(), compact_node.is_final())
+
+    def test_mesh_terms_in_cran_corpus(self):
+        mesh = in3120.InMemoryCorpus("../data/mesh.txt")
+        cran = in3120.InMemoryCorpus("../data/cran.xml")
+        trie = in3120.Trie()
+        trie.add((d["body"] or "" for d in mesh), self.__tokenizer)
+        compact_trie = in3120.CompactTrie((d["body"] or "" for d in mesh), self.__tokenizer)
+        finder1 = in3120.StringFinder(trie, self.__tokenizer)
+        finder2 = in3120.StringFinder(compact_trie, self.__tokenizer)
+        for document_id in [0, 3, 1254]:
+            buffer = cran[document_id]["body"]
+            self.assertListEqual(list(finder2.scan(buffer)), list(finder1.scan(buffer)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -21,6 +21,38 @@ class TestCompressedInMemoryPostingList(unittest.TestCase):
     def test_invalid_append(self):
         self._tester1._test_invalid_append(in3120.CompressedInMemoryPostingList())
 
+    def test_append_after_iterate(self):
+        self._tester1._test_append_after_iterate(in3120.CompressedInMemoryPostingList())
+
+    def test_append_many(self):
+        self._tester1._test_append_many(in3120.CompressedInMemoryPostingList())
+
+    def test_codecs(self):
+        codecs = [in3120.VariableByteCodec(), in3120.EliasGammaCodec(), in3120.EliasDeltaCodec(),
+                  in3120.PForDeltaCodec(), in3120.Simple8bCodec()]
+        expected = [(7 * i + 3, i % 5 + 1) for i in range(0, 1000)]
+        for codec in codecs:
+            self._tester1._test_append_and_iterate(in3120.CompressedInMemoryPostingList(codec))
+            postings = in3120.CompressedInMemoryPostingList(codec)
+            for (document_id, term_frequency) in expected:
+                postings.append_posting(in3120.Posting(document_id, term_frequency))
+            postings.finalize_postings()
+            self.assertEqual(len(postings), len(expected))
+            self.assertGreater(postings.get_size_in_bytes(), 0)
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], expected)
+
+    def test_length_hint(self):
+        from operator import length_hint
+        postings = in3120.CompressedInMemoryPostingList()
+        for document_id in range(0, 1000):
+            postings.append_posting(in3120.Posting(document_id, 1))
+        postings.finalize_postings()
+        iterator = iter(postings)
+        self.assertEqual(length_hint(iterator), 1000)
+        for _ in range(0, 300):
+            next(iterator)
+        self.assertEqual(length_hint(iterator), 700)
+
     def test_mesh_corpus(self):
         self._tester2._test_mesh_corpus(True)
 
@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_variablebytecodec import TestVariableByteCodec
+from context import in3120
+
+
+class TestEliasDeltaCodec(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestVariableByteCodec()
+        self._tester.setUp()
+        self._codec = in3120.EliasDeltaCodec()
+
+    def test_frames(self):
+        self._tester._test_frames(self._codec)
+
+    def test_bit_layout(self):
+        # Encodes 1, 2, 3 and 4, i.e., "1", "0100", "0101" and "01100", padded with zeros.
+        data = bytearray()
+        self.assertEqual(self._codec.encode_many([0, 1, 2, 3], data), 3)
+        self.assertEqual(data, bytearray([128 + 2, 0b10100010, 0b10110000]))
+
+    def test_large_numbers_beat_elias_gamma(self):
+        data1 = bytearray()
+        data2 = bytearray()
+        numbers = [2 ** 30 + i for i in range(0, 100)]
+        self.assertLess(self._codec.encode_many(numbers, data1), in3120.EliasGammaCodec().encode_many(numbers, data2))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
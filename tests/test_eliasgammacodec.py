@@ -0,0 +1,31 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_variablebytecodec import TestVariableByteCodec
+from context import in3120
+
+
+class TestEliasGammaCodec(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestVariableByteCodec()
+        self._tester.setUp()
+        self._codec = in3120.EliasGammaCodec()
+
+    def test_frames(self):
+        self._tester._test_frames(self._codec)
+
+    def test_bit_layout(self):
+        # Encodes 1, 2, 3 and 4, i.e., "1", "010", "011" and "00100", padded with zeros.
+        data = bytearray()
+        self.assertEqual(self._codec.encode_many([0, 1, 2, 3], data), 3)
+        self.assertEqual(data, bytearray([128 + 2, 0b10100110, 0b01000000]))
+
+    def test_small_numbers_are_compact(self):
+        data = bytearray()
+        self.assertEqual(self._codec.encode_many([0] * 80, data), 11)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
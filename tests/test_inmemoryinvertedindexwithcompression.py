@@ -22,6 +22,15 @@ class TestInMemoryInvertedIndexWithCompression(unittest.TestCase):
     def test_multiple_fields(self):
         self._tester.test_multiple_fields()
 
+    def test_parallel_build(self):
+        self._tester.test_parallel_build()
+
+    def test_codecs(self):
+        for codec in [in3120.EliasGammaCodec(), in3120.PForDeltaCodec(), in3120.Simple8bCodec()]:
+            self._tester._compressed = codec
+            self._tester.test_access_postings()
+            self._tester.test_multiple_fields()
+
     def test_memory_usage(self):
         import tracemalloc
         import inspect
@@ -24,6 +24,10 @@ class TestInMemoryInvertedIndexWithoutCompression(unittest.TestCase):
         self.assertEqual(index.get_document_frequency("wtf"), 0)
         self.assertEqual(index.get_document_frequency("prøve"), 1)
         self.assertEqual(index.get_document_frequency("test"), 2)
+        self.assertEqual(index.get_max_term_frequency("wtf"), 0)
+        self.assertEqual(index.get_max_term_frequency("prøve"), 1)
+        self.assertEqual(index.get_max_term_frequency("test"), 2)
+        self.assertListEqual(list(index.get_document_lengths()), [4, 3])
 
     def test_mesh_corpus(self):
         corpus = in3120.InMemoryCorpus("../data/mesh.txt")
@@ -43,6 +47,36 @@ class TestInMemoryInvertedIndexWithoutCompression(unittest.TestCase):
         posting = next(index.get_postings_iterator('test'))
         self.assertEqual(posting.document_id, 0)
         self.assertEqual(posting.term_frequency, 5)
+        self.assertListEqual(list(index.get_document_lengths()), [10])
+
+    def test_parallel_build(self):
+        import os
+        import tempfile
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        expected = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed)
+        for workers in [2, 3]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed,
+                                                 workers=workers)
+            with tempfile.TemporaryDirectory() as directory:
+                # The saved files list all terms in term identifier order, followed by all postings.
+                filenames = [os.path.join(directory, name) for name in ["expected.index", "index.index"]]
+                expected.save(filenames[0])
+                index.save(filenames[1])
+                with open(filenames[0], "rb") as file1, open(filenames[1], "rb") as file2:
+                    self.assertEqual(file1.read(), file2.read())
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index["hydrogen"]],
+                                 [(p.document_id, p.term_frequency) for p in expected["hydrogen"]])
+            self.assertListEqual(list(index.get_document_lengths()), list(expected.get_document_lengths()))
+        with self.assertRaises(AssertionError):
+            in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed, workers=0)
+
+    def test_parallel_build_of_small_corpus(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test test"}))
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer, self._compressed, workers=4)
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["test"]], [(0, 1), (1, 2)])
+        self.assertListEqual(list(index.get_document_lengths()), [4, 2])
 
 
 if __name__ == '__main__':
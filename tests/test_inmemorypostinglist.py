@@ -42,12 +42,45 @@ class TestInMemoryPostingList(unittest.TestCase):
             with self.assertRaises(AssertionError):
                 postings.append_posting(in3120.Posting(21 - i, 2))
 
+    def _test_append_many(self, postings: in3120.PostingList):
+        from array import array
+        document_ids = [3 * i + 5 for i in range(0, 600)]
+        term_frequencies = [i % 7 + 1 for i in range(0, 600)]
+        postings.append_posting(in3120.Posting(2, 9))
+        postings.append_many(array("I", document_ids[:100]), array("I", term_frequencies[:100]))
+        postings.append_many([], [])
+        postings.append_many(document_ids[100:], term_frequencies[100:])
+        with self.assertRaises(AssertionError):
+            postings.append_many([document_ids[-1]], [1])
+        postings.finalize_postings()
+        self.assertEqual(postings.get_length(), 601)
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in postings],
+                             [(2, 9)] + list(zip(document_ids, term_frequencies)))
+
+    def _test_append_after_iterate(self, postings: in3120.PostingList):
+        expected = [(3 * i + 5, i % 7 + 1) for i in range(0, 599)]
+        for (i, (document_id, term_frequency)) in enumerate(expected):
+            postings.append_posting(in3120.Posting(document_id, term_frequency))
+            if i % 100 == 0:
+                self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], expected[:(i + 1)])
+            if i == 300:
+                postings.finalize_postings()
+        postings.finalize_postings()
+        self.assertEqual(postings.get_length(), len(expected))
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in postings], expected)
+
     def test_append_and_iterate(self):
         self._test_append_and_iterate(in3120.InMemoryPostingList())
 
+    def test_append_many(self):
+        self._test_append_many(in3120.InMemoryPostingList())
+
     def test_invalid_append(self):
         self._test_invalid_append(in3120.InMemoryPostingList())
 
+    def test_append_after_iterate(self):
+        self._test_append_after_iterate(in3120.InMemoryPostingList())
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
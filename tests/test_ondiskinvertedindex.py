@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from context import in3120
+
+
+class TestOnDiskInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._normalizer = in3120.BrainDeadNormalizer()
+        self._tokenizer = in3120.BrainDeadTokenizer()
+        (handle, self._filename) = tempfile.mkstemp(suffix=".index")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self._filename)
+
+    def _open(self, corpus: in3120.Corpus, fields):
+        in3120.InMemoryInvertedIndex(corpus, fields, self._normalizer, self._tokenizer).save(self._filename)
+        return in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+    def test_access_postings(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        index = self._open(corpus, ["body"])
+        self.assertListEqual(list(index.get_terms("PRøvE wtf tesT")), ["prøve", "wtf", "test"])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["prøve"]], [(1, 1)])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index.get_postings_iterator("wtf")], [])
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["test"]], [(0, 1), (1, 2)])
+        self.assertEqual(index.get_document_frequency("wtf"), 0)
+        self.assertEqual(index.get_document_frequency("prøve"), 1)
+        self.assertEqual(index.get_document_frequency("test"), 2)
+        self.assertEqual(index.get_max_term_frequency("wtf"), 0)
+        self.assertEqual(index.get_max_term_frequency("prøve"), 1)
+        self.assertEqual(index.get_max_term_frequency("test"), 2)
+        self.assertIn("test", index)
+        self.assertNotIn("wtf", index)
+        index.close()
+
+    def test_empty_index(self):
+        index = self._open(in3120.InMemoryCorpus(), ["body"])
+        self.assertListEqual(list(index["test"]), [])
+        self.assertEqual(index.get_document_frequency("test"), 0)
+        index.close()
+
+    def test_mesh_corpus(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        expected = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        expected.save(self._filename)
+        index = in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+        self.assertEqual(len(list(index["hydrogen"])), 8)
+        self.assertEqual(len(list(index["hydrocephalus"])), 2)
+        for term in ["hydrogen", "of", "and", "disease", "virus", "zzz"]:
+            self.assertListEqual([(p.document_id, p.term_frequency) for p in index[term]],
+                                 [(p.document_id, p.term_frequency) for p in expected[term]])
+            self.assertEqual(index.get_document_frequency(term), expected.get_document_frequency(term))
+            self.assertEqual(index.get_max_term_frequency(term), expected.get_max_term_frequency(term))
+        index.close()
+
+    def test_document_lengths(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"body": "this is a Test"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"body": "test TEST prØve"}))
+        corpus.add_document(in3120.InMemoryDocument(2, {"body": ""}))
+        index = self._open(corpus, ["body"])
+        self.assertListEqual(list(index.get_document_lengths()), [4, 3, 0])
+        index.close()
+        in3120.OnDiskInvertedIndex.write(self._filename, [("foo", iter([in3120.Posting(3, 1)]))])
+        index = in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+        self.assertIsNone(index.get_document_lengths())
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["foo"]], [(3, 1)])
+        index.close()
+
+    def test_bm25_ranker(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        expected = in3120.InMemoryInvertedIndex(corpus, ["body"], self._normalizer, self._tokenizer)
+        expected.save(self._filename)
+        index = in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+        self.assertListEqual(list(index.get_document_lengths()), list(expected.get_document_lengths()))
+        engine1 = in3120.SimpleSearchEngine(corpus, expected)
+        engine2 = in3120.SimpleSearchEngine(corpus, index)
+        ranker1 = in3120.BM25Ranker(corpus, expected)
+        ranker2 = in3120.BM25Ranker(corpus, index)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        for query in ["viscous flow", "boundary layer heat transfer", "zzz supersonic"]:
+            matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, ranker1)]
+            matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, ranker2)]
+            self.assertListEqual(matches2, matches1)
+        index.close()
+
+    def test_invalid_file(self):
+        with open(self._filename, "wb") as file:
+            file.write(b"this is not an inverted index file")
+        with self.assertRaises(AssertionError):
+            in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+        self.assertFalse(in3120.OnDiskInvertedIndex.is_compatible(self._filename))
+
+    def test_is_compatible(self):
+        in3120.OnDiskInvertedIndex.write(self._filename, [("foo", iter([in3120.Posting(3, 1)]))])
+        self.assertTrue(in3120.OnDiskInvertedIndex.is_compatible(self._filename))
+        with open(self._filename, "r+b") as file:
+            file.seek(12)
+            file.write(b"\xff")  # Corrupt the version number.
+        self.assertFalse(in3120.OnDiskInvertedIndex.is_compatible(self._filename))
+        with self.assertRaises(AssertionError):
+            in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+
+    def test_write_directly(self):
+        postings = [("foo", iter([in3120.Posting(3, 1), in3120.Posting(300, 7)])), ("bar", iter([]))]
+        in3120.OnDiskInvertedIndex.write(self._filename, postings)
+        index = in3120.OnDiskInvertedIndex(self._filename, self._normalizer, self._tokenizer)
+        self.assertListEqual([(p.document_id, p.term_frequency) for p in index["foo"]], [(3, 1), (300, 7)])
+        self.assertListEqual(list(index["bar"]), [])
+        self.assertEqual(index.get_document_frequency("bar"), 0)
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,38 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_variablebytecodec import TestVariableByteCodec
+from context import in3120
+
+
+class TestPForDeltaCodec(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestVariableByteCodec()
+        self._tester.setUp()
+        self._codec = in3120.PForDeltaCodec()
+
+    def test_frames(self):
+        self._tester._test_frames(self._codec)
+
+    def test_exceptions_are_patched(self):
+        # Most numbers fit in 2 bits, so the few large ones should become exceptions.
+        numbers = [i % 4 for i in range(0, 256)]
+        numbers[17] = 1000000
+        numbers[200] = 70000
+        data = bytearray()
+        size = self._codec.encode_many(numbers, data)
+        self.assertEqual(data[0], 2)
+        self.assertEqual(data[1], 128 + 2)
+        self.assertLess(size, 2 + 64 + 12)
+        self.assertEqual(self._codec.decode_many(data, 0, len(numbers)), (numbers, size))
+
+    def test_all_zeros(self):
+        data = bytearray()
+        self.assertEqual(self._codec.encode_many([0] * 100, data), 2)
+        self.assertEqual(self._codec.decode_many(data, 0, 100), ([0] * 100, 2))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
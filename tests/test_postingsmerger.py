@@ -42,6 +42,67 @@ class TestPostingsMerger(unittest.TestCase):
         self.assertIsInstance(result1, types.GeneratorType, "Are you using yield?")
         self.assertIsInstance(result2, types.GeneratorType, "Are you using yield?")
 
+    def test_many_lists(self):
+        import random
+        rng = random.Random(42)
+        factories = [in3120.InMemoryPostingList, in3120.ArrayPostingList, in3120.CompressedInMemoryPostingList,
+                     lambda: in3120.BlockCompressedInMemoryPostingList(4)]
+        for _ in range(0, 50):
+            documents = [sorted(rng.sample(range(0, 300), rng.randint(0, 150))) for _ in range(rng.randint(1, 5))]
+            posting_lists = []
+            for (i, document_ids) in enumerate(documents):
+                posting_list = rng.choice(factories)()
+                for document_id in document_ids:
+                    posting_list.append_posting(in3120.Posting(document_id, i + 1))
+                posting_list.finalize_postings()
+                posting_lists.append(posting_list)
+            expected = sorted(set.intersection(*map(set, documents)))
+            result = list(self._merger.intersection_many(iter(p) for p in posting_lists))
+            self.assertListEqual([p.document_id for p in result], expected)
+            self.assertTrue(all(p.term_frequency == 1 for p in result))
+            expected = sorted(set.union(*map(set, documents)))
+            result = list(self._merger.union_many(iter(p) for p in posting_lists))
+            self.assertListEqual([p.document_id for p in result], expected)
+
+    def test_array_columns(self):
+        import random
+        rng = random.Random(17)
+        for _ in range(0, 50):
+            documents = [sorted(rng.sample(range(0, 300), rng.randint(0, 150))) for _ in range(rng.randint(1, 5))]
+            array_lists = [in3120.ArrayPostingList() for _ in documents]
+            plain_lists = [in3120.InMemoryPostingList() for _ in documents]
+            for (i, document_ids) in enumerate(documents):
+                for document_id in document_ids:
+                    array_lists[i].append_posting(in3120.Posting(document_id, i + 1))
+                    plain_lists[i].append_posting(in3120.Posting(document_id, i + 1))
+            skip = rng.randint(0, 3)
+            for (merge, arity) in [(self._merger.intersection_many, None), (self._merger.union_many, None),
+                                   (self._merger.intersection, 2), (self._merger.union, 2)]:
+                if arity and arity != len(documents):
+                    continue
+                results = []
+                for posting_lists in [array_lists, plain_lists]:
+                    iterators = [iter(p) for p in posting_lists]
+                    for _ in range(0, skip):
+                        next(iterators[0], None)
+                    results.append([(p.document_id, p.term_frequency) for p in merge(*iterators)] if arity else
+                                   [(p.document_id, p.term_frequency) for p in merge(iterators)])
+                self.assertListEqual(results[0], results[1])
+
+    def test_many_empty_lists(self):
+        posting = in3120.Posting(123, 4)
+        self.assertListEqual(list(self._merger.intersection_many([])), [])
+        self.assertListEqual(list(self._merger.union_many([])), [])
+        self.assertListEqual(list(self._merger.intersection_many([iter([posting]), iter([]), iter([posting])])), [])
+        self.assertListEqual([p.document_id for p in self._merger.union_many([iter([]), iter([posting])])], [123])
+        self.assertListEqual([p.document_id for p in self._merger.intersection_many([iter([posting])])], [123])
+
+    def test_many_uses_yield(self):
+        import types
+        postings = [in3120.Posting(1, 0), in3120.Posting(2, 0), in3120.Posting(3, 0)]
+        self.assertIsInstance(self._merger.intersection_many([iter(postings)]), types.GeneratorType)
+        self.assertIsInstance(self._merger.union_many([iter(postings)]), types.GeneratorType)
+
     def _process_query_with_two_terms(self, corpus, index, query, operator, expected):
         terms = list(index.get_terms(query))
         postings = [index[terms[i]] for i in range(len(terms))]
@@ -65,6 +126,23 @@ class TestPostingsMerger(unittest.TestCase):
     def test_uncompressed_mesh_corpus(self):
         self._test_mesh_corpus(False)
 
+    def test_many_mesh_corpus(self):
+        normalizer = in3120.BrainDeadNormalizer()
+        tokenizer = in3120.BrainDeadTokenizer()
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer)
+        for query in ["HIV pROtein", "water Toxic", "acid of the", "cell of the type and"]:
+            terms = list(index.get_terms(query))
+            expected1 = index[terms[0]]
+            expected2 = index[terms[0]]
+            for term in terms[1:]:
+                expected1 = self._merger.intersection(expected1, index[term])
+                expected2 = self._merger.union(expected2, index[term])
+            self.assertListEqual([p.document_id for p in self._merger.intersection_many(index[t] for t in terms)],
+                                 [p.document_id for p in expected1])
+            self.assertListEqual([p.document_id for p in self._merger.union_many(index[t] for t in terms)],
+                                 [p.document_id for p in expected2])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
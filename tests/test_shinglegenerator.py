@@ -29,6 +29,11 @@ class TestShingleGenerator(unittest.TestCase):
         self.assertListEqual(list(self.__tokenizer.ranges("ba")), [(0, 2)])
         self.assertListEqual(list(self.__tokenizer.ranges("banan")), [(0, 3), (1, 4), (2, 5)])
 
+    def test_spans_and_split(self):
+        self.assertListEqual(self.__tokenizer.spans("").tolist(), [])
+        self.assertListEqual(self.__tokenizer.spans("banan").tolist(), [0, 3, 1, 4, 2, 5])
+        self.assertListEqual(self.__tokenizer.split("banan"), ["ban", "ana", "nan"])
+
     def test_uses_yield(self):
         import types
         for i in range(0, 5):
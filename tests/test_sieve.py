@@ -21,11 +21,49 @@ class TestSieve(unittest.TestCase):
         sieve.sift(4.0, "four")
         self.assertListEqual(list(sieve.winners()), [(10.0, "ten"), (9.0, "nine"), (8.0, "eight")])
 
+    def test_sift_many(self):
+        import random
+        rng = random.Random(1234)
+        for size in [1, 3, 50]:
+            sieve1 = in3120.Sieve(size)
+            sieve2 = in3120.Sieve(size)
+            for batch in range(10):
+                scores = [rng.randint(0, 20) for _ in range(rng.randint(0, 100))]  # Lots of ties.
+                items = [(batch, i) for i in range(len(scores))]
+                for (score, item) in zip(scores, items):
+                    sieve1.sift(score, item)
+                sieve2.sift_many(scores, items)
+                self.assertEqual(sieve2.threshold(), sieve1.threshold())
+                self.assertListEqual(list(sieve2.winners()), list(sieve1.winners()))
+
+    def test_winners_are_idempotent(self):
+        sieve = in3120.Sieve(2)
+        sieve.sift(1.0, "one")
+        sieve.sift(3.0, "three")
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (1.0, "one")])
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (1.0, "one")])
+        sieve.sift(2.0, "two")
+        self.assertEqual(sieve.threshold(), 2.0)
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (2.0, "two")])
+
     def test_invalid_size(self):
         for i in [-1, 0]:
             with self.assertRaises(AssertionError):
                 in3120.Sieve(i)
 
+    def test_threshold(self):
+        sieve = in3120.Sieve(2)
+        self.assertIsNone(sieve.threshold())
+        sieve.sift(3.0, "three")
+        self.assertIsNone(sieve.threshold())
+        sieve.sift(1.0, "one")
+        self.assertEqual(sieve.threshold(), 1.0)
+        sieve.sift(2.0, "two")
+        self.assertEqual(sieve.threshold(), 2.0)
+        sieve.sift(2.0, "another two")
+        self.assertEqual(sieve.threshold(), 2.0)
+        self.assertListEqual(list(sieve.winners()), [(3.0, "three"), (2.0, "two")])
+
     def test_empty_sieve(self):
         sieve = in3120.Sieve(3)
         self.assertListEqual(list(sieve.winners()), [])
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from test_variablebytecodec import TestVariableByteCodec
+from context import in3120
+
+
+class TestSimple8bCodec(unittest.TestCase):
+
+    def setUp(self):
+        self._tester = TestVariableByteCodec()
+        self._tester.setUp()
+        self._codec = in3120.Simple8bCodec()
+
+    def test_frames(self):
+        self._tester._test_frames(self._codec)
+
+    def test_runs_of_ones(self):
+        data = bytearray()
+        self.assertEqual(self._codec.encode_many([1] * 360, data), 16)
+        self.assertEqual(self._codec.decode_many(data, 0, 360), ([1] * 360, 16))
+
+    def test_word_layout(self):
+        # The widest number needs 3 bits, so selector 4 (20 numbers of 3 bits each) gets used.
+        data = bytearray()
+        self.assertEqual(self._codec.encode_many([5, 6], data), 8)
+        self.assertEqual(int.from_bytes(data, "little"), (4 << 60) | (6 << 3) | 5)
+
+    def test_too_large_numbers(self):
+        with self.assertRaises(AssertionError):
+            self._codec.encode_many([2 ** 60], bytearray())
+
+    def test_truncated_buffer(self):
+        data = bytearray()
+        self._codec.encode_many([2 ** 40, 2 ** 41], data)
+        with self.assertRaises(IndexError):
+            self._codec.decode_many(data[:12], 0, 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -179,6 +179,124 @@ class TestSimpleSearchEngine(unittest.TestCase):
         history = index.get_history()
         self.assertTrue(history == ordering1 or history == ordering2)  # Strict.
 
+    def test_many_query_terms(self):
+        from collections import Counter
+        normalizer = self.__normalizer
+        tokenizer = in3120.ShingleGenerator(3)
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for factory in [None, in3120.ArrayPostingList]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], normalizer, tokenizer, posting_list_factory=factory)
+            engine = in3120.SimpleSearchEngine(corpus, index)
+            for (query, match_threshold) in [("organization of the united nations", 0.1),
+                                             ("polluted water in africa south of the sahara", 0.5)]:
+                terms = Counter(index.get_terms(query))
+                required_minimum = max(1, min(len(terms), int(match_threshold * len(terms))))
+                expected = []
+                for document in corpus:
+                    counts = Counter(index.get_terms(document["body"]))
+                    if sum(1 for term in terms if term in counts) >= required_minimum:
+                        expected.append(sum(multiplicity * counts[term] for (term, multiplicity) in terms.items()))
+                expected = sorted(expected, reverse=True)[:20]
+                options = {"match_threshold": match_threshold, "hit_count": 20}
+                matches = [m["score"] for m in engine.evaluate(query, options, in3120.BrainDeadRanker())]
+                self.assertListEqual(matches, expected)
+
+    def test_term_at_a_time(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for (tokenizer, factory) in [(self.__tokenizer, None), (self.__tokenizer, in3120.ArrayPostingList),
+                                     (in3120.ShingleGenerator(3), in3120.ArrayPostingList)]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, tokenizer,
+                                                 posting_list_factory=factory)
+            engine = in3120.SimpleSearchEngine(corpus, index)
+            for ranker in [in3120.BrainDeadRanker(), in3120.BetterRanker(corpus, index)]:
+                for (query, match_threshold) in [("acid of the water", 0.5), ("hiv protein", 1.0),
+                                                 ("organization of the united nations", 0.1), ("xyzzy", 0.5)]:
+                    options = {"match_threshold": match_threshold, "hit_count": 100}
+                    matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                    options["evaluation"] = "taat"
+                    matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker)]
+                    self.assertListEqual(sorted(matches2), sorted(matches1))
+        with self.assertRaises(AssertionError):
+            list(engine.evaluate("water", {"evaluation": "magic"}, in3120.BrainDeadRanker()))
+
+    def test_scoring_in_blocks(self):
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for factory in [None, in3120.ArrayPostingList]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer,
+                                                 posting_list_factory=factory)
+            engine1 = in3120.SimpleSearchEngine(corpus, index)
+            engine2 = in3120.SimpleSearchEngine(corpus, index)
+            engine2._SCORING_BLOCK_SIZE = 3
+            for evaluation in ["daat", "taat"]:
+                options = {"match_threshold": 0.1, "hit_count": 20, "evaluation": evaluation}
+                for query in ["polluTION Water", "organization of the united nations"]:
+                    for ranker in [in3120.BrainDeadRanker(), in3120.BetterRanker(corpus, index)]:
+                        matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, options, ranker)]
+                        matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, options, ranker)]
+                        self.assertGreater(len(matches1), 0)
+                        self.assertListEqual(matches2, matches1)
+
+    def test_wand_pruning(self):
+
+        class CountingRanker(in3120.Ranker):
+            def __init__(self, wrapped: in3120.Ranker):
+                self.__wrapped = wrapped
+                self.evaluations = 0
+
+            def reset(self, document_id: int) -> None:
+                self.evaluations += 1
+                self.__wrapped.reset(document_id)
+
+            def update(self, term: str, multiplicity: int, posting: in3120.Posting) -> None:
+                self.__wrapped.update(term, multiplicity, posting)
+
+            def evaluate(self) -> float:
+                return self.__wrapped.evaluate()
+
+            def get_upper_bound(self, term: str, multiplicity: int, max_term_frequency: int):
+                return self.__wrapped.get_upper_bound(term, multiplicity, max_term_frequency)
+
+            def get_static_upper_bound(self):
+                return self.__wrapped.get_static_upper_bound()
+
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        for factory in [None, in3120.ArrayPostingList]:
+            index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer,
+                                                 posting_list_factory=factory)
+            engine = in3120.SimpleSearchEngine(corpus, index)
+            for ranker in [in3120.BrainDeadRanker(), in3120.BetterRanker(corpus, index)]:
+                total1, total2 = 0, 0
+                for (query, match_threshold) in [("acid of the water", 0.5), ("cell of the type and", 0.0),
+                                                 ("hiv protein", 1.0), ("the the of", 0.5), ("xyzzy", 0.5)]:
+                    ranker1 = CountingRanker(ranker)
+                    ranker2 = CountingRanker(ranker)
+                    options = {"match_threshold": match_threshold, "hit_count": 10}
+                    matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker1)]
+                    options["pruning"] = "wand"
+                    matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate(query, options, ranker2)]
+                    self.assertListEqual(sorted(matches2), sorted(matches1))
+                    self.assertLessEqual(ranker2.evaluations, ranker1.evaluations)
+                    total1 += ranker1.evaluations
+                    total2 += ranker2.evaluations
+                self.assertLess(total2, total1)
+
+    def test_wand_pruning_without_upper_bounds(self):
+
+        class UnboundedRanker(in3120.BrainDeadRanker):
+            def get_upper_bound(self, term: str, multiplicity: int, max_term_frequency: int):
+                return None
+
+        corpus = in3120.InMemoryCorpus("../data/mesh.txt")
+        index = in3120.InMemoryInvertedIndex(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        engine = in3120.SimpleSearchEngine(corpus, index)
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        matches1 = [(m["score"], m["document"].document_id) for m in engine.evaluate("water pollution", options, UnboundedRanker())]
+        options["pruning"] = "wand"
+        matches2 = [(m["score"], m["document"].document_id) for m in engine.evaluate("water pollution", options, UnboundedRanker())]
+        self.assertListEqual(matches2, matches1)
+        with self.assertRaises(AssertionError):
+            list(engine.evaluate("water pollution", {"pruning": "magic"}, UnboundedRanker()))
+
     def test_uses_yield(self):
         import types
         corpus = in3120.InMemoryCorpus()
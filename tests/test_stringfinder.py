@@ -39,6 +39,132 @@ class TestStringFinder(unittest.TestCase):
                                        {'match': 'appelsin', 'range': (21, 29)},
                                        {'match': 'drue appelsin rosin banan papaya', 'range': (14, 49)}])
 
+    def test_overlapping_partial_matches(self):
+        dictionary = in3120.Trie()
+        dictionary.add(["a " * 50 + "b", "a a", "a b c"], self.__tokenizer)
+        finder = in3120.StringFinder(dictionary, self.__tokenizer)
+        text = "a " * 1000 + "b c"
+        matches = list(finder.scan(text))
+        self.assertListEqual([m["match"] for m in matches], ["a a"] * 999 + [("a " * 50 + "b").strip(), "a b c"])
+        self.assertEqual(matches[-2]["range"], (2 * 950, 2 * 1000 + 1))
+        self.assertEqual(matches[-1]["range"], (2 * 999, 2 * 1000 + 3))
+
+    def test_scan_leftmost_longest(self):
+        dictionary = in3120.Trie()
+        dictionary.add(["norsk", "norsk ørret", "ørret", "ørret fra romerike", "fra", "romerike", "a", "a b", "b c"],
+                       self.__tokenizer)
+        finder = in3120.StringFinder(dictionary, self.__tokenizer)
+        options = {"matching": "leftmost-longest"}
+        results = list(finder.scan("en norsk ørret fra romerike", options))
+        self.assertListEqual(results, [{"match": "norsk ørret", "range": (3, 14)},
+                                       {"match": "fra", "range": (15, 18)},
+                                       {"match": "romerike", "range": (19, 27)}])
+        self.__scan_text_verify_matches(finder, "a b c", ["a", "a b", "b c"])
+        self.assertListEqual([m["match"] for m in finder.scan("a b c", options)], ["a b"])
+        self.assertListEqual([m["match"] for m in finder.scan("x a x b c a", options)], ["a", "b c", "a"])
+        self.assertListEqual(list(finder.scan("", options)), [])
+
+    def test_scan_leftmost_first(self):
+        dictionary = in3120.Trie()
+        dictionary.add(["norsk", "norsk ørret", "ørret fra romerike", "fra", "a b c d", "b", "c"], self.__tokenizer)
+        finder = in3120.StringFinder(dictionary, self.__tokenizer)
+        options = {"matching": "leftmost-first"}
+        self.assertListEqual([m["match"] for m in finder.scan("en norsk ørret fra romerike", options)],
+                             ["norsk", "ørret fra romerike"])
+        self.assertListEqual([m["match"] for m in finder.scan("a b c d", options)], ["a b c d"])
+        self.assertListEqual([m["match"] for m in finder.scan("a b c x", options)], ["b", "c"])
+
+    def test_scan_leftmost_same_as_brute_force(self):
+        import random
+        rng = random.Random(1234)
+        for _ in range(200):
+            strings = [" ".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+            dictionary = in3120.Trie()
+            dictionary.add(strings, self.__tokenizer)
+            finder = in3120.StringFinder(dictionary, self.__tokenizer)
+            text = " ".join(rng.choice("abcd") for _ in range(rng.randint(0, 15)))
+            tokens = list(self.__tokenizer.tokens(text))
+            for (matching, longest) in [("leftmost-longest", True), ("leftmost-first", False)]:
+                expected = []
+                i = 0
+                while i < len(tokens):
+                    ends = [j for j in range(i, len(tokens)) if " ".join(t for (t, _) in tokens[i:(j + 1)]) in strings]
+                    if not ends:
+                        i += 1
+                        continue
+                    j = max(ends) if longest else min(ends)
+                    expected.append((tokens[i][1][0], tokens[j][1][1]))
+                    i = j + 1
+                self.assertListEqual([m["range"] for m in finder.scan(text, {"matching": matching})], expected)
+
+    def test_invalid_matching_option(self):
+        dictionary = in3120.Trie()
+        dictionary.add(["foo"], self.__tokenizer)
+        finder = in3120.StringFinder(dictionary, self.__tokenizer)
+        with self.assertRaises(AssertionError):
+            list(finder.scan("foo", {"matching": "rightmost"}))
+
+    def test_scan_corpus(self):
+        dictionary = in3120.Trie()
+        dictionary.add(["norsk", "norsk ørret", "ørret", "sverige", "a", "a b"], self.__tokenizer)
+        finder = in3120.StringFinder(dictionary, self.__tokenizer)
+        corpus = in3120.InMemoryCorpus()
+        for (document_id, (title, body)) in enumerate([("norsk ørret", "ørret fra sverige"), ("", "a b a"),
+                                                       ("ingenting", None), ("a", "norsk")] * 200):
+            corpus.add_document(in3120.InMemoryDocument(document_id, {"title": title, "body": body}))
+        for options in [None, {"matching": "leftmost-longest"}]:
+            expected = [(document.document_id, field, match["match"], match["range"])
+                        for document in corpus for field in ["title", "body"]
+                        for match in finder.scan(document[field] or "", options)]
+            self.assertEqual(len(expected), 200 * (5 + 3 + 0 + 2) if not options else 200 * (3 + 2 + 0 + 2))
+            for workers in [1, 3]:
+                results = list(finder.scan_corpus(corpus, ["title", "body"], options, workers))
+                self.assertListEqual(results, expected)
+        with self.assertRaises(AssertionError):
+            list(finder.scan_corpus(corpus, ["title"], None, 0))
+
+    def test_document_processor(self):
+        dictionary = in3120.Trie()
+        dictionary.add(["new york", "new york city", "york"], self.__tokenizer)
+        finder = in3120.StringFinder(dictionary, self.__tokenizer)
+        pipeline = in3120.DocumentPipeline([finder.get_processor("foo", "places", {"matching": "leftmost-longest"}),
+                                            finder.get_processor("bar", "more places")])
+        document = pipeline(in3120.InMemoryDocument(0, {"foo": "from new york city to york", "bar": "new york"}))
+        self.assertListEqual(document["places"], [{"match": "new york city", "range": (5, 18)},
+                                                  {"match": "york", "range": (22, 26)}])
+        self.assertListEqual([m["match"] for m in document["more places"]], ["new york", "york"])
+
+    def test_compact_trie(self):
+        strings = ["romerike", "apple computer", "norsk", "norsk ørret", "sverige", "ørret", "a", "a b"]
+        trie = in3120.Trie()
+        trie.add(strings, self.__tokenizer)
+        finder1 = in3120.StringFinder(trie, self.__tokenizer)
+        finder2 = in3120.StringFinder(in3120.CompactTrie(strings, self.__tokenizer), self.__tokenizer)
+        text = "en norsk     ørret fra romerike likte a b fra sverige"
+        self.assertListEqual(list(finder2.scan(text)), list(finder1.scan(text)))
+
+    def test_token_trie(self):
+        strings = ["romerike", "apple computer", "norsk", "norsk ørret", "sverige", "ørret", "a", "a b"]
+        trie = in3120.Trie()
+        trie.add(strings, self.__tokenizer)
+        token_trie = in3120.TokenTrie()
+        token_trie.add(strings, self.__tokenizer)
+        finder1 = in3120.StringFinder(trie, self.__tokenizer)
+        finder2 = in3120.StringFinder(token_trie, self.__tokenizer)
+        text = "en norsk     ørret fra romerike likte a b fra sverige a a b ørret"
+        for options in [{}, {"matching": "leftmost-longest"}, {"matching": "leftmost-first"}]:
+            self.assertListEqual(list(finder2.scan(text, options)), list(finder1.scan(text, options)))
+
+        # A node below the root is respected, as for the other tries.
+        finder3 = in3120.StringFinder(trie.consume("norsk "), self.__tokenizer)
+        finder4 = in3120.StringFinder(token_trie.consume("norsk"), self.__tokenizer)
+        self.assertListEqual([m["match"] for m in finder3.scan(text)], ["ørret", "ørret"])
+        self.assertListEqual(list(finder4.scan(text)), list(finder3.scan(text)))
+
+        # Adding to the token trie afterwards introduces new tokens, but doesn't affect the compiled automaton.
+        token_trie.add(["likte", "fra romerike"], self.__tokenizer)
+        self.assertListEqual(list(finder2.scan(text)), list(finder1.scan(text)))
+
     def test_uses_yield(self):
         from types import GeneratorType
         trie = in3120.Trie()
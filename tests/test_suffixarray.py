@@ -50,6 +50,17 @@ class TestSuffixArray(unittest.TestCase):
             if statistic.traceback[0].filename == inspect.getfile(in3120.SuffixArray):
                 self.assertLessEqual(statistic.size_diff, 2000000, "Memory usage seems excessive.")
 
+    def test_peak_memory_usage(self):
+        import tracemalloc
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "o o " * 10000}))
+        tracemalloc.start()
+        engine = in3120.SuffixArray(corpus, ["a"], self.__normalizer, self.__tokenizer)
+        (_, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLessEqual(peak, 20000000, "Are the suffixes being materialized?")
+        self.assertListEqual([m["score"] for m in engine.evaluate("o o o", {})], [19998])
+
     def test_multiple_fields(self):
         corpus = in3120.InMemoryCorpus()
         corpus.add_document(in3120.InMemoryDocument(0, {"field1": "a b c", "field2": "b c d"}))
@@ -65,6 +76,82 @@ class TestSuffixArray(unittest.TestCase):
         self.__process_query_and_verify_winner(engine1, "z", [], None)
         self.__process_query_and_verify_winner(engine2, "z", [2], 1)
 
+    def test_repetitive_corpus(self):
+        import random
+        from collections import Counter
+        rng = random.Random(1234)
+        tokenizer = self.__tokenizer
+        for _ in range(40):
+            corpus = in3120.InMemoryCorpus()
+            for document_id in range(rng.randint(1, 6)):
+                words = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(0, 8))]
+                corpus.add_document(in3120.InMemoryDocument(document_id, {"a": " ".join(words), "b": "ab a"}))
+            engine = in3120.SuffixArray(corpus, ["a", "b"], self.__normalizer, tokenizer)
+            for query in ["a", "b", "ab", "ba", "a b", "aa", "bb a", "abab", "c"]:
+                expected = Counter()
+                for document in corpus:
+                    buffer = " \0 ".join(document[f] for f in ["a", "b"])
+                    for (start, _) in tokenizer.ranges(buffer):
+                        if buffer.startswith(query, start):
+                            expected[document.document_id] += 1
+                matches = engine.evaluate(query, {"hit_count": 100})
+                self.assertDictEqual({m["document"].document_id: m["score"] for m in matches}, dict(expected))
+                self.assertEqual(engine.count(query), sum(expected.values()))
+
+    def test_non_ascii_content(self):
+        corpus = in3120.InMemoryCorpus()
+        corpus.add_document(in3120.InMemoryDocument(0, {"a": "blåbærsyltetøy og blåbær", "b": "æ"}))
+        corpus.add_document(in3120.InMemoryDocument(1, {"a": "blåbær ær", "b": "ærlig talt"}))
+        engine = in3120.SuffixArray(corpus, ["a", "b"], self.__normalizer, self.__tokenizer)
+        self.__process_query_and_verify_winner(engine, "BLÅB", [0], 2)
+        self.__process_query_and_verify_winner(engine, "ær", [1], 2)
+        self.__process_query_and_verify_winner(engine, "og blåbær", [0], 1)
+        self.__process_query_and_verify_winner(engine, "bær", [], None)
+
+    def test_count(self):
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        engine = in3120.SuffixArray(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        self.assertEqual(engine.count(""), 0)
+        self.assertEqual(engine.count("zzz"), 0)
+        for query in ["visc", "Of  A", "approximate solution", "the", "a"]:
+            matches = engine.evaluate(query, {"hit_count": 100})
+            count = engine.count(query)
+            self.assertGreater(count, 0)
+            self.assertGreaterEqual(count, sum(m["score"] for m in matches))
+        self.assertGreater(engine.count("the"), engine.count("the b"))
+        self.assertGreater(engine.count("visc"), engine.count("viscous"))
+
+    def test_save_and_load(self):
+        import os
+        import tempfile
+        corpus = in3120.InMemoryCorpus("../data/cran.xml")
+        engine1 = in3120.SuffixArray(corpus, ["body"], self.__normalizer, self.__tokenizer)
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ["engine1.suffixarray", "engine2.suffixarray"]]
+            engine1.save(filenames[0])
+            engine2 = in3120.SuffixArray.load(filenames[0], corpus, self.__normalizer, self.__tokenizer)
+            for query in ["visc", "Of  A", "approximate solution", "the", "zzz", ""]:
+                matches1 = [(m["score"], m["document"].document_id) for m in engine1.evaluate(query, {"hit_count": 20})]
+                matches2 = [(m["score"], m["document"].document_id) for m in engine2.evaluate(query, {"hit_count": 20})]
+                self.assertListEqual(matches2, matches1)
+            self.__process_query_and_verify_winner(engine2, "visc", [328], 11)
+            engine2.save(filenames[1])
+            with open(filenames[0], "rb") as file1, open(filenames[1], "rb") as file2:
+                self.assertEqual(file1.read(), file2.read())
+            engine2.close()
+            self.assertTrue(in3120.SuffixArray.is_compatible(filenames[0]))
+            with open(filenames[0], "r+b") as file:
+                file.seek(12)
+                file.write(b"\xff")  # Corrupt the version number.
+            self.assertFalse(in3120.SuffixArray.is_compatible(filenames[0]))
+            with self.assertRaises(AssertionError):
+                in3120.SuffixArray.load(filenames[0], corpus, self.__normalizer, self.__tokenizer)
+            with open(filenames[0], "wb") as file:
+                file.write(b"garbage garbage garbage")
+            self.assertFalse(in3120.SuffixArray.is_compatible(filenames[0]))
+            with self.assertRaises(AssertionError):
+                in3120.SuffixArray.load(filenames[0], corpus, self.__normalizer, self.__tokenizer)
+
     def test_uses_yield(self):
         import types
         corpus = in3120.InMemoryCorpus()
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from context import in3120
+
+
+class TestTokenTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.__tokenizer = in3120.BrainDeadTokenizer()
+
+    def test_access_nodes(self):
+        root = in3120.TokenTrie()
+        root.add(["new york", "new york city", "new  jersey", "york", "ørret"], self.__tokenizer)
+        self.assertFalse(root.is_final())
+        self.assertIsNone(root.consume("ne"))
+        self.assertIsNone(root.consume("snegle"))
+        node = root.consume("new")
+        self.assertFalse(node.is_final())
+        node = node.consume("york")
+        self.assertTrue(node.is_final())
+        self.assertEqual(node, root.consume("new york"))
+        self.assertNotEqual(node, root.consume("york"))
+        self.assertTrue(root.consume("new jersey").is_final())
+        self.assertIsNone(root.consume("new york state"))
+        self.assertEqual(root.consume(""), root)
+
+    def test_iterate_strings(self):
+        root = in3120.TokenTrie()
+        root.add(["new york", "new york city", "new  jersey", "york", "ørret", "york"], self.__tokenizer)
+        self.assertListEqual(sorted(root), ["new jersey", "new york", "new york city", "york", "ørret"])
+        self.assertListEqual(sorted(root.consume("new york")), ["", "city"])
+
+    def test_interned_tokens(self):
+        root = in3120.TokenTrie()
+        root.add(["new york", "york new", "new new york"], self.__tokenizer)
+        self.assertEqual(root.get_dictionary().size(), 2)
+        self.assertEqual(root.size(), 7)
+
+    def test_add_below_node(self):
+        root = in3120.TokenTrie()
+        root.add(["new york"], self.__tokenizer)
+        root.consume("new").add(["jersey"], self.__tokenizer)
+        self.assertTrue(root.consume("new jersey").is_final())
+        self.assertIsNone(root.consume("jersey"))
+
+    def test_same_as_trie(self):
+        import random
+        rng = random.Random(1234)
+        for _ in range(50):
+            strings = [" ".join(rng.choice(["a", "b", "ab", "ø"]) for _ in range(rng.randint(1, 4)))
+                       for _ in range(rng.randint(0, 30))]
+            trie = in3120.Trie()
+            trie.add(strings, self.__tokenizer)
+            token_trie = in3120.TokenTrie()
+            token_trie.add(strings, self.__tokenizer)
+            self.assertListEqual(sorted(token_trie), sorted(trie))
+            for _ in range(50):
+                prefix = " ".join(rng.choice(["a", "b", "ab", "ø", "x"]) for _ in range(rng.randint(0, 4)))
+                (node, token_node) = (trie.consume(prefix), token_trie.consume(prefix))
+                if node and prefix and not node.is_final() and not node.consume(" "):
+                    node = None  # The prefix ends in the middle of a token.
+                self.assertEqual(node is None, token_node is None)
+                if node:
+                    self.assertEqual(node.is_final(), token_node.is_final())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -19,6 +19,23 @@ class TestTrie(unittest.TestCase):
         self.assertTrue(node.is_final())
         self.assertEqual(node, root.consume("abb"))
 
+    def test_iterate_strings(self):
+        tokenizer = in3120.BrainDeadTokenizer()
+        root = in3120.Trie()
+        root.add(["abba", "ørret", "abb", "abbab", "abbor", "abba"], tokenizer)
+        self.assertListEqual(sorted(root), ["abb", "abba", "abbab", "abbor", "ørret"])
+        self.assertListEqual(sorted(root.consume("abb")), ["", "a", "ab", "or"])
+        self.assertListEqual(list(in3120.Trie()), [])
+
+    def test_children(self):
+        tokenizer = in3120.BrainDeadTokenizer()
+        root = in3120.Trie()
+        root.add(["abba", "ab c", "b"], tokenizer)
+        self.assertListEqual(sorted(c for (c, _) in root.children()), ["a", "b"])
+        node = root.consume("ab")
+        self.assertListEqual(sorted((c, child is node.consume(c)) for (c, child) in node.children()), [(" ", True), ("b", True)])
+        self.assertListEqual(list(root.consume("b").children()), [])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -7,6 +7,23 @@ from context import in3120
 
 class TestVariableByteCodec(unittest.TestCase):
 
+    def _test_frames(self, codec: in3120.IntegerCodec):
+        frames = [[], [0], [21, 4, 70, 0, 127, 128, 512, 999, 214577, 134217728, 1, 1, 2],
+                  [1] * 300, [3 * (i % 7) + 1 for i in range(0, 500)], [2 ** 40, 1, 1, 0, 2 ** 33]]
+        data = bytearray([255])
+        sizes = [codec.encode_many(frame, data) for frame in frames]
+        self.assertEqual(sum(sizes), len(data) - 1)
+        where = 1
+        for (frame, size) in zip(frames, sizes):
+            self.assertEqual(codec.decode_many(data, where, len(frame)), (frame, size))
+            where += size
+        with self.assertRaises(AssertionError):
+            codec.encode_many([1, -1], bytearray())
+        with self.assertRaises(AssertionError):
+            codec.encode_many([1], None)
+        with self.assertRaises(AssertionError):
+            codec.decode_many(None, 0, 1)
+
     def test_encode_and_decode(self):
         data = bytearray()
         self.assertEqual(in3120.VariableByteCodec.encode(21, data), 1)
@@ -47,11 +64,37 @@ class TestVariableByteCodec(unittest.TestCase):
         with self.assertRaises(IndexError):
             in3120.VariableByteCodec.decode(data, 4)
 
+    def test_encode_and_decode_many(self):
+        numbers = [21, 4, 70, 0, 127, 128, 512, 999, 214577, 134217728, 1, 1, 2]
+        data1 = bytearray()
+        for number in numbers:
+            in3120.VariableByteCodec.encode(number, data1)
+        data2 = bytearray([255])
+        self.assertEqual(in3120.VariableByteCodec.encode_many(numbers, data2), len(data1))
+        self.assertEqual(data2[1:], data1)
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data1, 0, len(numbers)), (numbers, len(data1)))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data2, 1, 3), (numbers[:3], 3))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data2, 4, 0), ([], 0))
+        self.assertEqual(in3120.VariableByteCodec.decode_many(data2, 5, 3), (numbers[4:7], 5))
+        with self.assertRaises(IndexError):
+            in3120.VariableByteCodec.decode_many(data1, 0, len(numbers) + 1)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(data1, 6, 1)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([1, -1], bytearray())
+
+    def test_frames(self):
+        self._test_frames(in3120.VariableByteCodec())
+
     def test_missing_buffer(self):
         with self.assertRaises(AssertionError):
             in3120.VariableByteCodec.encode(210470, None)
         with self.assertRaises(AssertionError):
             in3120.VariableByteCodec.decode(None, 0)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.encode_many([210470], None)
+        with self.assertRaises(AssertionError):
+            in3120.VariableByteCodec.decode_many(None, 0, 1)
 
 
 if __name__ == '__main__':
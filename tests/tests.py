@@ -1,12 +1,19 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+from test_arraypostinglist import TestArrayPostingList
 from test_betterranker import TestBetterRanker
+from test_blockcompressedinmemorypostinglist import TestBlockCompressedInMemoryPostingList
+from test_bm25ranker import TestBM25Ranker
 from test_braindeadnormalizer import TestBrainDeadNormalizer
 from test_braindeadranker import TestBrainDeadRanker
 from test_braindeadtokenizer import TestBrainDeadTokenizer
+from test_cachedbetterranker import TestCachedBetterRanker
+from test_compacttrie import TestCompactTrie
 from test_compressedinmemorypostinglist import TestCompressedInMemoryPostingList
 from test_documentpipeline import TestDocumentPipeline
+from test_eliasdeltacodec import TestEliasDeltaCodec
+from test_eliasgammacodec import TestEliasGammaCodec
 from test_expressioncomposer import TestExpressionComposer
 from test_inmemorycorpus import TestInMemoryCorpus
 from test_inmemorydictionary import TestInMemoryDictionary
@@ -15,12 +22,16 @@ from test_inmemoryinvertedindexwithcompression import TestInMemoryInvertedIndexW
 from test_inmemoryinvertedindexwithoutcompression import TestInMemoryInvertedIndexWithoutCompression
 from test_inmemorypostinglist import TestInMemoryPostingList
 from test_naivebayesclassifier import TestNaiveBayesClassifier
+from test_ondiskinvertedindex import TestOnDiskInvertedIndex
+from test_pfordeltacodec import TestPForDeltaCodec
 from test_postingsmerger import TestPostingsMerger
 from test_shallowcaseextractor import TestShallowCaseExtractor
 from test_shinglegenerator import TestShingleGenerator
 from test_sieve import TestSieve
+from test_simple8bcodec import TestSimple8bCodec
 from test_simplesearchengine import TestSimpleSearchEngine
 from test_stringfinder import TestStringFinder
 from test_suffixarray import TestSuffixArray
+from test_tokentrie import TestTokenTrie
 from test_trie import TestTrie
 from test_variablebytecodec import TestVariableByteCodec